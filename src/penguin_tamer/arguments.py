@@ -36,6 +36,34 @@ parser.add_argument(
     help=t("Open interactive settings menu."),
 )
 
+parser.add_argument(
+    "-r",
+    "--raw",
+    action="store_true",
+    help=t("Plain output without formatting: answer the prompt and exit. "
+           "Used automatically when output is not a terminal."),
+)
+
+parser.add_argument(
+    "--json",
+    action="store_true",
+    help=t("Machine-readable output: newline-delimited JSON events on stdout. "
+           "Without a prompt, requests are read line by line from stdin."),
+)
+
+parser.add_argument(
+    "-f",
+    "--fanout",
+    action="store_true",
+    help=t("Ask several LLMs from supported_LLMs at once and choose the answer that continues the dialog."),
+)
+
+parser.add_argument(
+    "--models",
+    metavar="LLM_IDS",
+    help=t("Comma-separated LLM IDs for fan-out (implies --fanout, all LLMs by default)."),
+)
+
 parser.add_argument(
     "--version",
     action="version",
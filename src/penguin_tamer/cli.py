@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Command-line interface for Penguin Tamer."""
 import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 
 # Добавляем parent (src) в sys.path для локального запуска
@@ -90,12 +91,17 @@ from penguin_tamer.prompts import get_system_prompt, get_educational_prompt
 
 
 # === Основная логика ===
-def run_single_query(chat_client: AbstractLLMClient, query: str, console) -> None:
-    """Run a single query (optionally streaming)"""
+def run_single_query(chat_client: AbstractLLMClient, query: str, console) -> bool:
+    """Answer a single query without entering dialog mode.
+
+    Returns:
+        True if a non-empty reply was received
+    """
     try:
-        chat_client.ask_stream(query)
+        return bool(chat_client.ask_stream(query))
     except Exception as e:
         console.print(connection_error(e))
+        return False
 
 
 def _is_exit_command(prompt: str) -> bool:
@@ -124,15 +130,18 @@ def _add_command_to_context(
     else:
         user_message = t("Execute command: {command}").format(command=command)
 
+    # Сжимаем вывод, чтобы он не раздувал контекст
+    stdout, stderr = _compact_command_output(chat_client, command, result)
+
     # Формируем системное сообщение с результатом
     if result['interrupted']:
         system_message = t("Command execution was interrupted by user (Ctrl+C).")
     elif result['success']:
         output_parts = []
-        if result['stdout']:
-            output_parts.append(t("Output:") + f"\n{result['stdout']}")
-        if result['stderr']:
-            output_parts.append(t("Errors:") + f"\n{result['stderr']}")
+        if stdout:
+            output_parts.append(t("Output:") + f"\n{stdout}")
+        if stderr:
+            output_parts.append(t("Errors:") + f"\n{stderr}")
 
         if output_parts:
             system_message = t("Command executed successfully (exit code: 0).") + "\n" + "\n".join(output_parts)
@@ -140,10 +149,10 @@ def _add_command_to_context(
             system_message = t("Command executed successfully (exit code: 0). No output.")
     else:
         output_parts = [t("Command failed with exit code: {code}").format(code=result['exit_code'])]
-        if result['stdout']:
-            output_parts.append(t("Output:") + f"\n{result['stdout']}")
-        if result['stderr']:
-            output_parts.append(t("Errors:") + f"\n{result['stderr']}")
+        if stdout:
+            output_parts.append(t("Output:") + f"\n{stdout}")
+        if stderr:
+            output_parts.append(t("Errors:") + f"\n{stderr}")
         system_message = "\n".join(output_parts)
 
     # Добавляем в контекст диалога
@@ -151,6 +160,56 @@ def _add_command_to_context(
     chat_client.messages.append({"role": "system", "content": system_message})
 
 
+def _compact_command_output(chat_client: AbstractLLMClient, command: str, result: dict) -> tuple:
+    """Compact stdout and stderr of a command result for the chat context.
+
+    A result identical to an earlier one becomes a reference to it. When the
+    output is shortened, the full output is saved and its path is shown.
+
+    Returns:
+        Tuple of (stdout, stderr) to add to the context
+    """
+    from penguin_tamer.output_compaction import (
+        CompactionSettings, clean_terminal_output, compact_output, get_output_log
+    )
+
+    stdout, stderr = result.get('stdout') or "", result.get('stderr') or ""
+    settings = CompactionSettings.from_config()
+    if settings.max_tokens <= 0 or not (stdout or stderr):
+        return stdout, stderr
+
+    log = get_output_log(settings)
+    full_output = stdout + (f"\n--- stderr ---\n{stderr}" if stderr else "")
+    earlier = log.previous_command(full_output)
+    if earlier is not None:
+        return t("[Same output as the earlier command: {command}]").format(command=earlier), ""
+    log.remember(command, full_output)
+
+    budget = settings.max_tokens // 2 if stdout and stderr else settings.max_tokens
+    compacted = [compact_output(text, budget) if text else "" for text in (stdout, stderr)]
+    shortened = any(
+        new != clean_terminal_output(text).rstrip("\n") for new, text in zip(compacted, (stdout, stderr)) if text
+    )
+    if shortened:
+        path = log.save(command, full_output)
+        if path is not None:
+            note = t("[Full output saved to {path}]").format(path=path)
+            compacted[0] = "\n".join(filter(None, [compacted[0], note]))
+            chat_client.console.print(
+                t("[dim]Output shortened for the AI context. Full output: {path}[/dim]").format(path=path)
+            )
+    return compacted[0], compacted[1]
+
+
+def _emit_command_result(
+    chat_client: AbstractLLMClient, command: str, result: dict, block_number: int = None
+) -> None:
+    """Report command execution result as an NDJSON event (if events are enabled)."""
+    emitter = getattr(chat_client, "event_emitter", None)
+    if emitter is not None:
+        emitter.emit("command_result", command=command, block_number=block_number, **result)
+
+
 def _handle_direct_command(console, chat_client: AbstractLLMClient, prompt: str, demo_manager=None) -> bool:
     """Execute direct shell command (starts with dot) and add to context.
 
@@ -191,6 +250,7 @@ def _handle_direct_command(console, chat_client: AbstractLLMClient, prompt: str,
 
     # Добавляем команду и результат в контекст
     _add_command_to_context(chat_client, command, result)
+    _emit_command_result(chat_client, command, result)
 
     return True
 
@@ -235,6 +295,7 @@ def _handle_code_block_execution(
 
         # Добавляем команду и результат в контекст
         _add_command_to_context(chat_client, code, result, block_number=block_index)
+        _emit_command_result(chat_client, code, result, block_number=block_index)
 
         return True
 
@@ -252,11 +313,19 @@ def _process_ai_query(chat_client: AbstractLLMClient, console, prompt: str, demo
         demo_manager: Demo manager for recording (optional)
 
     Returns:
-        List of code blocks from AI response
+        List of code blocks from AI response. If the response is interrupted
+        with Ctrl+C, blocks completed before the interruption are returned.
     """
-    reply = chat_client.ask_stream(prompt)
     code_blocks = []
 
+    try:
+        reply = chat_client.ask_stream(prompt)
+    except KeyboardInterrupt:
+        # Блоки с закрытым ограждением уже можно выполнять
+        reply = ""
+        code_blocks = [block.code for block in chat_client.code_blocks]
+        console.print(t("[dim]Response interrupted by user (Ctrl+C)[/dim]"))
+
     # Извлекаем блоки кода только если получен непустой ответ
     if reply:
         code_blocks = get_formatter_text()(reply)
@@ -269,7 +338,64 @@ def _process_ai_query(chat_client: AbstractLLMClient, console, prompt: str, demo
     return code_blocks
 
 
-def _process_initial_prompt(chat_client: AbstractLLMClient, console, prompt: str, demo_manager=None) -> list:
+def _choose_fanout_answer(console, lanes: list, default):
+    """Ask which answer continues the dialog.
+
+    Args:
+        console: Rich console for input
+        lanes: FanOutLane list in panel order
+        default: Lane chosen on empty input
+
+    Returns:
+        Chosen lane
+    """
+    choices = {str(number): lane for number, lane in enumerate(lanes, 1) if lane.status == "ok"}
+    if len(choices) == 1:
+        return default
+
+    prompt = t("Answer to continue ({choices}, Enter - {default}): ").format(
+        choices=", ".join(choices), default=lanes.index(default) + 1
+    )
+    while True:
+        answer = console.input(prompt).strip()
+        if not answer:
+            return default
+        if answer in choices:
+            return choices[answer]
+
+
+def _process_fanout_query(fanout, console, prompt: str) -> list:
+    """Send query to several LLMs at once and continue with the chosen answer.
+
+    Args:
+        fanout: FanOut over the configured LLMs
+        console: Rich console for output
+        prompt: User prompt
+
+    Returns:
+        List of code blocks from the chosen answer
+    """
+    try:
+        lanes = fanout.ask(prompt)
+    except KeyboardInterrupt:
+        console.print(t("[dim]Response interrupted by user (Ctrl+C)[/dim]"))
+        return []
+
+    default = fanout.fastest()
+    if default is None:
+        console.print(f"[dim italic]{t('Warning: Empty response received from API.')}[/dim italic]")
+        return []
+
+    lane = _choose_fanout_answer(console, lanes, default)
+    reply = fanout.choose(lane, prompt)
+    console.print(t("[dim]Continuing with {label}.[/dim]").format(label=lane.label))
+    console.print()
+    return get_formatter_text()(reply)
+
+
+def _process_initial_prompt(
+    chat_client: AbstractLLMClient, console, prompt: str, demo_manager=None, fanout=None
+) -> list:
     """Process initial user prompt if provided.
 
     Args:
@@ -277,6 +403,7 @@ def _process_initial_prompt(chat_client: AbstractLLMClient, console, prompt: str
         console: Rich console for output
         prompt: Initial user prompt
         demo_manager: Demo manager for recording (optional)
+        fanout: FanOut to ask several LLMs at once (optional)
 
     Returns:
         List of code blocks from response
@@ -285,6 +412,8 @@ def _process_initial_prompt(chat_client: AbstractLLMClient, console, prompt: str
         return []
 
     try:
+        if fanout is not None:
+            return _process_fanout_query(fanout, console, prompt)
         return _process_ai_query(chat_client, console, prompt, demo_manager)
     except Exception as e:
         console.print(connection_error(e))
@@ -292,13 +421,16 @@ def _process_initial_prompt(chat_client: AbstractLLMClient, console, prompt: str
         return []
 
 
-def run_dialog_mode(chat_client: AbstractLLMClient, console, initial_user_prompt: str = None) -> None:
+def run_dialog_mode(chat_client: AbstractLLMClient, console, initial_user_prompt: str = None, fanout=None) -> None:
     """Interactive dialog mode with educational prompt for code block numbering.
 
     Args:
         chat_client: Initialized LLM client
         console: Rich console for output
         initial_user_prompt: Optional initial prompt to process before entering dialog loop
+        fanout: FanOut asking several LLMs at once instead of chat_client (optional)
+
+    Clients and the fan-out are closed by the caller.
     """
     # Initialize demo system
     demo_manager = create_demo_manager(
@@ -326,18 +458,23 @@ def run_dialog_mode(chat_client: AbstractLLMClient, console, initial_user_prompt
     chat_client.init_dialog_mode(educational_prompt)
 
     # Process initial prompt if provided
-    last_code_blocks = _process_initial_prompt(chat_client, console, initial_user_prompt, demo_manager)
+    last_code_blocks = _process_initial_prompt(chat_client, console, initial_user_prompt, demo_manager, fanout)
 
     # Main dialog loop with proper cleanup
     try:
         while True:
             try:
-                # Get user input
-                user_prompt = input_formatter.get_input(
-                    console,
-                    has_code_blocks=bool(last_code_blocks),
-                    t=t
-                )
+                # Get user input, opening a connection to the provider meanwhile
+                if fanout is None:
+                    chat_client.start_warmup()
+                try:
+                    user_prompt = input_formatter.get_input(
+                        console,
+                        has_code_blocks=bool(last_code_blocks),
+                        t=t
+                    )
+                finally:
+                    chat_client.stop_warmup()
 
                 if not user_prompt:
                     continue
@@ -358,7 +495,10 @@ def run_dialog_mode(chat_client: AbstractLLMClient, console, initial_user_prompt
                     continue
 
                 # Process as AI query
-                last_code_blocks = _process_ai_query(chat_client, console, user_prompt, demo_manager)
+                if fanout is not None:
+                    last_code_blocks = _process_fanout_query(fanout, console, user_prompt)
+                else:
+                    last_code_blocks = _process_ai_query(chat_client, console, user_prompt, demo_manager)
 
             except KeyboardInterrupt:
                 break
@@ -373,23 +513,53 @@ def run_dialog_mode(chat_client: AbstractLLMClient, console, initial_user_prompt
         demo_manager.finalize()
 
 
-def _create_chat_client(console):
-    """Ленивое создание LLM клиента только когда он действительно нужен.
-    
-    Использует фабрику для выбора правильной реализации клиента на основе
-    параметра client_name из конфигурации провайдера.
+def run_event_mode(chat_client: AbstractLLMClient, console, initial_user_prompt: str = None) -> bool:
+    """Dialog driven by stdin lines, reported as NDJSON events on stdout.
+
+    With an initial prompt only that prompt is answered. Otherwise every
+    stdin line is handled like dialog input (query, block number or
+    .command) until EOF or an exit command. Anything else printed to stdout
+    (e.g. command output) is redirected to stderr to keep the event stream
+    clean.
+
+    Args:
+        chat_client: Initialized LLM client with an event emitter
+        console: Rich console for diagnostics (stderr)
+        initial_user_prompt: Optional single prompt to answer
+
+    Returns:
+        True if no request failed or came back empty
     """
+    chat_client.init_dialog_mode(get_educational_prompt())
+
+    with redirect_stdout(sys.stderr):
+        if initial_user_prompt:
+            _process_initial_prompt(chat_client, console, initial_user_prompt)
+            return not chat_client.event_emitter.failed
+
+        last_code_blocks = []
+        for line in sys.stdin:
+            user_prompt = line.strip()
+            if not user_prompt:
+                continue
+            if _is_exit_command(user_prompt):
+                break
 
-    # Убеждаемся, что i18n инициализирован перед созданием клиента
-    _ensure_i18n()
+            try:
+                if _handle_direct_command(console, chat_client, user_prompt):
+                    continue
+                if _handle_code_block_execution(console, chat_client, user_prompt, last_code_blocks):
+                    continue
+                last_code_blocks = _process_ai_query(chat_client, console, user_prompt)
+            except Exception as e:
+                console.print(connection_error(e))
 
-    llm_config = config.get_current_llm_effective_config()
+    return not chat_client.event_emitter.failed
 
-    # Определяем тип клиента из конфигурации провайдера
-    client_name = llm_config.get("client_name", "openrouter")  # по умолчанию openrouter
 
-    # Создаём полную конфигурацию LLM (подключение + генерация)
-    full_llm_config = LLMConfig(
+def _build_llm_config(llm_config: dict) -> LLMConfig:
+    """Полная конфигурация LLM (подключение + генерация) из эффективной конфигурации."""
+    return LLMConfig(
         # Connection parameters
         api_key=llm_config["api_key"],
         api_url=llm_config["api_url"],
@@ -404,26 +574,175 @@ def _create_chat_client(console):
         seed=config.get("global", "seed", None)
     )
 
+
+def _create_chat_client(console):
+    """Ленивое создание LLM клиента только когда он действительно нужен.
+
+    Использует фабрику для выбора правильной реализации клиента на основе
+    параметра client_name из конфигурации провайдера.
+    """
+
+    # Убеждаемся, что i18n инициализирован перед созданием клиента
+    _ensure_i18n()
+
+    llm_config = config.get_current_llm_effective_config()
+
+    # Определяем тип клиента из конфигурации провайдера
+    client_name = llm_config.get("client_name", "openrouter")  # по умолчанию openrouter
+
     # Создаём клиент через фабрику
     chat_client = ClientFactory.create_client(
         client_name=client_name,
         console=console,
         system_message=get_system_prompt(),
-        llm_config=full_llm_config
+        llm_config=_build_llm_config(llm_config)
     )
     return chat_client
 
 
-def _create_console():
-    """Создание Rich Console с темой из конфига."""
+def _build_client(console, llm_id: str, llm_config: dict = None, asynchronous: bool = False):
+    """Create a client of a configured LLM without system prompt.
+
+    Args:
+        console: Rich console for output
+        llm_id: LLM ID (or label of llm_config) shown when the LLM is skipped
+        llm_config: Effective LLM config, looked up by llm_id if omitted
+        asynchronous: Create the asyncio flavor of the client
+
+    Returns:
+        Client or None if the LLM is unknown or has no API key
+    """
+    if llm_config is None:
+        llm_config = config.get_llm_effective_config(llm_id)
+    if not llm_config:
+        console.print(t("[dim]Unknown LLM '{llm_id}' - skipped.[/dim]").format(llm_id=llm_id))
+        return None
+    client_name = llm_config.get("client_name", "openrouter")
+    # Pollinations не требует API ключа
+    if client_name != "pollinations" and not llm_config.get("api_key", "").strip():
+        console.print(t("[dim]LLM '{llm_id}' has no API key - skipped.[/dim]").format(llm_id=llm_id))
+        return None
+    return ClientFactory.create_client(
+        client_name=client_name,
+        console=console,
+        system_message=[],
+        llm_config=_build_llm_config(llm_config),
+        asynchronous=asynchronous
+    )
+
+
+def _create_hedge_client(console, chat_client: AbstractLLMClient) -> None:
+    """Attach the backup LLM of the hedging policy to the main client.
+
+    The backup client shares the messages of the main client, so a hedged
+    request carries the same dialog. Nothing is attached if hedging is off
+    or the backup LLM is unknown or has no API key.
+    """
+    from penguin_tamer.llm_clients.hedging import HedgeSettings
+
+    settings = HedgeSettings.from_config()
+    if not settings.enabled:
+        return
+    backup = _build_client(console, settings.llm)
+    if backup is None:
+        return
+    backup.messages = chat_client.messages
+    chat_client.hedge_client = backup
+
+
+def _create_fallback_clients(console, chat_client: AbstractLLMClient) -> None:
+    """Attach the fallback LLMs of the current LLM to the main client.
+
+    Fallback clients share the messages of the main client, so the dialog
+    continues unchanged on whichever provider answers. Fallbacks without an
+    API key are skipped.
+    """
+    for llm_config in config.get_llm_fallbacks(config.current_llm):
+        label = f"{llm_config['provider']} / {llm_config['model']}"
+        fallback = _build_client(console, label, llm_config)
+        if fallback is None:
+            continue
+        fallback.messages = chat_client.messages
+        chat_client.fallback_clients.append(fallback)
+
+
+def _create_summarizer(console, chat_client: AbstractLLMClient) -> None:
+    """Attach background summaries of old turns to the main client ("summarize" policy).
+
+    Summaries are written by `summary_llm` or by a separate client of the
+    current LLM, so the dialog client is never busy with them.
+    """
+    from penguin_tamer.llm_clients.summarizer import (
+        ContextSummarizer, SummaryCache, SummarySettings, summary_cache_file
+    )
+
+    settings = SummarySettings.from_config()
+    if not settings.enabled:
+        return
+    client = _build_client(console, settings.llm or config.current_llm, asynchronous=True)
+    if client is None:
+        return
+    chat_client.summarizer = ContextSummarizer(
+        chat_client.messages, client, settings, SummaryCache(summary_cache_file())
+    )
+
+
+def _create_fanout(console, chat_client: AbstractLLMClient, llm_ids: str):
+    """Create fan-out over several LLMs from supported_LLMs.
+
+    Args:
+        console: Rich console for output
+        chat_client: Main client, its messages are shared by all models
+        llm_ids: Comma-separated LLM IDs or "all"
+
+    Returns:
+        FanOut or None if fewer than two LLMs are usable
+    """
+    from penguin_tamer.llm_clients.fanout import FanOut
+
+    if llm_ids == "all":
+        ids = config.get_available_llms()
+    else:
+        ids = [llm_id.strip() for llm_id in llm_ids.split(",") if llm_id.strip()]
+
+    clients = []
+    for llm_id in ids:
+        llm_config = config.get_llm_effective_config(llm_id)
+        client = _build_client(console, llm_id, llm_config, asynchronous=True)
+        if client is not None:
+            clients.append((f"{llm_config['provider']} / {llm_config['model']}", client))
+
+    if len(clients) < 2:
+        console.print(t("[yellow]Fan-out needs at least two LLMs with API keys, using the current LLM.[/yellow]"))
+        return None
+
+    return FanOut(
+        console,
+        clients,
+        chat_client.messages,
+        layout=config.get("global", "fanout_layout", "auto"),
+        refresh_per_second=config.get("global", "refresh_per_second", 10),
+        theme_name=config.get("global", "markdown_theme", "default"),
+    )
+
+
+def _create_console(stderr: bool = False):
+    """Создание Rich Console с темой из конфига.
+
+    Args:
+        stderr: Write to stderr (stdout is reserved for JSON events)
+    """
     Console = get_console_class()
     theme_name = config.get("global", "markdown_theme", "default")
     markdown_theme = get_theme()(theme_name)
-    return Console(theme=markdown_theme)
+    return Console(theme=markdown_theme, stderr=stderr)
 
 
 def main() -> None:
     """Main entry point for Penguin Tamer CLI."""
+    raw_mode = False
+    chat_client = None
+    fanout = None
     try:
         args = parse_args()
 
@@ -458,15 +777,38 @@ def main() -> None:
             pass
 
         # Создаем консоль и клиент только если они нужны для AI операций
-        console = _create_console()
+        console = _create_console(stderr=args.json)
         chat_client = _create_chat_client(console)
+        _create_hedge_client(console, chat_client)
+        _create_fallback_clients(console, chat_client)
+        _create_summarizer(console, chat_client)
+
+        # Raw output: forced by flag or chosen when stdout is not a terminal
+        raw_mode = args.raw or not console.is_terminal
+        if args.raw:
+            chat_client.output_mode = "raw"
 
-        # Always run in dialog mode
         prompt_parts: list = args.prompt or []
         prompt: str = " ".join(prompt_parts).strip()
 
+        # Event stream for tooling: NDJSON on stdout, diagnostics on stderr
+        if args.json:
+            from penguin_tamer.events import EventEmitter
+            raw_mode = True  # No trailing empty line in the event stream
+            chat_client.output_mode = "json"
+            chat_client.event_emitter = EventEmitter(sys.stdout)
+            return 0 if run_event_mode(chat_client, console, prompt or None) else 1
+
+        # Raw mode answers the prompt once and exits (pipes, scripts, CI)
+        if raw_mode and prompt:
+            return 0 if run_single_query(chat_client, prompt, console) else 1
+
+        # Fan-out: every query goes to several LLMs, the user picks the answer
+        if args.fanout or args.models:
+            fanout = _create_fanout(console, chat_client, args.models or "all")
+
         # Dialog mode with optional initial prompt
-        run_dialog_mode(chat_client, console, prompt if prompt else None)
+        run_dialog_mode(chat_client, console, prompt if prompt else None, fanout)
 
     except KeyboardInterrupt:
         return 130
@@ -476,7 +818,13 @@ def main() -> None:
         traceback.print_exc()
         return 1
     finally:
-        print()  # print empty line anyway
+        # Pooled connections, warm-up, hedge, fallback and summary clients
+        if fanout is not None:
+            fanout.close()
+        if chat_client is not None:
+            chat_client.close()
+        if not raw_mode:
+            print()  # print empty line anyway
 
     return 0
 
@@ -300,14 +300,47 @@ class ConfigManager:
         llm_config = self.get_llm_config(llm_name)
         if not llm_config:
             return {}
-        
-        provider_name = llm_config.get("provider", "")
+        return self._effective_config(llm_config.get("provider", ""), llm_config.get("model", ""))
+
+    def get_llm_fallbacks(self, llm_name: str) -> List[Dict[str, Any]]:
+        """
+        Возвращает эффективные конфигурации резервных LLM в порядке перебора.
+
+        Элемент списка `fallbacks` LLM - ID другой LLM или словарь
+        {provider, model}. Неизвестные LLM и провайдеры пропускаются.
+
+        Args:
+            llm_name: Имя LLM
+
+        Returns:
+            List[Dict]: Конфигурации в формате get_llm_effective_config()
+        """
+        fallbacks = self.get_llm_config(llm_name).get("fallbacks") or []
+        if not isinstance(fallbacks, list):
+            return []
+
+        providers = self.get("supported_Providers") or {}
+        result = []
+        for item in fallbacks:
+            if isinstance(item, dict):
+                provider_name = item.get("provider", "")
+                if provider_name not in providers or not item.get("model"):
+                    continue
+                result.append(self._effective_config(provider_name, item["model"]))
+            elif item != llm_name:
+                fallback = self.get_llm_effective_config(str(item))
+                if fallback and fallback["provider"] in providers:
+                    result.append(fallback)
+        return result
+
+    def _effective_config(self, provider_name: str, model: str) -> Dict[str, Any]:
+        """Параметры подключения пары провайдер/модель."""
         providers = self.get("supported_Providers") or {}
         provider_config = providers.get(provider_name, {})
-        
+
         return {
             "provider": provider_name,
-            "model": llm_config.get("model", ""),
+            "model": model,
             "api_url": provider_config.get("api_url", ""),
             "api_key": provider_config.get("api_key", ""),
             "client_name": provider_config.get("client_name", "openrouter")  # Дефолт для совместимости
@@ -9,9 +9,10 @@ import yaml
 from pathlib import Path
 from typing import Optional, Dict, Any
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.live import Live
 
+from penguin_tamer.render_cache import create_markdown
+
 from .models import DemoSession
 
 
@@ -365,7 +366,7 @@ class DemoPlayer:
                 i += chunk_size
 
                 # Render accumulated text as markdown
-                md = Markdown(accumulated_text)
+                md = create_markdown(accumulated_text)
                 live.update(md)
                 live.refresh()
 
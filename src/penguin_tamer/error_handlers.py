@@ -8,6 +8,7 @@ This module provides:
 - User-friendly error messages
 """
 import functools
+import sys
 from typing import Optional, Callable, Any, Dict
 from dataclasses import dataclass
 from enum import Enum
@@ -76,6 +77,59 @@ class APIError(PenguinTamerError):
     pass
 
 
+class HTTPStatusError(APIError):
+    """Non-2xx HTTP response from a native (SDK-less) transport."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int,
+        body: Any = None,
+        response: Any = None,
+        context: Optional[ErrorContext] = None
+    ):
+        super().__init__(message, context)
+        self.message = message
+        self.status_code = status_code
+        self.body = body
+        self.response = response
+
+
+class TransportConnectionError(APIError):
+    """Network failure of a native transport (DNS, refused, reset)."""
+    pass
+
+
+class TransportTimeoutError(APIError):
+    """Connect or read timeout of a native transport."""
+    pass
+
+
+class StreamStallError(TransportTimeoutError):
+    """Stream sent no data for longer than its first-byte or idle timeout."""
+
+    def __init__(self, message: str, timeout: float, context: Optional[ErrorContext] = None):
+        super().__init__(message, context)
+        self.timeout = timeout
+
+
+class RateLimitWaitError(APIError):
+    """Client-side rate limiter would have to wait longer than allowed."""
+
+    def __init__(self, message: str, wait: float, context: Optional[ErrorContext] = None):
+        super().__init__(message, context)
+        self.wait = wait
+
+
+class CircuitOpenError(APIError):
+    """Provider failed repeatedly, requests are refused without contacting it."""
+
+    def __init__(self, message: str, provider: str, retry_in: float, context: Optional[ErrorContext] = None):
+        super().__init__(message, context)
+        self.provider = provider
+        self.retry_in = retry_in
+
+
 class ConfigurationError(PenguinTamerError):
     """Errors related to configuration."""
     pass
@@ -89,6 +143,13 @@ class ValidationError(PenguinTamerError):
 class ErrorHandler:
     """Centralized error handler with strategy pattern using configuration dictionary."""
 
+    # Statuses worth another attempt: timeouts, conflicts, throttling and server errors
+    _RECOVERABLE_STATUSES = frozenset({408, 409, 425, 429})
+    # SDK exceptions of network failures (carry no status code)
+    _NETWORK_ERRORS = frozenset({'APIConnectionError', 'APITimeoutError'})
+    # Authentication failures: another provider with its own key may still answer
+    _FAILOVER_STATUSES = frozenset({401, 403})
+
     def __init__(self, console=None, debug_mode: bool = False):
         """Initialize error handler.
 
@@ -120,6 +181,23 @@ class ErrorHandler:
                 ErrorSeverity.WARNING,
                 lambda e: {'body_msg': self._extract_body_message(e)}
             ),
+            'RateLimitWaitError': (
+                "Rate limit of the provider is exhausted, the next request is possible in {wait} s. "
+                "You can change LLM in settings: 'pt -s'",
+                ErrorSeverity.WARNING,
+                lambda e: {'wait': f"{e.wait:.0f}"}
+            ),
+            'CircuitOpenError': (
+                "{provider} is not responding, requests are paused for {seconds} s. "
+                "You can change LLM in settings: 'pt -s'",
+                ErrorSeverity.WARNING,
+                lambda e: {'provider': e.provider, 'seconds': f"{e.retry_in:.0f}"}
+            ),
+            'StreamStallError': (
+                "The provider sent no data for {seconds} s, the request was aborted. Please try again.",
+                ErrorSeverity.WARNING,
+                lambda e: {'seconds': f"{e.timeout:.0f}"}
+            ),
             'APITimeoutError': (
                 "Request timeout: The request took too long. Please try again.",
                 ErrorSeverity.WARNING,
@@ -154,9 +232,63 @@ class ErrorHandler:
             ),
         }
 
+        # Status code -> config used for HTTPStatusError (same mapping as the openai SDK)
+        self._status_configs = {
+            400: 'BadRequestError',
+            401: 'AuthenticationError',
+            403: 'PermissionDeniedError',
+            404: 'NotFoundError',
+            429: 'RateLimitError',
+        }
+
         self._handlers = {}
         self._register_handlers()
 
+    @classmethod
+    def is_recoverable(cls, error: Exception) -> bool:
+        """Whether the same request may succeed if sent again.
+
+        Network failures, timeouts, 429 and 5xx responses are transient;
+        other statuses (bad request, authentication, not found), refusals
+        of the local rate limiter and open circuit breakers are not.
+        """
+        if isinstance(error, (RateLimitWaitError, CircuitOpenError)):
+            return False
+        if isinstance(error, (TransportConnectionError, TransportTimeoutError)):
+            return True
+        status_code = getattr(error, 'status_code', None)
+        if isinstance(status_code, int):
+            return status_code in cls._RECOVERABLE_STATUSES or status_code >= 500
+        return any(klass.__name__ in cls._NETWORK_ERRORS for klass in type(error).__mro__)
+
+    @classmethod
+    def is_outage_error(cls, error: Exception) -> bool:
+        """Whether the error is a failure of the provider itself (trips its circuit breaker).
+
+        Network failures, timeouts and 5xx responses are; throttling and
+        errors of the request (4xx) say nothing about the provider being down.
+        """
+        if isinstance(error, (TransportConnectionError, TransportTimeoutError)):
+            return True
+        status_code = getattr(error, 'status_code', None)
+        if isinstance(status_code, int):
+            return status_code >= 500
+        return any(klass.__name__ in cls._NETWORK_ERRORS for klass in type(error).__mro__)
+
+    @classmethod
+    def is_failover_error(cls, error: Exception) -> bool:
+        """Whether a fallback LLM should get the request after this error.
+
+        Covers everything that is recoverable (once retries of the same
+        provider are exhausted), authentication failures, refusals of the
+        local rate limiter and open circuit breakers. Bad requests and
+        unknown models are not provider failures and are reported as they are.
+        """
+        if isinstance(error, (RateLimitWaitError, CircuitOpenError)) or cls.is_recoverable(error):
+            return True
+        status_code = getattr(error, 'status_code', None)
+        return isinstance(status_code, int) and status_code in cls._FAILOVER_STATUSES
+
     def _extract_body_message(self, error: Exception) -> str:
         """Extract message from error body."""
         try:
@@ -167,23 +299,50 @@ class ErrorHandler:
 
     def _register_handlers(self):
         """Register handlers from configuration dictionary."""
+        # Native transport errors reuse the messages of their SDK counterparts
+        self._handlers[HTTPStatusError] = self._handle_http_status_error
+        for exc_class, config_name in (
+            (StreamStallError, 'StreamStallError'),
+            (TransportTimeoutError, 'APITimeoutError'),
+            (TransportConnectionError, 'APIConnectionError'),
+            (RateLimitWaitError, 'RateLimitWaitError'),
+            (CircuitOpenError, 'CircuitOpenError'),
+        ):
+            msg_template, severity, extractor = self._error_configs[config_name]
+            self._handlers[exc_class] = self._make_config_handler(msg_template, severity, extractor)
+
+        # SDK exceptions can only be raised if the SDK has been imported
+        if 'openai' not in sys.modules:
+            return
         exceptions = get_openai_exceptions()
 
         for exc_name, (msg_template, severity, extractor) in self._error_configs.items():
             exc_class = exceptions.get(exc_name)
             if exc_class:
-                # Create handler with closure capturing config
-                def make_handler(template, sev, extract_fn):
-                    def handler(error, context):
-                        return self._generic_handler(error, context, template, sev, extract_fn)
-                    return handler
-
-                self._handlers[exc_class] = make_handler(msg_template, severity, extractor)
+                self._handlers[exc_class] = self._make_config_handler(msg_template, severity, extractor)
 
         # Special handler for APIStatusError (needs custom logic)
         if 'APIStatusError' in exceptions:
             self._handlers[exceptions['APIStatusError']] = self._handle_api_status_error
 
+    def _make_config_handler(self, template, severity, extractor):
+        """Create handler with closure capturing config."""
+        def handler(error, context):
+            return self._generic_handler(error, context, template, severity, extractor)
+        return handler
+
+    def _handle_http_status_error(
+        self,
+        error: HTTPStatusError,
+        context: Optional[ErrorContext] = None
+    ) -> str:
+        """Handle status errors of native transports like the matching SDK exceptions."""
+        config_name = self._status_configs.get(error.status_code)
+        if config_name:
+            msg_template, severity, extractor = self._error_configs[config_name]
+            return self._generic_handler(error, context, msg_template, severity, extractor)
+        return self._handle_api_status_error(error, context)
+
     def handle(self, error: Exception, context: Optional[ErrorContext] = None) -> str:
         """Handle an exception and return user-friendly message.
 
@@ -0,0 +1,48 @@
+"""
+Events - Машиночитаемый поток событий в формате NDJSON.
+
+Каждое событие - одна строка JSON с полем "event" и отметкой времени "ts".
+Строка сбрасывается в поток сразу после записи, чтобы родительский процесс
+мог реагировать с минимальной задержкой.
+
+События: request_start, first_chunk, chunk, code_block, usage, rate_limits,
+response_end, command_result, error.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+
+class EventEmitter:
+    """Writes newline-delimited JSON events to a text stream."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        """Initialize emitter.
+
+        Args:
+            stream: Output stream, stdout by default (captured at creation,
+                so later redirects of sys.stdout do not affect events)
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        # An error was reported or a reply came back empty (exit status of `pt --json`)
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> None:
+        """Write one event and flush it.
+
+        Args:
+            event: Event name
+            **fields: JSON-serializable event payload
+        """
+        if event == "error" or (event == "response_end" and fields.get("status") in ("error", "empty")):
+            self.failed = True
+        record = {"event": event, "ts": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
@@ -6,14 +6,18 @@ LLM Clients package - различные реализации клиентов 
 - OpenAIClient - для OpenAI API
 - PollinationsClient - для Pollinations API
 - MistralClient - для Mistral AI API
+
+Асинхронные версии (AbstractAsyncLLMClient): AsyncOpenRouterClient,
+AsyncOpenAIClient, AsyncPollinationsClient, AsyncMistralClient.
 """
 
 from penguin_tamer.llm_clients.base import AbstractLLMClient, LLMConfig
+from penguin_tamer.llm_clients.async_base import AbstractAsyncLLMClient
 from penguin_tamer.llm_clients.stream_processor import StreamProcessor
-from penguin_tamer.llm_clients.openrouter_client import OpenRouterClient
-from penguin_tamer.llm_clients.openai_client import OpenAIClient
-from penguin_tamer.llm_clients.pollinations_client import PollinationsClient
-from penguin_tamer.llm_clients.mistral_client import MistralClient
+from penguin_tamer.llm_clients.openrouter_client import OpenRouterClient, AsyncOpenRouterClient
+from penguin_tamer.llm_clients.openai_client import OpenAIClient, AsyncOpenAIClient
+from penguin_tamer.llm_clients.pollinations_client import PollinationsClient, AsyncPollinationsClient
+from penguin_tamer.llm_clients.mistral_client import MistralClient, AsyncMistralClient
 from penguin_tamer.llm_clients.factory import ClientFactory
 
 __all__ = [
@@ -24,5 +28,10 @@ __all__ = [
     'OpenAIClient',
     'PollinationsClient',
     'MistralClient',
+    'AbstractAsyncLLMClient',
+    'AsyncOpenRouterClient',
+    'AsyncOpenAIClient',
+    'AsyncPollinationsClient',
+    'AsyncMistralClient',
     'ClientFactory',
 ]
@@ -0,0 +1,307 @@
+"""
+Async Base - Базовый класс асинхронных LLM клиентов.
+
+Асинхронные клиенты используют те же параметры запроса и разбор чанков,
+что и синхронные, но читают SSE поток через httpx.AsyncClient, поэтому
+несколько запросов могут идти параллельно в одном процессе (fan-out,
+хеджирование, фоновая суммаризация). Синхронный `ask_stream` наследуется
+без изменений, CLI продолжает работать как раньше.
+"""
+
+import asyncio
+import json
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from penguin_tamer.error_handlers import (
+    APIError, TransportConnectionError, TransportTimeoutError
+)
+from penguin_tamer.llm_clients.base import AbstractLLMClient
+from penguin_tamer.llm_clients.metrics import RequestMetrics
+from penguin_tamer.llm_clients.native_transport import _error_from_response
+from penguin_tamer.llm_clients.retry import RetryPolicy
+from penguin_tamer.llm_clients.stream_reader import CONTENT, USAGE
+from penguin_tamer.llm_clients.token_estimator import count_prompt_tokens
+from penguin_tamer.utils.lazy_import import lazy_import
+
+
+# Ленивый импорт httpx (устанавливается вместе с openai)
+@lazy_import
+def get_httpx_module():
+    """Ленивый импорт httpx для асинхронных запросов"""
+    import httpx
+    return httpx
+
+
+def _translate_httpx_error(error: Exception) -> Exception:
+    """Convert httpx network exception into transport error."""
+    httpx = get_httpx_module()
+    if isinstance(error, httpx.TimeoutException):
+        return TransportTimeoutError(str(error) or "Request timed out", original_error=error)
+    return TransportConnectionError(str(error) or type(error).__name__, original_error=error)
+
+
+def decode_json_event(payload: str) -> dict:
+    """Decode OpenAI-compatible event data, raising errors sent inside the stream."""
+    chunk = json.loads(payload)
+    if isinstance(chunk, dict) and chunk.get("error"):
+        error = chunk["error"]
+        message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+        raise APIError(message)
+    return chunk
+
+
+class AsyncSSEStream:
+    """Async iterator over `data:` payloads of a streaming httpx response.
+
+    Exposes `response` (for rate limit headers) and `aclose()`.
+    """
+
+    def __init__(self, response):
+        """Initialize stream.
+
+        Args:
+            response: Streaming httpx.Response with status 2xx
+        """
+        self.response = response
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        httpx = get_httpx_module()
+        data_lines = []
+        try:
+            async for line in self.response.aiter_lines():
+                if not line:
+                    # Blank line dispatches the event
+                    if data_lines:
+                        payload = "\n".join(data_lines)
+                        data_lines = []
+                        yield payload
+                    continue
+                if line.startswith("data:"):
+                    payload = line[5:]
+                    if payload[:1] == " ":
+                        payload = payload[1:]
+                    if payload == "[DONE]":
+                        return
+                    data_lines.append(payload)
+                # Comments (": keep-alive") and event/id/retry fields are ignored
+            if data_lines:
+                yield "\n".join(data_lines)
+        except httpx.TransportError as e:
+            raise _translate_httpx_error(e) from e
+
+    async def aclose(self) -> None:
+        """Close the response and release the connection."""
+        await self.response.aclose()
+
+
+@dataclass
+class AbstractAsyncLLMClient(AbstractLLMClient):
+    """Base class of asynchronous LLM clients.
+
+    Concrete async clients inherit request preparation and chunk parsing
+    from the matching sync client and only describe the HTTP request
+    (`_stream_request`) and how an SSE payload becomes a chunk
+    (`_decode_event`).
+    """
+
+    # httpx.AsyncClient and the event loop it belongs to
+    _async_http: Optional[object] = field(default=None, init=False)
+    _async_loop: Optional[object] = field(default=None, init=False)
+
+    @abstractmethod
+    def _stream_request(self, api_params: dict) -> Tuple[str, Dict[str, str]]:
+        """URL and headers of the streaming request.
+
+        Args:
+            api_params: Request body from _prepare_api_params()
+
+        Returns:
+            Tuple of (url, headers)
+        """
+        pass
+
+    @abstractmethod
+    def _decode_event(self, payload: str):
+        """Convert SSE event data into a chunk accepted by the extractors."""
+        pass
+
+    @property
+    def async_http(self):
+        """Pooled httpx.AsyncClient of the running event loop.
+
+        Connections are bound to the loop they were opened in, so a new
+        client is created when called from another loop (e.g. next asyncio.run).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_loop is not loop:
+            httpx = get_httpx_module()
+            settings = self.network_settings
+            self._async_http = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=None,
+                    max_keepalive_connections=settings.pool_size if settings.keep_alive else 0,
+                ),
+            )
+            self._async_loop = loop
+        return self._async_http
+
+    async def _aopen_stream(self, api_params: dict) -> AsyncSSEStream:
+        """Send streaming request.
+
+        Raises:
+            HTTPStatusError: Non-2xx response
+            TransportConnectionError: Network failure
+            TransportTimeoutError: Connect or read timeout
+        """
+        httpx = get_httpx_module()
+        url, headers = self._stream_request(api_params)
+        body = self._encode_body(api_params)
+        try:
+            request = self.async_http.build_request("POST", url, content=body, headers=headers)
+            response = await self.async_http.send(request, stream=True)
+        except httpx.TransportError as e:
+            raise _translate_httpx_error(e) from e
+
+        if response.status_code >= 400:
+            try:
+                await response.aread()
+                raise _error_from_response(response)
+            finally:
+                await response.aclose()
+
+        return AsyncSSEStream(response)
+
+    async def _athrottle(self, api_params: dict) -> Optional[float]:
+        """Asynchronous `_throttle()`: wait for the provider's rate limits without blocking the loop."""
+        from penguin_tamer.llm_clients.rate_limiter import estimate_request_tokens
+
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+        limiter = self.rate_limiter
+        if limiter is None:
+            return None
+        return await limiter.aacquire(
+            estimate_request_tokens(api_params),
+            max_wait=self.network_settings.rate_limit_max_wait,
+        )
+
+    async def astream(self, user_input: str, add_to_context: bool = True,
+                      metrics: Optional[RequestMetrics] = None) -> AsyncIterator[Tuple[str, object]]:
+        """Stream a reply asynchronously.
+
+        Yields the same items as StreamReader: `(CONTENT, str)` for every
+        text delta and `(USAGE, dict)` for token usage. Metrics are recorded
+        like for sync requests; recoverable errors before the first item are
+        retried by the provider's RetryPolicy.
+
+        Args:
+            user_input: User query
+            add_to_context: Append the query and a non-empty reply to messages
+            metrics: Record filled for this request, so the caller can watch it live
+
+        Raises:
+            HTTPStatusError, TransportConnectionError, TransportTimeoutError, APIError,
+            RateLimitWaitError
+        """
+        if metrics is None:
+            metrics = RequestMetrics(model=self.model)
+        api_params = self._prepare_api_params(user_input)
+        metrics.estimated_prompt_tokens = count_prompt_tokens(api_params["messages"])
+        policy = RetryPolicy.from_settings(self.network_settings)
+        reply_parts = []
+        started = False
+        status = "error"
+        try:
+            while True:
+                attempt = self._astream_attempt(api_params, metrics)
+                try:
+                    async for kind, payload in attempt:
+                        started = True
+                        if kind == CONTENT:
+                            reply_parts.append(payload)
+                        yield kind, payload
+                    break
+                except Exception as e:
+                    self._observe_error(e)
+                    # A reply that has started streaming is never sent again
+                    waited = metrics.retry_delay + (metrics.throttled or 0.0)
+                    delay = None if started else policy.next_delay(e, metrics.retries, waited)
+                    if delay is None:
+                        raise
+                    metrics.record_retry(delay)
+                    await asyncio.sleep(delay)
+                finally:
+                    await attempt.aclose()
+            reply = "".join(reply_parts)
+            # Estimated usage only fills the totals, the stream yields what the provider sent
+            usage_stats = self._estimated_usage(metrics, reply)
+            if usage_stats:
+                self._record_usage(metrics, usage_stats)
+            status = "ok" if reply.strip() else "empty"
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "interrupted"
+            raise
+        finally:
+            metrics.finish(status)
+            self._store_metrics(metrics)
+
+        if add_to_context and status == "ok":
+            self.messages.append({"role": "user", "content": user_input})
+            self.messages.append({"role": "assistant", "content": reply})
+
+    async def _astream_attempt(self, api_params: dict, metrics: RequestMetrics) -> AsyncIterator[Tuple[str, object]]:
+        """Send one attempt of a streaming request and yield its items."""
+        throttled = await self._athrottle(api_params)
+        if throttled is not None:
+            metrics.throttled = (metrics.throttled or 0.0) + throttled
+        stream = await self._aopen_stream(api_params)
+        metrics.mark_connected()
+        self._observe_rate_limits(stream)
+        self._observe_connected()
+        try:
+            async for payload in stream:
+                chunk = self._decode_event(payload)
+                content = self._extract_chunk_content(chunk)
+                if content:
+                    metrics.record_chunk(len(content))
+                    yield CONTENT, content
+                usage_stats = self._extract_usage_stats(chunk)
+                if usage_stats:
+                    self._record_usage(metrics, usage_stats)
+                    yield USAGE, usage_stats
+        finally:
+            await stream.aclose()
+
+    def _record_usage(self, metrics: RequestMetrics, usage_stats: dict) -> None:
+        """Add usage statistics to the request metrics and client totals."""
+        metrics.record_usage(usage_stats)
+        self.total_prompt_tokens += usage_stats.get('prompt_tokens', 0)
+        self.total_completion_tokens += usage_stats.get('completion_tokens', 0)
+        self.total_requests += 1
+
+    async def aask(self, user_input: str, add_to_context: bool = True) -> str:
+        """Collect a complete reply asynchronously.
+
+        Args:
+            user_input: User query
+            add_to_context: Append the query and a non-empty reply to messages
+
+        Returns:
+            Complete reply text
+        """
+        parts = []
+        async for kind, payload in self.astream(user_input, add_to_context=add_to_context):
+            if kind == CONTENT:
+                parts.append(payload)
+        return "".join(parts)
+
+    async def aclose(self) -> None:
+        """Close pooled async connections of the current event loop."""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+            self._async_loop = None
@@ -6,11 +6,11 @@
 
 import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import ClassVar, List, Dict, Optional
 from dataclasses import dataclass, field
 from contextlib import contextmanager
 
-from penguin_tamer.text_utils import format_api_key_display
+from penguin_tamer.text_utils import format_api_key_display, CodeBlock
 
 
 @dataclass
@@ -39,6 +39,9 @@ class AbstractLLMClient(ABC):
     Concrete clients (OpenRouterClient, OpenAIClient, etc.) must implement abstract methods.
     """
 
+    # Client name in the provider config, key of per-provider network settings
+    client_name: ClassVar[str] = ""
+
     # Core parameters
     console: object
     system_message: List[Dict[str, str]]
@@ -59,9 +62,36 @@ class AbstractLLMClient(ABC):
     rate_limit_remaining_requests: Optional[int] = field(default=None, init=False)
     rate_limit_remaining_tokens: Optional[int] = field(default=None, init=False)
 
+    # Labeled code blocks of the last reply, filled while the reply streams
+    code_blocks: List[CodeBlock] = field(default_factory=list, init=False)
+
+    # Output of streamed replies: "auto" (rich in a terminal, raw otherwise), "rich", "raw" or "json"
+    output_mode: str = field(default="auto", init=False)
+    # EventEmitter receiving NDJSON events of every request (None - no events)
+    event_emitter: Optional[object] = field(default=None, init=False)
+
+    # Latency metrics of every request in the session (RequestMetrics records)
+    request_metrics: List[object] = field(default_factory=list, init=False)
+
+    # Pooled HTTP session, kept for the lifetime of the client
+    _session: Optional[object] = field(default=None, init=False)
+    # Encoder reusing the serialized messages of the previous request
+    _body_encoder: Optional[object] = field(default=None, init=False)
+    # ConnectionWarmer started while the dialog waits for input
+    _warmer: Optional[object] = field(default=None, init=False)
+    # Backup client raced against this one when the first chunk is late (see hedging)
+    hedge_client: Optional["AbstractLLMClient"] = field(default=None, init=False)
+    # Clients tried in order when the provider of this one fails (see StreamProcessor)
+    fallback_clients: List["AbstractLLMClient"] = field(default_factory=list, init=False)
+    # Background summaries of the oldest turns (ContextSummarizer, see summarizer)
+    summarizer: Optional[object] = field(default=None, init=False)
+    # What the token budget removed from the messages of the last request (ContextTrim)
+    last_context_trim: Optional[object] = field(default=None, init=False)
+
     def __post_init__(self):
         """Initialize internal state after dataclass construction."""
-        self.messages = self.system_message.copy()
+        from penguin_tamer.llm_clients.context_window import MessageHistory
+        self.messages = MessageHistory(self.system_message)
 
     # === Properties для доступа к LLM параметрам ===
     
@@ -105,6 +135,226 @@ class AbstractLLMClient(ABC):
     def seed(self) -> Optional[int]:
         return self.llm_config.seed
 
+    @property
+    def network_settings(self):
+        """Pool size and timeouts of this provider (NetworkSettings)."""
+        from penguin_tamer.llm_clients.http_session import NetworkSettings
+        return NetworkSettings.from_config(self.client_name)
+
+    @property
+    def session(self):
+        """Pooled requests.Session reused across turns and model list fetches."""
+        if self._session is None:
+            from penguin_tamer.llm_clients.http_session import create_session
+            self._session = create_session(self.network_settings)
+        return self._session
+
+    @property
+    def rate_limiter(self):
+        """Process-wide RateLimiter of this provider, None if disabled in the network settings."""
+        settings = self.network_settings
+        if not settings.rate_limit:
+            return None
+        from penguin_tamer.llm_clients.rate_limiter import get_rate_limiter
+        return get_rate_limiter(self._provider_key, window=settings.rate_limit_window)
+
+    @property
+    def circuit_breaker(self):
+        """Process-wide CircuitBreaker of this provider, None if disabled in the network settings."""
+        settings = self.network_settings
+        if settings.breaker_failures <= 0:
+            return None
+        from penguin_tamer.llm_clients.circuit_breaker import get_circuit_breaker
+        return get_circuit_breaker(self._provider_key, settings)
+
+    @property
+    def _provider_key(self) -> str:
+        """API host shared by all clients of a provider (client name if the URL has none)."""
+        from urllib.parse import urlparse
+        return urlparse(self.api_url or "").netloc or self.client_name
+
+    def _throttle(self, api_params: dict, on_wait=None) -> Optional[float]:
+        """Wait until the request fits into the provider's rate limits.
+
+        A provider with an open circuit breaker is refused right away.
+
+        Args:
+            api_params: Request body, its token cost is estimated from messages
+            on_wait: Called with the delay before waiting
+
+        Returns:
+            Seconds waited, None if rate limiting is off
+
+        Raises:
+            RateLimitWaitError: Limits allow the request only after `rate_limit_max_wait`
+            CircuitOpenError: Provider failed repeatedly and is not contacted
+        """
+        from penguin_tamer.llm_clients.rate_limiter import estimate_request_tokens
+
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+        limiter = self.rate_limiter
+        if limiter is None:
+            return None
+        return limiter.acquire(
+            estimate_request_tokens(api_params),
+            max_wait=self.network_settings.rate_limit_max_wait,
+            on_wait=on_wait,
+        )
+
+    def _observe_rate_limits(self, stream) -> None:
+        """Extract rate limits of a response and feed them to the rate limiter.
+
+        Only values present in this response reach the limiter, values of
+        earlier responses stay on the client for statistics.
+        """
+        names = ('rate_limit_requests', 'rate_limit_remaining_requests',
+                 'rate_limit_tokens', 'rate_limit_remaining_tokens')
+        previous = {name: getattr(self, name) for name in names}
+        for name in names:
+            setattr(self, name, None)
+        self._extract_rate_limits(stream)
+        fresh = {name: getattr(self, name) for name in names}
+        for name in names:
+            if fresh[name] is None:
+                setattr(self, name, previous[name])
+
+        limiter = self.rate_limiter
+        if limiter is not None:
+            limiter.update(*(fresh[name] for name in names))
+
+    def _observe_connected(self) -> None:
+        """Close the circuit breaker once the provider has answered."""
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.record_success()
+
+    def _observe_error(self, error: Exception) -> None:
+        """Pause requests to the provider after a 429 response, count outages for the circuit breaker."""
+        from penguin_tamer.llm_clients.rate_limiter import is_rate_limit_error, retry_after_seconds
+
+        limiter = self.rate_limiter
+        if limiter is not None and is_rate_limit_error(error):
+            limiter.penalize(retry_after_seconds(error))
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.record_failure(error)
+
+    def _request_messages(self, user_input: Optional[str] = None) -> List[Dict[str, str]]:
+        """Messages of the next request, fitted into the token budget of the model.
+
+        System and educational prompts and the latest turns are always sent,
+        older turns are trimmed by the `global.context` policy. The dialog
+        history itself is left intact.
+
+        Args:
+            user_input: Current user request (not added to permanent context)
+
+        Returns:
+            New list of messages for the request body
+        """
+        from penguin_tamer.llm_clients.context_window import ContextSettings, fit_messages, pinned_count
+
+        messages = list(self.messages)
+        if user_input:
+            messages.append({"role": "user", "content": user_input})
+        messages, self.last_context_trim = fit_messages(
+            messages, pinned_count(self.messages), ContextSettings.from_config(self.model)
+        )
+        return messages
+
+    def _encode_body(self, api_params: dict) -> bytes:
+        """JSON body of a request, only messages new since the previous request are encoded.
+
+        Args:
+            api_params: Request body from _prepare_api_params()
+
+        Returns:
+            UTF-8 encoded JSON for the transport
+        """
+        if self._body_encoder is None:
+            from penguin_tamer.llm_clients.request_encoder import RequestBodyEncoder
+            self._body_encoder = RequestBodyEncoder()
+        return self._body_encoder.encode(api_params)
+
+    def _estimated_usage(self, metrics, reply: str) -> Optional[dict]:
+        """Usage estimated locally for a reply whose provider reported none.
+
+        Args:
+            metrics: RequestMetrics carrying the estimated prompt tokens of the request
+            reply: Complete reply text
+
+        Returns:
+            Usage dict marked `estimated`, None if usage was reported or nothing was sent
+        """
+        from penguin_tamer.llm_clients.token_estimator import count_text_tokens
+
+        if metrics.prompt_tokens is not None or metrics.estimated_prompt_tokens is None or metrics.cached:
+            return None
+        metrics.usage_estimated = True
+        return {
+            'prompt_tokens': metrics.estimated_prompt_tokens,
+            'completion_tokens': count_text_tokens(reply),
+            'estimated': True,
+        }
+
+    def _stream_url(self) -> Optional[str]:
+        """Streaming endpoint URL if requests go through `session`, None otherwise."""
+        return None
+
+    def start_warmup(self) -> None:
+        """Open a connection to the provider in the background.
+
+        Called while the dialog waits for input, so the next request finds
+        a ready connection in the pool. No-op for transports not using
+        `session` or when disabled in the network settings.
+        """
+        from penguin_tamer.llm_clients.warmup import ConnectionWarmer
+
+        self.stop_warmup()
+        url = self._stream_url()
+        settings = self.network_settings
+        if not url or not settings.warmup or not settings.keep_alive:
+            self._warmer = None
+            return
+        self._warmer = ConnectionWarmer(
+            self.session, url,
+            connect_timeout=settings.connect_timeout,
+            refresh_interval=settings.warmup_refresh,
+        ).start()
+
+    def stop_warmup(self) -> None:
+        """Stop refreshing the warmed connection (it stays in the pool)."""
+        if self._warmer is not None:
+            self._warmer.stop()
+
+    def take_warmup_savings(self) -> Optional[float]:
+        """Connection setup time saved for the request about to be sent.
+
+        Returns:
+            Seconds of DNS/TCP/TLS setup done by the warm-up, None if there
+            is no usable warmed connection. Consumed by the first request.
+        """
+        warmer, self._warmer = self._warmer, None
+        if warmer is None:
+            return None
+        warmer.stop()
+        return warmer.saved_time()
+
+    def close(self) -> None:
+        """Close pooled connections of the client."""
+        self.stop_warmup()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.hedge_client is not None:
+            self.hedge_client.close()
+        for client in self.fallback_clients:
+            client.close()
+        if self.summarizer is not None:
+            self.summarizer.close()
+
     # === Служебные методы (общие для всех клиентов) ===
 
     def set_demo_manager(self, demo_manager):
@@ -125,6 +375,8 @@ class AbstractLLMClient(ABC):
             educational_prompt: Educational messages to add
         """
         self.messages.extend(educational_prompt)
+        if hasattr(self.messages, "pin"):
+            self.messages.pin()
 
     @classmethod
     def create(cls, console, api_key: str, api_url: str, model: str,
@@ -155,7 +407,12 @@ class AbstractLLMClient(ABC):
             return
             
         if self.total_requests == 0:
-            self.console.print("\n[yellow]⚠️  No token usage data collected (API may not provide usage statistics)[/yellow]\n")
+            self.console.print(
+                "\n[yellow]⚠️  No token usage data collected (API may not provide usage statistics)[/yellow]"
+            )
+            self._print_latency_statistics()
+            self._print_render_cache_statistics()
+            self.console.print()
             return
             
         total_tokens = self.total_prompt_tokens + self.total_completion_tokens
@@ -165,6 +422,7 @@ class AbstractLLMClient(ABC):
         self.console.print(f"[cyan]Prompt tokens:[/cyan] {self.total_prompt_tokens:,}")
         self.console.print(f"[cyan]Completion tokens:[/cyan] {self.total_completion_tokens:,}")
         self.console.print(f"[bold cyan]Total tokens:[/bold cyan] {total_tokens:,}")
+        self._print_estimate_statistics()
         
         # Show rate limits if available
         if self.rate_limit_requests or self.rate_limit_tokens:
@@ -176,8 +434,126 @@ class AbstractLLMClient(ABC):
                 remaining = self.rate_limit_remaining_tokens or "?"
                 self.console.print(f"[cyan]Tokens:[/cyan] {remaining:,}/{self.rate_limit_tokens:,} remaining")
         
+        self._print_latency_statistics()
+        self._print_render_cache_statistics()
+
         self.console.print()  # Empty line at the end
 
+    def _print_estimate_statistics(self) -> None:
+        """Print how many totals are local estimates and how accurate the estimator is."""
+        from penguin_tamer.llm_clients.metrics import summarize_metrics
+
+        summary = summarize_metrics(self.request_metrics)
+        if summary['estimated_usage_requests']:
+            self.console.print(
+                f"[dim]Estimated locally for {summary['estimated_usage_requests']} requests "
+                f"(the provider reported no usage)[/dim]"
+            )
+        if summary['avg_estimate_error'] is not None:
+            self.console.print(
+                f"[cyan]Prompt estimate error (avg):[/cyan] ±{summary['avg_estimate_error']:.1%}"
+            )
+
+    def _print_latency_statistics(self) -> None:
+        """Print summary of per-request latency metrics."""
+        from penguin_tamer.llm_clients.metrics import summarize_metrics
+
+        if not self.request_metrics:
+            return
+
+        summary = summarize_metrics(self.request_metrics)
+
+        def ms(value):
+            return "-" if value is None else f"{value * 1000:,.0f} ms"
+
+        def rate(value):
+            return "-" if value is None else f"{value:,.1f}"
+
+        self.console.print("\n[bold cyan]Latency:[/bold cyan]")
+        self.console.print(f"[cyan]Connect (avg):[/cyan] {ms(summary['avg_connect_time'])}")
+        if summary['warmed_requests']:
+            self.console.print(
+                f"[cyan]Warm-up saved (total):[/cyan] {ms(summary['warmup_saved'])} "
+                f"in {summary['warmed_requests']} requests"
+            )
+        if summary['retries']:
+            self.console.print(
+                f"[cyan]Retries:[/cyan] {summary['retries']} in {summary['retried_requests']} requests, "
+                f"waited {ms(summary['retry_delay'])}"
+            )
+        if summary['throttled_requests']:
+            self.console.print(
+                f"[cyan]Rate limit waits:[/cyan] {ms(summary['throttle_time'])} "
+                f"in {summary['throttled_requests']} requests"
+            )
+        if summary['hedged_requests']:
+            self.console.print(
+                f"[cyan]Hedged requests:[/cyan] {summary['hedged_requests']} "
+                f"(backup answered first in {summary['hedge_backup_wins']})"
+            )
+        if summary['fallback_requests']:
+            self.console.print(f"[cyan]Answered by fallback LLMs:[/cyan] {summary['fallback_requests']} requests")
+        if summary['stalled_requests']:
+            self.console.print(
+                f"[cyan]Stalled streams:[/cyan] {summary['stalled_requests']} requests "
+                f"({summary['truncated_requests']} truncated)"
+            )
+        if summary['cached_requests']:
+            self.console.print(f"[cyan]Replayed from response cache:[/cyan] {summary['cached_requests']} requests")
+        self.console.print(
+            f"[cyan]First chunk (avg/max):[/cyan] {ms(summary['avg_ttft'])} / {ms(summary['max_ttft'])}"
+        )
+        self.console.print(
+            f"[cyan]Speed (avg):[/cyan] {rate(summary['avg_chars_per_second'])} chars/s, "
+            f"{rate(summary['avg_tokens_per_second'])} tokens/s"
+        )
+        self.console.print(
+            f"[cyan]Render (avg/max per frame):[/cyan] {ms(summary['avg_frame_time'])} / "
+            f"{ms(summary['max_frame_time'])} in {summary['frames']:,} frames"
+        )
+        histogram = ", ".join(
+            f"{label}: {count}" for label, count in summary['gap_histogram'].items() if count
+        )
+        self.console.print(f"[cyan]Chunk gaps:[/cyan] {histogram or '-'} (max {ms(summary['max_gap'])})")
+
+    def _store_metrics(self, metrics) -> None:
+        """Keep finished request metrics and append them to the metrics file if enabled.
+
+        Args:
+            metrics: Finished RequestMetrics record
+        """
+        from penguin_tamer.config_manager import config
+        from penguin_tamer.llm_clients.metrics import append_metrics_record
+
+        self.request_metrics.append(metrics)
+
+        metrics_file = config.get("global", "metrics_file", None)
+        if not metrics_file:
+            return
+        try:
+            # Relative names are resolved against the config directory
+            append_metrics_record(metrics, config.user_config_dir / metrics_file)
+        except OSError as e:
+            if config.get("global", "debug", False):
+                self.console.print(f"[dim]Failed to write metrics: {e}[/dim]")
+
+    def _print_render_cache_statistics(self) -> None:
+        """Print hit/miss counters of the shared render cache."""
+        from penguin_tamer.render_cache import get_render_cache
+
+        stats = get_render_cache().stats()
+        if not stats['hits'] and not stats['misses']:
+            return
+        self.console.print("\n[bold cyan]Render Cache:[/bold cyan]")
+        self.console.print(
+            f"[cyan]Hits/misses:[/cyan] {stats['hits']:,}/{stats['misses']:,} "
+            f"({stats['hit_rate']:.0%})"
+        )
+        self.console.print(
+            f"[cyan]Memory:[/cyan] {stats['bytes'] / 1024:,.0f} KB / "
+            f"{stats['max_bytes'] / 1024:,.0f} KB in {stats['entries']:,} entries"
+        )
+
     def __str__(self) -> str:
         """Человекочитаемое представление клиента со всеми полями.
 
@@ -243,24 +619,26 @@ class AbstractLLMClient(ABC):
         except KeyboardInterrupt:
             pass
 
-    def _create_markdown(self, text: str, theme_name: str = "default"):
+    def _create_markdown(self, text: str, theme_name: str = "default", cache_document: bool = False):
         """Создаёт Markdown объект с правильной темой для блоков кода.
         
         Общий метод для всех клиентов. Используется для рендеринга ответов LLM
-        с подсветкой синтаксиса в терминале.
+        с подсветкой синтаксиса в терминале. Отрисовка блоков, текст которых
+        не изменился, берётся из общего кэша рендеринга.
         
         Args:
             text: Текст в формате Markdown
             theme_name: Название темы для подсветки кода
+            cache_document: Кэшировать отрисовку всего текста (неизменяемые блоки)
         
         Returns:
             Rich Markdown объект с применённой темой
         """
-        from rich.markdown import Markdown
+        from penguin_tamer.render_cache import create_markdown
         from penguin_tamer.themes import get_code_theme
         
         code_theme = get_code_theme(theme_name)
-        return Markdown(text, code_theme=code_theme)
+        return create_markdown(text, code_theme=code_theme, cache_document=cache_document)
 
     @contextmanager
     def _managed_spinner(self, initial_message: str):
@@ -371,7 +749,8 @@ class AbstractLLMClient(ABC):
 
     @staticmethod
     @abstractmethod
-    def fetch_models(api_list_url: str, api_key: str = "", model_filter: Optional[str] = None) -> List[Dict[str, str]]:
+    def fetch_models(api_list_url: str, api_key: str = "", model_filter: Optional[str] = None,
+                     session=None) -> List[Dict[str, str]]:
         """Fetch list of available models from provider API.
         
         Static method that can be used without creating client instance.
@@ -380,6 +759,7 @@ class AbstractLLMClient(ABC):
             api_list_url: URL endpoint to fetch models list
             api_key: API key for authentication (optional)
             model_filter: Filter string to match against model id/name (optional)
+            session: Pooled requests.Session (shared provider session if None)
         
         Returns:
             List of model dictionaries: [{"id": "model-id", "name": "Model Name"}, ...]
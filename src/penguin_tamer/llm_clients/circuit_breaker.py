@@ -0,0 +1,198 @@
+"""
+Circuit Breaker - Быстрый отказ запросов к недоступному провайдеру.
+
+Когда провайдер лежит, каждый ход диалога ждал полный таймаут
+соединения, прежде чем показать ошибку. После нескольких сбоев подряд
+(обрыв, таймаут, 5xx) предохранитель провайдера размыкается: запросы
+отклоняются сразу и уходят к резервным LLM. После паузы пропускается
+один пробный запрос; успех замыкает предохранитель, сбой снова
+размыкает его. Состояние хранится в каталоге конфигурации недолгое
+время, чтобы новый запуск `pt` не повторял тот же таймаут.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from penguin_tamer.error_handlers import CircuitOpenError, ErrorHandler
+
+
+# File with breaker states in the config dir
+STATE_FILE_NAME = "circuit_breakers.json"
+
+
+class CircuitBreaker:
+    """Consecutive failure counter of one provider.
+
+    Closed: requests pass. Open: requests fail with CircuitOpenError until
+    `cooldown` has passed, then one probe passes (half-open) while the
+    rest keep failing fast. A probe that never reports back (interrupted
+    request) is replaced by a new one after another cool-down.
+    """
+
+    def __init__(self, provider: str, failures: int = 3, cooldown: float = 30.0, ttl: float = 300.0,
+                 state_file: Optional[Path] = None, clock: Callable[[], float] = time.time):
+        """Initialize breaker, restoring a saved state younger than `ttl`.
+
+        Args:
+            provider: Provider key (API host)
+            failures: Consecutive failures that open the breaker (0 - never)
+            cooldown: Seconds before a probe is allowed through an open breaker
+            ttl: Seconds a saved state stays valid for new processes
+            state_file: JSON file shared by all providers, None - keep in memory
+            clock: Wall clock (saved states are compared across processes)
+        """
+        self.provider = provider
+        self.failures = failures
+        self.cooldown = cooldown
+        self.ttl = ttl
+        self.state_file = state_file
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+        self._load()
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open" (a probe may pass or is in flight)."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if self._clock() < self._opened_at + self.cooldown else "half_open"
+
+    def before_request(self) -> None:
+        """Admit a request or fail fast.
+
+        Raises:
+            CircuitOpenError: Breaker is open, or a probe is already in flight
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = self._clock()
+            ready_at = max(self._opened_at, self._probe_at or 0.0) + self.cooldown
+            if now < ready_at:
+                raise CircuitOpenError(
+                    f"{self.provider} is unavailable, next attempt in {ready_at - now:.0f} s",
+                    provider=self.provider, retry_in=ready_at - now
+                )
+            # This request is the probe, others wait for its outcome
+            self._probe_at = now
+
+    def record_success(self) -> None:
+        """Close the breaker after a response from the provider."""
+        with self._lock:
+            changed = self._consecutive or self._opened_at is not None
+            self._consecutive = 0
+            self._opened_at = self._probe_at = None
+        if changed:
+            self._save()
+
+    def record_failure(self, error: Exception) -> None:
+        """Count a failure, opening the breaker after `failures` in a row.
+
+        Errors that are not outages (see ErrorHandler.is_outage_error) are ignored.
+        """
+        if self.failures <= 0 or not ErrorHandler.is_outage_error(error):
+            return
+        with self._lock:
+            self._consecutive += 1
+            if self._probe_at is not None or self._consecutive >= self.failures:
+                # A failed probe restarts the cool-down
+                self._opened_at = self._clock()
+                self._probe_at = None
+        self._save()
+
+    def _load(self) -> None:
+        entry = _read_states(self.state_file).get(self.provider)
+        if not isinstance(entry, dict):
+            return
+        try:
+            updated_at = float(entry["updated_at"])
+            consecutive = int(entry.get("failures", 0))
+            opened_at = entry.get("opened_at")
+            opened_at = None if opened_at is None else float(opened_at)
+        except (KeyError, TypeError, ValueError):
+            return
+        if self._clock() - updated_at > self.ttl:
+            return
+        self._consecutive = consecutive
+        self._opened_at = opened_at
+
+    def _save(self) -> None:
+        if self.state_file is None:
+            return
+        with self._lock:
+            entry = {"failures": self._consecutive, "opened_at": self._opened_at, "updated_at": self._clock()}
+        with _file_lock:
+            states = _read_states(self.state_file)
+            if entry["failures"] or entry["opened_at"] is not None:
+                states[self.provider] = entry
+            elif states.pop(self.provider, None) is None:
+                return
+            _write_states(self.state_file, states)
+
+
+_file_lock = threading.Lock()
+
+
+def _read_states(path: Optional[Path]) -> dict:
+    if path is None:
+        return {}
+    try:
+        states = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return states if isinstance(states, dict) else {}
+
+
+def _write_states(path: Path, states: dict) -> None:
+    # Written aside and renamed, a concurrent `pt` never reads half a file
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(states), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str, settings) -> CircuitBreaker:
+    """Process-wide circuit breaker of a provider.
+
+    Args:
+        provider: Provider key (API host)
+        settings: NetworkSettings with breaker thresholds
+
+    Returns:
+        CircuitBreaker shared by all clients of the provider
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(
+                provider,
+                failures=settings.breaker_failures,
+                cooldown=settings.breaker_cooldown,
+                ttl=settings.breaker_ttl,
+                state_file=_state_file(),
+            )
+        else:
+            breaker.failures = settings.breaker_failures
+            breaker.cooldown = settings.breaker_cooldown
+        return breaker
+
+
+def _state_file() -> Optional[Path]:
+    from penguin_tamer.config_manager import config
+
+    config_dir = getattr(config, "user_config_dir", None)
+    return Path(config_dir) / STATE_FILE_NAME if config_dir else None
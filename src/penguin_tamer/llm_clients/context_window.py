@@ -0,0 +1,207 @@
+"""
+Context Window - Бюджет токенов истории диалога.
+
+Клиент отправлял всю историю диалога с каждым запросом: длинная сессия
+с выводом команд переполняла окно модели и дорожала с каждым ходом.
+Перед каждым запросом _prepare_api_params() вписывает сообщения в
+бюджет токенов модели. Системный и обучающий промпты и последние ходы
+отправляются всегда; более старые ходы по политике из конфигурации
+удаляются, сокращаются или заменяются кратким изложением. История
+самого клиента не меняется, сокращается только тело запроса.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from penguin_tamer.llm_clients.token_estimator import count_message_tokens
+
+
+# Policies for turns that do not fit the budget
+POLICIES = ("drop", "truncate", "summarize")
+
+# Characters kept at each end of a truncated message
+_TRUNCATE_KEEP_CHARS = 400
+
+# Characters of a user request quoted in the summary of dropped turns
+_SUMMARY_REQUEST_CHARS = 120
+
+# Start of the note that replaces old turns (see summarizer)
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+_TRUNCATED_MARKER = "\n[... {count} characters trimmed ...]\n"
+_SUMMARY_HEADER = "Earlier turns of this conversation were removed to save context. The user asked:"
+
+
+class MessageHistory(list):
+    """Dialog messages that know how many leading messages are pinned.
+
+    The list is shared by reference between the main, fallback, hedge and
+    fan-out clients, so the pinned prefix (system and educational prompts)
+    travels with it instead of being stored per client.
+    """
+
+    def __init__(self, messages=(), pinned: Optional[int] = None):
+        super().__init__(messages)
+        self.pinned = len(self) if pinned is None else pinned
+
+    def pin(self) -> None:
+        """Pin all current messages, they are sent with every request."""
+        self.pinned = len(self)
+
+
+@dataclass(frozen=True)
+class ContextSettings:
+    """Token budget from the `global.context` config section."""
+    budget: int = 32000      # Tokens of the request messages (0 - unlimited)
+    policy: str = "truncate"
+    keep_turns: int = 3      # Latest turns sent in full, the current request included
+
+    @classmethod
+    def from_config(cls, model: Optional[str] = None) -> "ContextSettings":
+        """Read settings, `models` overrides the budget per model, invalid values keep their defaults."""
+        from penguin_tamer.config_manager import config
+
+        section = config.get("global", "context", None) or {}
+        values = {}
+        budget = section.get("budget")
+        model_budgets = section.get("models") or {}
+        if model and isinstance(model_budgets, dict) and model in model_budgets:
+            budget = model_budgets[model]
+        for name, value in (("budget", budget), ("keep_turns", section.get("keep_turns"))):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                continue
+            if value >= 0:
+                values[name] = value
+        if section.get("policy") in POLICIES:
+            values["policy"] = section["policy"]
+        return cls(**values)
+
+
+@dataclass
+class ContextTrim:
+    """What was removed from the messages of one request."""
+    dropped_turns: int = 0
+    truncated_messages: int = 0
+    summarized: bool = False
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def trimmed(self) -> bool:
+        return self.dropped_turns > 0 or self.truncated_messages > 0
+
+
+def pinned_count(messages: List[Dict[str, str]]) -> int:
+    """Number of leading messages that are never trimmed.
+
+    Plain lists (clients not created through the dialog) pin their
+    leading system messages.
+    """
+    pinned = getattr(messages, "pinned", None)
+    if pinned is not None:
+        return min(pinned, len(messages))
+    count = 0
+    while count < len(messages) and messages[count].get("role") == "system":
+        count += 1
+    return count
+
+
+def fit_messages(messages: List[Dict[str, str]], pinned: int,
+                 settings: ContextSettings) -> Tuple[List[Dict[str, str]], ContextTrim]:
+    """Fit request messages into the token budget.
+
+    Messages after the pinned prefix are grouped into turns, each starting
+    with a user message (a command result is part of the turn of its
+    command). The latest `keep_turns` turns are never changed.
+
+    Args:
+        messages: Request messages, the current user request last
+        pinned: Leading messages that are always sent
+        settings: Budget and policy
+
+    Returns:
+        Tuple of (messages to send, trim report)
+    """
+    costs = [count_message_tokens(message) for message in messages]
+    trim = ContextTrim(tokens_before=sum(costs), tokens_after=sum(costs))
+    if settings.budget <= 0 or trim.tokens_before <= settings.budget:
+        return messages, trim
+
+    # The summary of earlier turns is what remains of them, it is kept like the prompts
+    if pinned < len(messages) and _is_summary(messages[pinned]):
+        pinned += 1
+    head = list(messages[:pinned])
+    turns = split_turns(messages[pinned:])
+    kept = turns[len(turns) - settings.keep_turns:] if settings.keep_turns else []
+    older = turns[:len(turns) - len(kept)]
+    if not older:
+        return messages, trim
+
+    total = trim.tokens_before
+    if settings.policy == "truncate":
+        for turn in older:
+            for index, message in enumerate(turn):
+                if total <= settings.budget:
+                    break
+                shortened = _truncate(message)
+                if shortened is not None:
+                    total += count_message_tokens(shortened) - count_message_tokens(message)
+                    turn[index] = shortened
+                    trim.truncated_messages += 1
+
+    dropped = []
+    while older and total > settings.budget:
+        turn = older.pop(0)
+        dropped.append(turn)
+        total -= sum(count_message_tokens(message) for message in turn)
+    trim.dropped_turns = len(dropped)
+
+    if dropped and settings.policy == "summarize":
+        head.append(_summary(dropped))
+        trim.summarized = True
+
+    fitted = head + [message for turn in older + kept for message in turn]
+    trim.tokens_after = sum(count_message_tokens(message) for message in fitted)
+    return fitted, trim
+
+
+def split_turns(messages: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+    turns: List[List[Dict[str, str]]] = []
+    for message in messages:
+        if message.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _is_summary(message: Dict[str, str]) -> bool:
+    content = message.get("content")
+    return message.get("role") == "system" and isinstance(content, str) and content.startswith(SUMMARY_PREFIX)
+
+
+def _truncate(message: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Message with the middle of its text cut out, None if it is short."""
+    content = message.get("content")
+    if not isinstance(content, str) or len(content) <= _TRUNCATE_KEEP_CHARS * 3:
+        return None
+    removed = len(content) - 2 * _TRUNCATE_KEEP_CHARS
+    marker = _TRUNCATED_MARKER.format(count=removed)
+    text = content[:_TRUNCATE_KEEP_CHARS] + marker + content[-_TRUNCATE_KEEP_CHARS:]
+    return {**message, "content": text}
+
+
+def _summary(turns: List[List[Dict[str, str]]]) -> Dict[str, str]:
+    """System message listing the user requests of dropped turns."""
+    lines = [_SUMMARY_HEADER]
+    for turn in turns:
+        request = next((m.get("content") for m in turn if m.get("role") == "user"), None)
+        if isinstance(request, str) and request.strip():
+            first_line = request.strip().splitlines()[0]
+            lines.append(f"- {first_line[:_SUMMARY_REQUEST_CHARS]}")
+    return {"role": "system", "content": "\n".join(lines)}
@@ -7,10 +7,11 @@ Client Factory - Фабрика для создания клиентов LLM н
 
 from typing import List, Dict
 from penguin_tamer.llm_clients.base import AbstractLLMClient, LLMConfig
-from penguin_tamer.llm_clients.openrouter_client import OpenRouterClient
-from penguin_tamer.llm_clients.openai_client import OpenAIClient
-from penguin_tamer.llm_clients.pollinations_client import PollinationsClient
-from penguin_tamer.llm_clients.mistral_client import MistralClient
+from penguin_tamer.llm_clients.async_base import AbstractAsyncLLMClient
+from penguin_tamer.llm_clients.openrouter_client import OpenRouterClient, AsyncOpenRouterClient
+from penguin_tamer.llm_clients.openai_client import OpenAIClient, AsyncOpenAIClient
+from penguin_tamer.llm_clients.pollinations_client import PollinationsClient, AsyncPollinationsClient
+from penguin_tamer.llm_clients.mistral_client import MistralClient, AsyncMistralClient
 
 
 class ClientFactory:
@@ -24,13 +25,22 @@ class ClientFactory:
         'mistral': MistralClient,
     }
 
+    # Mapping client_name -> async Client class
+    _ASYNC_CLIENT_REGISTRY = {
+        'openrouter': AsyncOpenRouterClient,
+        'openai': AsyncOpenAIClient,
+        'pollinations': AsyncPollinationsClient,
+        'mistral': AsyncMistralClient,
+    }
+
     @classmethod
     def create_client(
         cls,
         client_name: str,
         console: object,
         system_message: List[Dict[str, str]],
-        llm_config: LLMConfig
+        llm_config: LLMConfig,
+        asynchronous: bool = False
     ) -> AbstractLLMClient:
         """Create LLM client based on client_name.
 
@@ -39,6 +49,8 @@ class ClientFactory:
             console: Rich console instance
             system_message: System messages for LLM
             llm_config: Complete LLM configuration
+            asynchronous: Create AbstractAsyncLLMClient flavor (astream/aask,
+                sync ask_stream still available)
 
         Returns:
             Concrete LLM client instance
@@ -46,16 +58,17 @@ class ClientFactory:
         Raises:
             ValueError: If client_name is not recognized
         """
+        registry = cls._ASYNC_CLIENT_REGISTRY if asynchronous else cls._CLIENT_REGISTRY
         client_name_lower = client_name.lower()
 
-        if client_name_lower not in cls._CLIENT_REGISTRY:
-            available = ', '.join(cls._CLIENT_REGISTRY.keys())
+        if client_name_lower not in registry:
+            available = ', '.join(registry.keys())
             raise ValueError(
                 f"Unknown client_name: '{client_name}'. "
                 f"Available clients: {available}"
             )
 
-        client_class = cls._CLIENT_REGISTRY[client_name_lower]
+        client_class = registry[client_name_lower]
         return client_class(
             console=console,
             system_message=system_message,
@@ -75,6 +88,8 @@ class ClientFactory:
     def register_client(cls, name: str, client_class: type):
         """Register a new client implementation (for extensions/plugins).
 
+        Subclasses of AbstractAsyncLLMClient are registered as the async flavor.
+
         Args:
             name: Client name (lowercase)
             client_class: Client class (must inherit from AbstractLLMClient)
@@ -84,7 +99,10 @@ class ClientFactory:
                 f"Client class must inherit from AbstractLLMClient, "
                 f"got {client_class.__name__}"
             )
-        cls._CLIENT_REGISTRY[name.lower()] = client_class
+        if issubclass(client_class, AbstractAsyncLLMClient):
+            cls._ASYNC_CLIENT_REGISTRY[name.lower()] = client_class
+        else:
+            cls._CLIENT_REGISTRY[name.lower()] = client_class
 
     @classmethod
     def get_client_for_static_methods(cls, client_name: str) -> type:
@@ -0,0 +1,251 @@
+"""
+Fan-out - Один запрос сразу к нескольким LLM.
+
+Запрос отправляется всем выбранным моделям параллельно через асинхронные
+клиенты, ответы отрисовываются в панелях друг под другом или в колонках
+с TTFT и скоростью каждой модели. Общее ожидание определяется самой
+медленной моделью, а не суммой. Выбранный пользователем ответ продолжает
+диалог: все клиенты разделяют один список сообщений.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from rich.console import Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from penguin_tamer.error_handlers import ErrorHandler
+from penguin_tamer.i18n import t
+from penguin_tamer.themes import get_code_theme
+from penguin_tamer.llm_clients.metrics import RequestMetrics
+from penguin_tamer.llm_clients.stream_reader import CONTENT
+from penguin_tamer.llm_clients.token_estimator import count_text_tokens
+
+
+# Minimal panel width for side-by-side layout in "auto" mode
+_MIN_COLUMN_WIDTH = 40
+
+
+@dataclass
+class FanOutLane:
+    """State of one model's answer during a fan-out request.
+
+    Timings and token counts are read from the RequestMetrics record of
+    the request, the same one the client stores for `/stats`.
+    """
+    label: str
+    client: object
+    parts: List[str] = field(default_factory=list)
+    status: str = "pending"  # pending, streaming, ok, empty, error, interrupted
+    error: Optional[str] = None
+    metrics: Optional[RequestMetrics] = None
+
+    def __post_init__(self):
+        if self.metrics is None:
+            self.metrics = RequestMetrics(model=getattr(self.client, "model", ""))
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return self.metrics.ttft
+
+    @property
+    def total_time(self) -> Optional[float]:
+        return self.metrics.total_time
+
+    @property
+    def completion_tokens(self) -> Optional[int]:
+        return self.metrics.completion_tokens
+
+    def add_content(self, content: str) -> None:
+        self.status = "streaming"
+        self.parts.append(content)
+
+    def finish(self, status: str) -> None:
+        self.status = status
+
+    def tokens_per_second(self) -> Tuple[Optional[float], bool]:
+        """Generation speed after the first chunk.
+
+        Returns:
+            Tuple of (tokens per second or None, estimated) - tokens are
+            estimated locally while the provider has reported no usage
+        """
+        duration = self.metrics.generation_time
+        if not duration:
+            return None, False
+        if self.metrics.completion_tokens:
+            return self.metrics.completion_tokens / duration, self.metrics.usage_estimated
+        return count_text_tokens(self.text) / duration, True
+
+
+class FanOut:
+    """Sends one prompt to several async clients and renders all answers live.
+
+    Clients share the message list of the main client, so the chosen answer
+    (and executed commands added to the main client) continue the dialog
+    for every model. A private event loop is kept between turns, so pooled
+    connections of the async clients are reused.
+    """
+
+    def __init__(self, console, clients: List[Tuple[str, object]], messages: list,
+                 layout: str = "auto", refresh_per_second: float = 10, theme_name: str = "default"):
+        """Initialize fan-out.
+
+        Args:
+            console: Rich console for output
+            clients: List of (label, AbstractAsyncLLMClient)
+            messages: Shared dialog messages (list of the main client)
+            layout: "stacked", "columns" or "auto" (columns if wide enough)
+            refresh_per_second: Maximum redraws per second
+            theme_name: Markdown theme name, mapped to its code theme like in single replies
+        """
+        self.console = console
+        self.clients = clients
+        self.messages = messages
+        self.layout = layout
+        self.refresh_per_second = max(float(refresh_per_second or 10), 1.0)
+        self.code_theme = get_code_theme(theme_name)
+        self.lanes: List[FanOutLane] = []
+        self._loop = asyncio.new_event_loop()
+        for _, client in clients:
+            client.messages = messages
+
+    def ask(self, user_input: str) -> List[FanOutLane]:
+        """Stream answers of all models concurrently.
+
+        Messages are not changed, call `choose()` with the answer that
+        should continue the dialog.
+
+        Args:
+            user_input: User query
+
+        Returns:
+            Lanes with answers, statuses and speeds in client order
+
+        Raises:
+            KeyboardInterrupt: Ctrl+C, all requests are cancelled
+        """
+        self.lanes = [FanOutLane(label, client) for label, client in self.clients]
+        task = self._loop.create_task(self._run(user_input))
+        try:
+            self._loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            # Cancel streams and let them close their connections
+            task.cancel()
+            try:
+                self._loop.run_until_complete(task)
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                pass
+            raise
+        return self.lanes
+
+    def choose(self, lane: FanOutLane, user_input: str) -> str:
+        """Continue the dialog with the given answer.
+
+        Args:
+            lane: Lane returned by `ask()`
+            user_input: Query the answer belongs to
+
+        Returns:
+            Text of the chosen answer
+        """
+        reply = lane.text
+        self.messages.append({"role": "user", "content": user_input})
+        self.messages.append({"role": "assistant", "content": reply})
+        return reply
+
+    def fastest(self) -> Optional[FanOutLane]:
+        """Successful lane that finished first (default choice)."""
+        done = [lane for lane in self.lanes if lane.status == "ok"]
+        return min(done, key=lambda lane: lane.total_time) if done else None
+
+    def close(self) -> None:
+        """Close connections of all clients and the event loop."""
+        for _, client in self.clients:
+            self._loop.run_until_complete(client.aclose())
+        self._loop.close()
+
+    async def _run(self, user_input: str) -> None:
+        """Stream all lanes and redraw panels until the slowest one finishes."""
+        tasks = [asyncio.ensure_future(self._stream_lane(lane, user_input)) for lane in self.lanes]
+        try:
+            with Live(self._render(), console=self.console, auto_refresh=False) as live:
+                pending = set(tasks)
+                while pending:
+                    _, pending = await asyncio.wait(pending, timeout=1 / self.refresh_per_second)
+                    live.update(self._render(), refresh=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _stream_lane(self, lane: FanOutLane, user_input: str) -> None:
+        """Read one model's stream into its lane."""
+        try:
+            async for kind, payload in lane.client.astream(user_input, add_to_context=False, metrics=lane.metrics):
+                if kind == CONTENT:
+                    lane.add_content(payload)
+        except asyncio.CancelledError:
+            lane.finish("interrupted")
+            raise
+        except Exception as e:
+            lane.error = ErrorHandler().handle(e)
+            lane.finish("error")
+            return
+        lane.finish("ok" if lane.text.strip() else "empty")
+
+    def _use_columns(self) -> bool:
+        if self.layout == "columns":
+            return True
+        if self.layout == "stacked":
+            return False
+        return self.console.width // max(len(self.lanes), 1) >= _MIN_COLUMN_WIDTH
+
+    def _render(self):
+        """Panels of all lanes in the configured layout."""
+        from penguin_tamer.render_cache import create_markdown
+
+        panels = []
+        for number, lane in enumerate(self.lanes, 1):
+            if lane.error:
+                body = Text.from_markup(lane.error)
+            elif lane.parts:
+                # Finished answers are redrawn unchanged every frame
+                body = create_markdown(lane.text, self.code_theme, cache_document=lane.status != "streaming")
+            else:
+                body = Text(t("Waiting for the first chunk..."), style="dim italic")
+            panels.append(Panel(
+                body,
+                title=f"[bold]{number}. {lane.label}[/bold]",
+                subtitle=self._lane_stats(lane),
+                border_style="green" if lane.status == "ok" else ("red" if lane.status == "error" else "cyan"),
+            ))
+
+        if not self._use_columns():
+            return Group(*panels)
+        grid = Table.grid(expand=True, padding=(0, 1))
+        for _ in panels:
+            grid.add_column(ratio=1)
+        grid.add_row(*panels)
+        return grid
+
+    @staticmethod
+    def _lane_stats(lane: FanOutLane) -> str:
+        """TTFT and speed line shown under a panel."""
+        parts = []
+        if lane.ttft is not None:
+            parts.append(f"TTFT {lane.ttft * 1000:,.0f} ms")
+        speed, estimated = lane.tokens_per_second()
+        if speed is not None:
+            parts.append(f"{'~' if estimated else ''}{speed:,.1f} tok/s")
+        if lane.total_time is not None:
+            parts.append(f"{lane.total_time:.1f} s")
+        return "[dim]" + " · ".join(parts) + "[/dim]" if parts else ""
@@ -0,0 +1,113 @@
+"""
+Hedging - Дублирование медленных запросов на резервную LLM.
+
+Бесплатные провайдеры иногда молчат 10-20 секунд до первого чанка. Если
+первый чанк не пришёл за настроенное время, тот же запрос отправляется
+резервной LLM; побеждает поток, ответивший первым, проигравший закрывается
+вместе с соединением. Хвост задержки (p95 TTFT) важнее редкого
+дублированного запроса.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from penguin_tamer.llm_clients.stream_reader import StreamReader
+
+
+@dataclass(frozen=True)
+class HedgeSettings:
+    """Hedging policy from the `global.hedging` config section."""
+    after: float = 0.0  # Seconds without the first chunk before the backup request (0 - off)
+    llm: str = ""       # Backup LLM ID from supported_LLMs
+
+    @property
+    def enabled(self) -> bool:
+        return self.after > 0 and bool(self.llm)
+
+    @classmethod
+    def from_config(cls) -> "HedgeSettings":
+        """Read settings, invalid values turn hedging off."""
+        from penguin_tamer.config_manager import config
+
+        hedging = config.get("global", "hedging", None) or {}
+        try:
+            after = float(hedging.get("after") or 0)
+        except (TypeError, ValueError):
+            after = 0.0
+        return cls(after=max(after, 0.0), llm=str(hedging.get("llm") or "").strip())
+
+
+class DeferredStream:
+    """Provider stream opened on first iteration, i.e. in the reader thread.
+
+    Lets the backup request connect without blocking the wait for the
+    primary stream. `close()` may be called before the stream is open,
+    it is then closed as soon as the connection completes.
+    """
+
+    def __init__(self, client, api_params: dict, metrics=None, throttle: bool = True):
+        """Initialize stream.
+
+        Args:
+            client: LLM client sending the request
+            api_params: Request body from client._prepare_api_params()
+            metrics: Optional RequestMetrics marked connected on open
+            throttle: Wait for the provider's rate limits before sending
+                (False if the caller already did)
+        """
+        self.client = client
+        self.api_params = api_params
+        self.metrics = metrics
+        self.throttle = throttle
+        self.stream = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        if self.throttle:
+            throttled = self.client._throttle(self.api_params)
+            if self.metrics is not None:
+                self.metrics.throttled = throttled
+        stream = self.client._create_stream(self.api_params)
+        with self._lock:
+            self.stream = stream
+            closed = self._closed
+        if closed:
+            self._close_stream(stream)
+            return
+        if self.metrics is not None:
+            self.metrics.mark_connected()
+        self.client._observe_rate_limits(stream)
+        self.client._observe_connected()
+        yield from stream
+
+    def close(self) -> None:
+        """Close the stream now or right after it opens."""
+        with self._lock:
+            self._closed = True
+            stream = self.stream
+        if stream is not None:
+            self._close_stream(stream)
+
+    @staticmethod
+    def _close_stream(stream) -> None:
+        close = getattr(stream, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+
+@dataclass
+class HedgeLane:
+    """One of the racing streams of a hedged request."""
+    role: str  # "primary" or "backup"
+    client: object
+    reader: StreamReader
+    metrics: object
+    stop_event: threading.Event
+    usage: List[dict] = field(default_factory=list)  # Usage received before the first chunk
+    error: Optional[Exception] = None
+    done: bool = False
@@ -0,0 +1,227 @@
+"""
+HTTP Session - Пулы HTTP-соединений для клиентов LLM.
+
+Каждый клиент владеет долгоживущей сессией requests с пулом keep-alive
+соединений, поэтому DNS, TCP и TLS рукопожатие выполняются один раз,
+а следующие запросы диалога и загрузки списка моделей переиспользуют
+открытое соединение. Размер пула, keep-alive и таймауты подключения
+и чтения настраиваются в секции `network` конфигурации.
+"""
+
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from penguin_tamer.utils.lazy_import import lazy_import
+
+
+# Ленивый импорт requests для работы с API
+@lazy_import
+def get_requests_module():
+    """Ленивый импорт requests для API запросов"""
+    import requests
+    return requests
+
+
+# Ленивый импорт sseclient для SSE streaming
+@lazy_import
+def get_sseclient_module():
+    """Ленивый импорт sseclient для SSE streaming"""
+    import sseclient
+    return sseclient
+
+
+# Model lists are small, waiting longer than this means the endpoint is stuck
+_MODELS_READ_TIMEOUT = 10.0
+
+# Settings where 0 is meaningful (turns the feature off)
+_ZERO_ALLOWED = frozenset({"retries", "breaker_failures"})
+
+
+@dataclass(frozen=True)
+class NetworkSettings:
+    """Connection pool and timeout settings of one provider."""
+    pool_size: int = 4              # Kept-alive connections per host
+    keep_alive: bool = True         # Reuse connections between requests
+    connect_timeout: float = 10.0   # Seconds to establish a connection
+    read_timeout: float = 600.0     # Seconds without data while reading a response
+    first_byte_timeout: float = 90.0  # Seconds from sending a streaming request to its first chunk
+    idle_timeout: float = 60.0      # Seconds without chunks before a started stream counts as stalled
+    continue_on_stall: bool = False  # Ask the model to continue a reply cut by a stall
+    warmup: bool = True             # Open a connection while the dialog waits for input
+    warmup_refresh: float = 50.0    # Seconds before the warmed connection is reopened
+    rate_limit: bool = True         # Delay requests that would exceed the provider's limits
+    rate_limit_window: float = 60.0  # Seconds in which a reported limit is restored
+    rate_limit_max_wait: float = 60.0  # Longest delay before a request fails instead of waiting
+    retries: int = 2                # Attempts after a recoverable error before the first chunk (0 - off)
+    retry_backoff: float = 0.5      # Base delay of the first retry, doubled every attempt
+    retry_max_backoff: float = 8.0  # Upper bound of a single delay without Retry-After
+    retry_max_delay: float = 20.0   # Total seconds a request may wait between attempts
+    breaker_failures: int = 3       # Consecutive outages that make requests fail fast (0 - off)
+    breaker_cooldown: float = 30.0  # Seconds before a probe request is sent to a failed provider
+    breaker_ttl: float = 300.0      # Seconds a failure state is kept for new `pt` runs
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout pair for streaming requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def sdk_timeout(self):
+        """httpx.Timeout for OpenAI SDK clients (httpx is a dependency of the SDK)."""
+        import httpx
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    @property
+    def models_timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout pair for model list requests."""
+        return (self.connect_timeout, min(self.read_timeout, _MODELS_READ_TIMEOUT))
+
+    @classmethod
+    def from_config(cls, provider: Optional[str] = None) -> "NetworkSettings":
+        """Read settings from `global.network`, applying per-provider overrides.
+
+        Args:
+            provider: Client name ("openai", "mistral", ...) to look up in
+                `network.providers`
+
+        Returns:
+            Settings with defaults for missing or invalid values
+        """
+        from penguin_tamer.config_manager import config
+
+        network = config.get("global", "network", None) or {}
+        settings = cls()._updated(network)
+        overrides = (network.get("providers") or {}).get(provider) if provider else None
+        if isinstance(overrides, dict):
+            settings = settings._updated(overrides)
+        return settings
+
+    def _updated(self, values: dict) -> "NetworkSettings":
+        """Copy with known keys taken from a config dict."""
+        changes = {}
+        for f in fields(self):
+            if values.get(f.name) is None:
+                continue
+            try:
+                value = f.type(values[f.name]) if f.type is not bool else bool(values[f.name])
+            except (TypeError, ValueError):
+                continue
+            if f.type is not bool and (value < 0 if f.name in _ZERO_ALLOWED else value <= 0):
+                continue
+            changes[f.name] = value
+        return replace(self, **changes) if changes else self
+
+
+def create_session(settings: NetworkSettings):
+    """Create requests.Session with a keep-alive connection pool.
+
+    Args:
+        settings: Pool size and keep-alive settings
+
+    Returns:
+        requests.Session
+    """
+    requests = get_requests_module()
+    session = requests.Session()
+    # Retries are decided by the caller, the pool only keeps connections
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=settings.pool_size,
+        pool_maxsize=settings.pool_size,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not settings.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+_shared_sessions: Dict[str, object] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_session(provider: str):
+    """Process-wide pooled session for calls made without a client instance.
+
+    Used by static `fetch_models` (settings menu), so repeated model list
+    requests to the same provider reuse connections too.
+
+    Args:
+        provider: Client name
+
+    Returns:
+        requests.Session
+    """
+    with _shared_lock:
+        session = _shared_sessions.get(provider)
+        if session is None:
+            session = create_session(NetworkSettings.from_config(provider))
+            _shared_sessions[provider] = session
+        return session
+
+
+class SSEEventStream:
+    """SSE events of a streaming response with access to the response.
+
+    Exposes `response` (for rate limit headers) and `close()`, closing
+    the response after a fully read stream returns the connection to the pool.
+    """
+
+    def __init__(self, response):
+        """Initialize stream.
+
+        Args:
+            response: Streaming requests.Response with status 2xx
+        """
+        self.response = response
+
+    def __iter__(self) -> Iterator[object]:
+        from penguin_tamer.llm_clients.native_transport import _translate_request_error
+
+        try:
+            yield from get_sseclient_module().SSEClient(self.response).events()
+        except get_requests_module().exceptions.RequestException as e:
+            raise _translate_request_error(e) from e
+        finally:
+            self.response.close()
+
+    def close(self) -> None:
+        """Close the response (drops the connection if not fully read)."""
+        self.response.close()
+
+
+def open_event_stream(session, url: str, headers: Dict[str, str], body: Union[dict, bytes],
+                      timeout: Tuple[float, float]) -> SSEEventStream:
+    """Send a streaming POST request through a pooled session.
+
+    Args:
+        session: requests.Session of the client
+        url: Streaming endpoint
+        headers: Request headers
+        body: JSON request body, or its encoded bytes (see request_encoder)
+        timeout: (connect, read) timeout pair
+
+    Returns:
+        SSEEventStream of the 2xx response
+
+    Raises:
+        HTTPStatusError: Non-2xx response (with the provider message)
+        TransportConnectionError: Network failure
+        TransportTimeoutError: Connect or read timeout
+    """
+    from penguin_tamer.llm_clients.native_transport import _error_from_response, _translate_request_error
+
+    try:
+        if isinstance(body, (bytes, bytearray)):
+            response = session.post(url, headers=headers, data=body, stream=True, timeout=timeout)
+        else:
+            response = session.post(url, headers=headers, json=body, stream=True, timeout=timeout)
+    except get_requests_module().exceptions.RequestException as e:
+        raise _translate_request_error(e) from e
+    if not response.ok:
+        try:
+            raise _error_from_response(response)
+        finally:
+            response.close()
+    return SSEEventStream(response)
@@ -0,0 +1,409 @@
+"""
+Markdown Stream - Инкрементальный рендеринг Markdown для потоковых ответов.
+
+Завершённые блоки (абзацы, закрытые блоки кода, списки) печатаются в scrollback
+один раз, а в Live-области остаётся только последний, ещё открытый блок.
+Стоимость перерисовки пропорциональна хвосту ответа, а не всему ответу.
+Перерисовки выполняются не чаще заданной частоты кадров независимо от
+скорости поступления чанков.
+"""
+
+import re
+import time
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from rich.console import Group
+from rich.markdown import Markdown, MarkdownElement, UnknownElement
+from rich.text import Text
+
+
+# Opening/closing code fence: up to 3 spaces of indent, 3+ backticks or tildes
+_FENCE_RE = re.compile(r"^( {0,3})(`{3,}|~{3,})(.*)$")
+
+# List item marker at the top level of a block
+_LIST_ITEM_RE = re.compile(r"^ {0,3}(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+
+# HTML blocks that, unlike other blocks, are not terminated by a blank line
+_RAW_HTML_BLOCKS = (
+    (re.compile(r"^ {0,3}<(?:pre|script|style|textarea)(?:\s|>|$)", re.IGNORECASE),
+     re.compile(r"</(?:pre|script|style|textarea)>", re.IGNORECASE)),
+    (re.compile(r"^ {0,3}<!--"), re.compile(r"-->")),
+)
+
+# Link reference definition "[label]: destination"
+_DEFINITION_RE = re.compile(r"^ {0,3}\[((?:[^\]\\]|\\.)+)\]:")
+
+# Full or collapsed reference link "[text][label]" / "[text][]"
+_FULL_REFERENCE_RE = re.compile(r"\[((?:[^\]\\]|\\.)+)\]\[((?:[^\]\\]|\\.)*)\]")
+
+# Inline code span, its content is never a link
+_CODE_SPAN_RE = re.compile(r"(`+).*?\1")
+
+
+def _normalize_label(label: str) -> str:
+    """Link label as CommonMark matches it: case-insensitive, collapsed whitespace."""
+    return " ".join(label.split()).casefold()
+
+
+def _scan_references(text: str) -> Tuple[Set[str], Dict[str, str]]:
+    """Find full/collapsed reference links and link definitions outside code.
+
+    Returns:
+        Tuple of (used labels, definition line by label)
+    """
+    used: Set[str] = set()
+    definitions: Dict[str, str] = {}
+    fence = None
+    for line in text.split("\n"):
+        fence_match = _FENCE_RE.match(line)
+        if fence is not None:
+            if fence_match and fence_match.group(2)[0] == fence[0] and len(fence_match.group(2)) >= len(fence):
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(2)
+            continue
+        if line.startswith(("    ", "\t")):
+            continue
+        definition = _DEFINITION_RE.match(line)
+        if definition:
+            definitions.setdefault(_normalize_label(definition.group(1)), line)
+            continue
+        for link_text, label in _FULL_REFERENCE_RE.findall(_CODE_SPAN_RE.sub("", line)):
+            used.add(_normalize_label(label or link_text))
+    return used, definitions
+
+
+def _flatten_tokens(tokens) -> Iterator:
+    """Flatten token stream the same way `rich.markdown.Markdown` does."""
+    for token in tokens:
+        if token.children and not (token.tag == "img" or token.type == "fence"):
+            yield from _flatten_tokens(token.children)
+        else:
+            yield token
+
+
+def _separator_flags(markdown: Markdown) -> Optional[Tuple[bool, bool]]:
+    """Describe how markdown interacts with Rich's block separators.
+
+    Rich yields an empty line before rendering an element when the element
+    left last had `new_line` set. Containers (lists, quotes, tables) collect
+    their children, so by the time they render one of their own children was
+    left last and a standalone render already contains the separator. Leaf
+    blocks (paragraphs, headings, code) inherit the flag from the previous
+    block, which is lost when blocks are rendered one by one.
+
+    Args:
+        markdown: Parsed markdown of a block
+
+    Returns:
+        Tuple (inherits_separator, ends_with_new_line), or None if markdown
+        contains no top-level elements
+    """
+    elements = markdown.elements
+    inline_tags = markdown.inlines
+    stack = []
+    inherits = None
+    ends_with_new_line = None
+    left_any = False
+
+    for token in _flatten_tokens(markdown.parsed):
+        if token.type in ("text", "hardbreak", "softbreak", "link_open", "link_close"):
+            continue
+        if token.tag in inline_tags and token.type not in ("fence", "code_block"):
+            continue
+
+        if token.nesting == 1:
+            stack.append(elements.get(token.type) or UnknownElement)
+            continue
+
+        element_class = stack.pop() if token.nesting == -1 else (
+            elements.get(token.type) or UnknownElement)
+        renders = not stack or stack[-1].on_child_close is MarkdownElement.on_child_close
+        if renders and inherits is None:
+            inherits = not left_any
+        left_any = True
+        if not stack:
+            ends_with_new_line = element_class.new_line
+
+    if ends_with_new_line is None:
+        return None
+    return bool(inherits), ends_with_new_line
+
+
+class IncrementalMarkdownRenderer:
+    """Renders a growing Markdown document inside a Rich `Live` region.
+
+    Text is scanned line by line exactly once. When a top-level block is known
+    to be complete (a blank line or a closing code fence is followed by a line
+    that starts a new block), it is printed above the live region and dropped
+    from the buffer. Only the open tail block is re-parsed on every update.
+
+    The split points are chosen conservatively so that the concatenation of
+    committed blocks and the final tail looks exactly like the whole document
+    rendered by a single `Markdown` object.
+
+    Link reference definitions of committed blocks are added to every later
+    block. A block using a full or collapsed reference (`[text][label]`)
+    whose definition has not arrived yet stays in the tail until it does.
+    Shortcut references (`[label]`) cannot be told apart from plain text in
+    brackets (`[Code #1]`), so a block using one before its definition is
+    committed and shows the brackets as text - unlike a single render.
+    """
+
+    def __init__(self, live, markdown_factory: Callable[[str], Markdown],
+                 block_factory: Optional[Callable[[str], Markdown]] = None):
+        """Initialize renderer.
+
+        Args:
+            live: Rich Live instance (committed blocks go to `live.console`)
+            markdown_factory: Callable creating a Markdown object from text
+            block_factory: Callable creating Markdown of committed blocks
+                (markdown_factory if None)
+        """
+        self.live = live
+        self._create_markdown = markdown_factory
+        self._create_block = block_factory or markdown_factory
+
+        self._tail = ""          # Uncommitted text
+        self._scan_pos = 0       # Start of the first unscanned line in tail
+        self._boundary: Optional[int] = None  # Candidate split position in tail
+        self._fence: Optional[tuple] = None   # (char, length) of open fence
+        self._fence_top_level = False
+        self._html_end: Optional[re.Pattern] = None
+        self._block_has_list = False
+        self._block_started = False
+
+        # new_line flag of the last committed top-level element
+        self._separator_needed = False
+        # Link reference definitions of committed blocks, by normalized label
+        self._definitions: Dict[str, str] = {}
+
+    @property
+    def tail(self) -> str:
+        """Text of the block that is still being rendered in the live region."""
+        return self._tail
+
+    def feed(self, text: str) -> None:
+        """Append text, commit completed blocks and refresh the live region.
+
+        Args:
+            text: New chunk of the reply
+        """
+        self.append(text)
+        self.render()
+
+    def append(self, text: str) -> None:
+        """Append text without rendering anything.
+
+        Args:
+            text: New chunk of the reply
+        """
+        if text:
+            self._tail += text
+
+    def render(self) -> None:
+        """Commit completed blocks and update the live region with the tail."""
+        self._scan()
+        self.live.update(self.tail_renderable(), refresh=True)
+
+    def tail_renderable(self):
+        """Build renderable for the open tail block.
+
+        Returns:
+            Markdown of the tail, preceded by an empty line if Rich would put
+            one between the last committed block and the tail
+        """
+        tail = self._tail
+        if self._fence is None and self._html_end is None:
+            tail = self._with_definitions(tail)
+        markdown = self._create_markdown(tail)
+        if self._separator_needed:
+            flags = _separator_flags(markdown)
+            if flags and flags[0]:
+                return Group(Text(), markdown)
+        return markdown
+
+    # === Block boundary detection ===
+
+    def _scan(self) -> None:
+        """Scan complete lines that arrived since the previous scan."""
+        while True:
+            line_end = self._tail.find("\n", self._scan_pos)
+            if line_end == -1:
+                return
+            line_start = self._scan_pos
+            self._scan_pos = line_end + 1
+            line = self._tail[line_start:line_end]
+
+            # After a commit the tail is cut and the current line is rescanned
+            self._consume_line(line, line_start)
+
+    def _consume_line(self, line: str, line_start: int) -> bool:
+        """Update block state with one complete line.
+
+        Args:
+            line: Line text without the trailing newline
+            line_start: Offset of the line in the tail
+
+        Returns:
+            True if a block was committed and scanning positions were reset
+        """
+        line_end = line_start + len(line) + 1
+
+        if self._fence is not None:
+            if self._closes_fence(line):
+                self._fence = None
+                if self._fence_top_level:
+                    self._boundary = line_end
+            return False
+
+        if self._html_end is not None:
+            if self._html_end.search(line):
+                self._html_end = None
+            return False
+
+        if not line.strip():
+            if self._boundary is None and self._block_started:
+                self._boundary = line_start
+            return False
+
+        if self._boundary is not None:
+            if self._starts_new_block(line) and self._references_resolved(self._tail[:self._boundary]):
+                self._commit(self._boundary, line_start)
+                return True
+            self._boundary = None
+
+        self._track_line(line)
+        return False
+
+    def _track_line(self, line: str) -> None:
+        """Remember constructs opened by a non-blank line."""
+        self._block_started = True
+        fence = _FENCE_RE.match(line)
+        if fence:
+            indent, marker, info = fence.groups()
+            if not (marker[0] == "`" and "`" in info):
+                self._fence = (marker[0], len(marker))
+                self._fence_top_level = not indent and not self._block_has_list
+                return
+
+        for start_re, end_re in _RAW_HTML_BLOCKS:
+            if start_re.match(line) and not end_re.search(line):
+                self._html_end = end_re
+                return
+
+        if _LIST_ITEM_RE.match(line):
+            self._block_has_list = True
+
+    def _closes_fence(self, line: str) -> bool:
+        """Check whether line closes the currently open fence."""
+        fence = _FENCE_RE.match(line)
+        if not fence:
+            return False
+        _indent, marker, info = fence.groups()
+        char, length = self._fence
+        return marker[0] == char and len(marker) >= length and not info.strip()
+
+    def _starts_new_block(self, line: str) -> bool:
+        """Check that line cannot continue the block before the boundary.
+
+        Indented lines may belong to a list item or form an indented code
+        block, and a list item after a list would merge into a loose list.
+        """
+        if line[0] in " \t":
+            return False
+        if self._block_has_list and _LIST_ITEM_RE.match(line):
+            return False
+        return True
+
+    def _references_resolved(self, block: str) -> bool:
+        """Check that every full or collapsed reference of the block has its definition."""
+        used, definitions = _scan_references(block)
+        return all(label in self._definitions or label in definitions for label in used)
+
+    def _with_definitions(self, text: str) -> str:
+        """Append known link reference definitions (they render to nothing)."""
+        if not self._definitions:
+            return text
+        return text + "\n\n" + "\n".join(self._definitions.values()) + "\n"
+
+    def _commit(self, boundary: int, next_block_start: int) -> None:
+        """Print completed block and cut it from the tail.
+
+        Args:
+            boundary: End of the completed block in the tail
+            next_block_start: Start of the first line of the next block
+        """
+        block = self._tail[:boundary]
+        self._tail = self._tail[next_block_start:]
+        self._scan_pos = 0
+        self._boundary = None
+        self._fence_top_level = False
+        self._block_has_list = False
+        self._block_started = False
+
+        markdown = self._create_block(self._with_definitions(block))
+        for label, definition in _scan_references(block)[1].items():
+            self._definitions.setdefault(label, definition)
+        flags = _separator_flags(markdown)
+        if flags is None:
+            return
+
+        inherits_separator, ends_with_new_line = flags
+        if inherits_separator and self._separator_needed:
+            self.live.console.print()
+        self.live.console.print(markdown)
+        self._separator_needed = ends_with_new_line
+
+
+class RenderScheduler:
+    """Frame pacing for live rendering, decoupled from chunk arrival.
+
+    Chunks only mark the display as dirty. A frame is due at most
+    `refresh_per_second` times a second, so all chunks that arrive between
+    two frames are merged into a single redraw and the reading side never
+    sleeps.
+    """
+
+    def __init__(self, refresh_per_second: float, clock: Callable[[], float] = time.monotonic):
+        """Initialize scheduler.
+
+        Args:
+            refresh_per_second: Maximum number of frames per second
+            clock: Monotonic clock function (injectable for tests)
+        """
+        self.frame_interval = 1.0 / max(1.0, float(refresh_per_second or 1))
+        self._clock = clock
+        self._next_frame = 0.0
+        self._dirty = False
+        self.frames = 0
+
+    @property
+    def dirty(self) -> bool:
+        """True if there is content that has not been rendered yet."""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """Record that new content arrived since the last frame."""
+        self._dirty = True
+
+    def due(self) -> bool:
+        """Check whether a frame should be rendered now."""
+        return self._dirty and self._clock() >= self._next_frame
+
+    def time_until_next_frame(self) -> Optional[float]:
+        """Seconds until the next frame is due.
+
+        Returns:
+            0 if a frame is due now, None if there is nothing to render
+        """
+        if not self._dirty:
+            return None
+        return max(0.0, self._next_frame - self._clock())
+
+    def frame_rendered(self) -> None:
+        """Record that a frame was just rendered."""
+        self._dirty = False
+        self._next_frame = self._clock() + self.frame_interval
+        self.frames += 1
@@ -0,0 +1,281 @@
+"""
+Metrics - Метрики задержек потоковых ответов LLM.
+
+Для каждого запроса собирается структурированная запись: время подключения,
+время до первого чанка (TTFT), гистограмма пауз между чанками, скорость
+генерации в символах и токенах в секунду и время отрисовки кадров.
+Записи можно дописывать в файл в формате JSON Lines.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from penguin_tamer.llm_clients.token_estimator import estimate_error
+
+
+# Upper bounds (seconds) of inter-chunk gap histogram buckets
+GAP_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _bucket_label(index: int) -> str:
+    """Human readable label of a gap histogram bucket."""
+    if index < len(GAP_BUCKETS):
+        return f"<{GAP_BUCKETS[index] * 1000:g}ms"
+    return f">={GAP_BUCKETS[-1] * 1000:g}ms"
+
+
+GAP_BUCKET_LABELS = tuple(_bucket_label(i) for i in range(len(GAP_BUCKETS) + 1))
+
+
+@dataclass
+class RequestMetrics:
+    """Latency record of a single streaming request.
+
+    Times are measured with a monotonic clock and stored in seconds relative
+    to the request start. Chunk arrivals are recorded by the background
+    reader thread, frames by the render loop.
+    """
+    model: str = ""
+    started_at: float = field(default_factory=time.time)  # Wall clock, for logs
+    status: str = "pending"  # ok, truncated, empty, error, interrupted
+
+    connect_time: Optional[float] = None  # Request sent -> stream object created
+    ttft: Optional[float] = None          # Request sent -> first content chunk
+    total_time: Optional[float] = None    # Request sent -> stream finished
+    warmup_saved: Optional[float] = None  # Connection setup done ahead by the warm-up
+    retries: int = 0                      # Attempts repeated after recoverable errors
+    retry_delay: float = 0.0              # Seconds waited between attempts
+    throttled: Optional[float] = None     # Delay before sending, imposed by the provider's rate limits
+    hedged: bool = False                  # Backup request was sent because the first chunk was late
+    hedge_winner: Optional[str] = None    # Stream that answered a hedged request: primary or backup
+    fallback: Optional[str] = None        # Fallback model that answered after the primary provider failed
+    stalls: int = 0                       # Streams aborted after the idle timeout
+    continuations: int = 0                # Follow-up requests continuing a stalled reply
+    cached: bool = False                  # Reply replayed from the response cache
+
+    chunks: int = 0
+    chars: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    estimated_prompt_tokens: Optional[int] = None  # Local estimate, compared with reported prompt tokens
+    usage_estimated: bool = False         # Provider sent no usage, tokens are local estimates
+    gap_histogram: Dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(GAP_BUCKET_LABELS, 0))
+    max_gap: float = 0.0
+
+    frames: int = 0
+    render_time: float = 0.0
+    max_frame_time: float = 0.0
+
+    def __post_init__(self):
+        self._clock = time.monotonic
+        self._start = self._clock()
+        self._last_chunk: Optional[float] = None
+        self._lock = threading.Lock()
+        self._merged_into: Optional["RequestMetrics"] = None  # Record that continues this one
+
+    def elapsed(self) -> float:
+        """Seconds since the request start."""
+        return self._clock() - self._start
+
+    def share_start(self, other: "RequestMetrics") -> None:
+        """Measure times from the start of another request (hedged duplicate)."""
+        self.started_at = other.started_at
+        self._start = other._start
+
+    def merge_hedge(self, backup: "RequestMetrics") -> None:
+        """Continue this record with the stream of a hedged duplicate that answered first.
+
+        Retries, rate limit waits and prompt estimates of this record are
+        kept; the model, connection and chunk data come from the backup,
+        whose reader keeps recording into this record from now on.
+
+        Args:
+            backup: Record of the backup request, started with share_start()
+        """
+        with backup._lock:
+            self.model = backup.model
+            self.connect_time = backup.connect_time
+            self.ttft = backup.ttft
+            self._last_chunk = backup._last_chunk
+            self.chunks += backup.chunks
+            self.chars += backup.chars
+            for label, count in backup.gap_histogram.items():
+                self.gap_histogram[label] = self.gap_histogram.get(label, 0) + count
+            self.max_gap = max(self.max_gap, backup.max_gap)
+            if backup.throttled is not None:
+                self.throttled = (self.throttled or 0.0) + backup.throttled
+            backup._merged_into = self
+
+    def record_retry(self, delay: float) -> None:
+        """Record a repeated attempt after a recoverable error.
+
+        Args:
+            delay: Seconds waited before the attempt
+        """
+        self.retries += 1
+        self.retry_delay += delay
+
+    def mark_connected(self) -> None:
+        """Record that the stream was created (response headers received)."""
+        self.connect_time = self.elapsed()
+
+    def record_chunk(self, chars: int) -> None:
+        """Record arrival of a content chunk.
+
+        Args:
+            chars: Number of characters in the chunk
+        """
+        with self._lock:
+            target = self._merged_into
+            if target is None:
+                now = self.elapsed()
+                if self._last_chunk is None:
+                    self.ttft = now
+                else:
+                    gap = now - self._last_chunk
+                    self.max_gap = max(self.max_gap, gap)
+                    index = next((i for i, bound in enumerate(GAP_BUCKETS) if gap < bound), len(GAP_BUCKETS))
+                    self.gap_histogram[GAP_BUCKET_LABELS[index]] += 1
+                self._last_chunk = now
+                self.chunks += 1
+                self.chars += chars
+                return
+        target.record_chunk(chars)
+
+    def record_usage(self, usage_stats: dict) -> None:
+        """Record token usage reported by the provider."""
+        if 'prompt_tokens' in usage_stats:
+            self.prompt_tokens = (self.prompt_tokens or 0) + usage_stats['prompt_tokens']
+        if 'completion_tokens' in usage_stats:
+            self.completion_tokens = (self.completion_tokens or 0) + usage_stats['completion_tokens']
+
+    def record_frame(self, duration: float) -> None:
+        """Record time spent rendering one frame."""
+        self.frames += 1
+        self.render_time += duration
+        self.max_frame_time = max(self.max_frame_time, duration)
+
+    def finish(self, status: str) -> None:
+        """Close the record.
+
+        Args:
+            status: Final status of the request
+        """
+        self.status = status
+        self.total_time = self.elapsed()
+
+    @property
+    def generation_time(self) -> Optional[float]:
+        """Seconds between the first and the last content chunk."""
+        if self.ttft is None or self._last_chunk is None:
+            return None
+        return self._last_chunk - self.ttft
+
+    @property
+    def chars_per_second(self) -> Optional[float]:
+        """Streaming speed after the first chunk."""
+        duration = self.generation_time
+        if not duration:
+            return None
+        return self.chars / duration
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Completion tokens per second after the first chunk."""
+        duration = self.generation_time
+        if not duration or not self.completion_tokens:
+            return None
+        return self.completion_tokens / duration
+
+    @property
+    def avg_frame_time(self) -> Optional[float]:
+        """Mean render time of a frame."""
+        if not self.frames:
+            return None
+        return self.render_time / self.frames
+
+    def to_dict(self) -> dict:
+        """Serializable representation including derived speeds."""
+        data = asdict(self)
+        data['generation_time'] = self.generation_time
+        data['chars_per_second'] = self.chars_per_second
+        data['tokens_per_second'] = self.tokens_per_second
+        data['avg_frame_time'] = self.avg_frame_time
+        return data
+
+
+_file_lock = threading.Lock()
+
+
+def append_metrics_record(metrics: RequestMetrics, path: Union[str, Path]) -> None:
+    """Append metrics record to a JSON Lines file.
+
+    Args:
+        metrics: Finished request metrics
+        path: Target file, created with parent directories if missing
+    """
+    path = Path(path)
+    line = json.dumps(metrics.to_dict(), ensure_ascii=False)
+    with _file_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def summarize_metrics(records: List[RequestMetrics]) -> dict:
+    """Aggregate per-request records for the session summary.
+
+    Returns:
+        Dictionary with averages and merged gap histogram
+    """
+    histogram = dict.fromkeys(GAP_BUCKET_LABELS, 0)
+    for record in records:
+        for label, count in record.gap_histogram.items():
+            histogram[label] += count
+
+    def collect(attr):
+        return [v for v in (getattr(r, attr) for r in records) if v is not None]
+
+    frame_times = [r.max_frame_time for r in records if r.frames]
+    estimate_errors = [
+        error for error in (estimate_error(r.estimated_prompt_tokens, r.prompt_tokens)
+                            for r in records if not r.usage_estimated)
+        if error is not None
+    ]
+    return {
+        'requests': len(records),
+        'avg_connect_time': _mean(collect('connect_time')),
+        'warmed_requests': len(collect('warmup_saved')),
+        'warmup_saved': sum(collect('warmup_saved')),
+        'retried_requests': sum(1 for r in records if r.retries),
+        'retries': sum(r.retries for r in records),
+        'retry_delay': sum(r.retry_delay for r in records),
+        'throttled_requests': len([v for v in collect('throttled') if v > 0]),
+        'throttle_time': sum(collect('throttled')),
+        'hedged_requests': sum(1 for r in records if r.hedged),
+        'hedge_backup_wins': sum(1 for r in records if r.hedge_winner == "backup"),
+        'fallback_requests': sum(1 for r in records if r.fallback),
+        'stalled_requests': sum(1 for r in records if r.stalls),
+        'truncated_requests': sum(1 for r in records if r.status == "truncated"),
+        'cached_requests': sum(1 for r in records if r.cached),
+        'estimated_usage_requests': sum(1 for r in records if r.usage_estimated),
+        'avg_estimate_error': _mean(estimate_errors),
+        'avg_ttft': _mean(collect('ttft')),
+        'max_ttft': max(collect('ttft'), default=None),
+        'avg_chars_per_second': _mean(collect('chars_per_second')),
+        'avg_tokens_per_second': _mean(collect('tokens_per_second')),
+        'frames': sum(r.frames for r in records),
+        'avg_frame_time': _mean(collect('avg_frame_time')),
+        'max_frame_time': max(frame_times, default=None),
+        'max_gap': max((r.max_gap for r in records), default=0.0),
+        'gap_histogram': histogram,
+    }
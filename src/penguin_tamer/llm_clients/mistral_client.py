@@ -6,26 +6,15 @@ POST https://api.mistral.ai/v1/chat/completions
 API documentation: https://docs.mistral.ai/
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 import json
 
 from penguin_tamer.llm_clients.base import AbstractLLMClient, LLMConfig
-from penguin_tamer.utils.lazy_import import lazy_import
-
-# Lazy import requests for API calls
-@lazy_import
-def get_requests_module():
-    """Lazy import requests for API requests"""
-    import requests
-    return requests
-
-# Lazy import sseclient for SSE streaming
-@lazy_import
-def get_sseclient_module():
-    """Lazy import sseclient for SSE streaming"""
-    import sseclient
-    return sseclient
+from penguin_tamer.llm_clients.async_base import AbstractAsyncLLMClient
+from penguin_tamer.llm_clients.http_session import (
+    NetworkSettings, get_shared_session, get_sseclient_module, open_event_stream
+)
 
 
 @dataclass
@@ -42,6 +31,8 @@ class MistralClient(AbstractLLMClient):
     - Response parsing (SSE events)
     """
 
+    client_name = "mistral"
+
     # === API-specific methods (request formation and response parsing) ===
 
     def _prepare_api_params(self, user_input: str) -> dict:
@@ -56,9 +47,9 @@ class MistralClient(AbstractLLMClient):
         Returns:
             dict: Parameters for Mistral API endpoint
         """
-        # Build messages list including current request
+        # Build messages list including current request, fitted into the context budget
         # Do NOT add to self.messages - StreamProcessor will do it
-        messages = self.messages + [{"role": "user", "content": user_input}] if user_input else self.messages
+        messages = self._request_messages(user_input)
 
         # Mistral uses OpenAI-compatible format
         api_params = {
@@ -103,25 +94,21 @@ class MistralClient(AbstractLLMClient):
         Returns:
             Iterator of SSE events for streaming processing
         """
-        requests = get_requests_module()
-        sseclient = get_sseclient_module()
-        
-        # Mistral API endpoint
-        url = f"{self.api_url}/chat/completions"
-        
-        headers = {
+        # Pooled session: later turns reuse the kept-alive TLS connection
+        return open_event_stream(self.session, self._stream_url(), self._request_headers(),
+                                 self._encode_body(api_params), self.network_settings.timeout)
+
+    def _request_headers(self) -> Dict[str, str]:
+        """Headers of the streaming request."""
+        return {
             "Content-Type": "application/json",
             "Accept": "text/event-stream",
             "Authorization": f"Bearer {self.api_key}"
         }
-        
-        try:
-            response = requests.post(url, headers=headers, json=api_params, stream=True, timeout=30)
-            response.raise_for_status()
-            client = sseclient.SSEClient(response)
-            return client.events()
-        except Exception as e:
-            raise RuntimeError(f"Mistral API error: {e}")
+
+    def _stream_url(self) -> Optional[str]:
+        """Mistral chat completions endpoint (requests go through the pooled session)."""
+        return f"{self.api_url}/chat/completions"
 
     def _extract_chunk_content(self, chunk) -> Optional[str]:
         """Extract text content from SSE event.
@@ -254,7 +241,8 @@ class MistralClient(AbstractLLMClient):
     def fetch_models(
         api_list_url: str,
         api_key: str = "",
-        model_filter: Optional[str] = None
+        model_filter: Optional[str] = None,
+        session=None
     ) -> List[Dict[str, str]]:
         """
         Fetch list of available models from Mistral AI API.
@@ -266,6 +254,7 @@ class MistralClient(AbstractLLMClient):
             api_list_url: Mistral models endpoint (e.g., "https://api.mistral.ai/v1/models")
             api_key: API key for authentication (required for Mistral)
             model_filter: Filter string to match against model id (case-insensitive, optional)
+            session: Pooled requests.Session (shared Mistral session if None)
         
         Returns:
             List of model dictionaries: [{"id": "model-id", "name": "Model Display Name"}, ...]
@@ -280,14 +269,14 @@ class MistralClient(AbstractLLMClient):
             {'id': 'mistral-large-latest', 'name': 'Mistral Large'}
         """
         try:
-            requests = get_requests_module()
-            
             # Mistral requires API key
             headers = {}
             if api_key:
                 headers["Authorization"] = f"Bearer {api_key}"
             
-            response = requests.get(api_list_url, headers=headers, timeout=10)
+            http = session if session is not None else get_shared_session("mistral")
+            response = http.get(api_list_url, headers=headers,
+                                timeout=NetworkSettings.from_config("mistral").models_timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -347,4 +336,16 @@ class MistralClient(AbstractLLMClient):
         api_list_url = f"{base_url}/models"
         
         # Use static method to fetch models
-        return self.fetch_models(api_list_url, self.api_key, model_filter)
+        return self.fetch_models(api_list_url, self.api_key, model_filter, session=self.session)
+
+
+@dataclass
+class AsyncMistralClient(AbstractAsyncLLMClient, MistralClient):
+    """Asynchronous Mistral AI client (same request format and parsing)."""
+
+    def _stream_request(self, api_params: dict) -> Tuple[str, Dict[str, str]]:
+        return self._stream_url(), self._request_headers()
+
+    def _decode_event(self, payload: str):
+        # Extractors expect an SSE event object with .data
+        return get_sseclient_module().Event(data=payload)
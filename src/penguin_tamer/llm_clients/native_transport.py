@@ -0,0 +1,233 @@
+"""
+Native Transport - Встроенный транспорт для OpenAI-совместимого streaming API.
+
+Отправляет запрос chat/completions напрямую через пул соединений requests
+и разбирает строки `data:` из байтового потока SSE в обычные словари,
+без импорта openai SDK и построения pydantic-моделей для каждого чанка.
+"""
+
+import json
+from typing import Dict, Iterator, Optional, Tuple
+
+from penguin_tamer.error_handlers import (
+    APIError, HTTPStatusError, TransportConnectionError, TransportTimeoutError
+)
+from penguin_tamer.utils.lazy_import import lazy_import
+
+
+# Ленивый импорт requests для работы с API
+@lazy_import
+def get_requests_module():
+    """Ленивый импорт requests для API запросов"""
+    import requests
+    return requests
+
+
+# Connect and read timeouts (seconds), read timeout matches the SDK default
+_CONNECT_TIMEOUT = 10.0
+_READ_TIMEOUT = 600.0
+
+# Max bytes requested from the socket per read
+_READ_SIZE = 64 * 1024
+
+
+def _translate_request_error(error: Exception) -> Exception:
+    """Convert requests/urllib3 network exception into transport error."""
+    requests = get_requests_module()
+    if isinstance(error, requests.exceptions.Timeout) or "timed out" in str(error).lower():
+        return TransportTimeoutError(str(error), original_error=error)
+    return TransportConnectionError(str(error), original_error=error)
+
+
+def _error_from_response(response) -> HTTPStatusError:
+    """Build status error with the provider message from an error response."""
+    body = None
+    message = f"HTTP {response.status_code}"
+    try:
+        data = response.json()
+        # OpenAI-compatible APIs wrap details into {"error": {...}}
+        body = data.get("error", data) if isinstance(data, dict) else data
+        if isinstance(body, dict) and body.get("message"):
+            message = str(body["message"])
+        elif isinstance(body, str):
+            message = body
+    except ValueError:
+        text = response.text.strip()
+        if text:
+            message = text[:500]
+    return HTTPStatusError(message, status_code=response.status_code, body=body, response=response)
+
+
+class SSEStream:
+    """Iterator over JSON chunks of an OpenAI-compatible SSE response.
+
+    Events are parsed straight from the raw byte stream: `data:` lines are
+    decoded with `json.loads` into plain dicts, comments and other fields
+    are skipped, `[DONE]` ends the stream.
+
+    Exposes `response` (for rate limit headers) and `close()`.
+    """
+
+    def __init__(self, response):
+        """Initialize stream.
+
+        Args:
+            response: Streaming requests.Response with status 2xx
+        """
+        self.response = response
+
+    def __iter__(self) -> Iterator[dict]:
+        data_lines = []
+        try:
+            for line in self._iter_lines():
+                if not line:
+                    # Blank line dispatches the event
+                    if data_lines:
+                        event = self._decode_event(data_lines)
+                        data_lines = []
+                        if event is None:
+                            return
+                        yield event
+                    continue
+
+                if line.startswith(b"data:"):
+                    payload = line[5:]
+                    if payload[:1] == b" ":
+                        payload = payload[1:]
+                    if payload == b"[DONE]":
+                        return
+                    data_lines.append(payload)
+                # Comments (": keep-alive") and event/id/retry fields are ignored
+
+            if data_lines:
+                event = self._decode_event(data_lines)
+                if event is not None:
+                    yield event
+        except APIError:
+            raise
+        except Exception as e:
+            requests = get_requests_module()
+            if isinstance(e, (requests.exceptions.RequestException, OSError)) or \
+                    type(e).__module__.startswith("urllib3"):
+                raise _translate_request_error(e) from e
+            raise
+        finally:
+            self.response.close()
+
+    def close(self) -> None:
+        """Close the response and release the connection."""
+        self.response.close()
+
+    def _decode_event(self, data_lines) -> Optional[dict]:
+        """Decode event data, raising provider errors sent inside the stream."""
+        payload = data_lines[0] if len(data_lines) == 1 else b"\n".join(data_lines)
+        chunk = json.loads(payload)
+        if isinstance(chunk, dict) and chunk.get("error"):
+            error = chunk["error"]
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            raise APIError(message)
+        return chunk
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        """Split raw byte stream into lines (LF or CRLF terminated)."""
+        buffer = b""
+        for data in self._iter_raw():
+            buffer += data
+            if b"\n" not in data:
+                continue
+            lines = buffer.split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                yield line[:-1] if line.endswith(b"\r") else line
+        if buffer:
+            yield buffer.rstrip(b"\r")
+
+    def _iter_raw(self) -> Iterator[bytes]:
+        """Yield bytes as soon as they arrive from the socket."""
+        raw = self.response.raw
+        read1 = getattr(raw, "read1", None)
+        if read1 is None or getattr(raw, "chunked", False):
+            # Chunked responses are yielded per HTTP chunk without waiting
+            yield from self.response.iter_content(chunk_size=None)
+            return
+        while True:
+            data = read1(_READ_SIZE, decode_content=True)
+            if not data:
+                return
+            yield data
+
+
+class NativeChatTransport:
+    """OpenAI-compatible chat completions transport over a pooled session."""
+
+    def __init__(self, base_url: str, api_key: str = "", headers: Optional[Dict[str, str]] = None,
+                 session=None, timeout: Optional[Tuple[float, float]] = None):
+        """Initialize transport.
+
+        Args:
+            base_url: API base URL (".../v1"), "/chat/completions" is appended
+            api_key: Bearer token (optional)
+            headers: Additional headers sent with every request
+            session: requests.Session to reuse, created on first use if None
+            timeout: (connect, read) timeouts in seconds
+        """
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        }
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        if headers:
+            self.headers.update(headers)
+        self._session = session
+        self.timeout = timeout or (_CONNECT_TIMEOUT, _READ_TIMEOUT)
+
+    @property
+    def session(self):
+        """Pooled HTTP session (keeps connections alive between requests)."""
+        if self._session is None:
+            self._session = get_requests_module().Session()
+        return self._session
+
+    def create_stream(self, api_params: dict, body: Optional[bytes] = None) -> SSEStream:
+        """Send streaming chat completion request.
+
+        Args:
+            api_params: Request body (same dict as for the SDK call)
+            body: The request body already encoded, e.g. by RequestBodyEncoder
+
+        Returns:
+            SSEStream yielding chunk dicts
+
+        Raises:
+            HTTPStatusError: Non-2xx response
+            TransportConnectionError: Network failure
+            TransportTimeoutError: Connect or read timeout
+        """
+        if body is None:
+            body = json.dumps(api_params, ensure_ascii=False).encode("utf-8")
+        try:
+            response = self.session.post(
+                self.url,
+                data=body,
+                headers=self.headers,
+                stream=True,
+                timeout=self.timeout,
+            )
+        except get_requests_module().exceptions.RequestException as e:
+            raise _translate_request_error(e) from e
+
+        if response.status_code >= 400:
+            try:
+                raise _error_from_response(response)
+            finally:
+                response.close()
+
+        return SSEStream(response)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
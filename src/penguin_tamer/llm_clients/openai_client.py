@@ -5,21 +5,16 @@ OpenAI Client - Реализация клиента для OpenAI API.
 Пока является копией OpenRouterClient, в будущем будут добавлены специфичные для OpenAI особенности.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 
 from penguin_tamer.llm_clients.base import AbstractLLMClient, LLMConfig
+from penguin_tamer.llm_clients.async_base import AbstractAsyncLLMClient, decode_json_event
 from penguin_tamer.llm_clients.stream_processor import StreamProcessor
+from penguin_tamer.llm_clients.native_transport import NativeChatTransport
+from penguin_tamer.llm_clients.http_session import NetworkSettings, get_shared_session
 from penguin_tamer.utils.lazy_import import lazy_import
 
-# Ленивый импорт requests для работы с API
-@lazy_import
-def get_requests_module():
-    """Ленивый импорт requests для API запросов"""
-    import requests
-    return requests
-
-
 # Ленивый импорт OpenAI клиента
 @lazy_import
 def get_openai_client():
@@ -41,8 +36,11 @@ class OpenAIClient(AbstractLLMClient):
     - Response parsing (chunks, usage, rate limits)
     """
 
+    client_name = "openai"
+
     # OpenAI-specific state
     _client: Optional[object] = field(default=None, init=False)
+    _native_transport: Optional[NativeChatTransport] = field(default=None, init=False)
 
     # === API-specific methods (формирование запросов и парсинг ответов) ===
 
@@ -55,11 +53,9 @@ class OpenAIClient(AbstractLLMClient):
         Returns:
             dict: Параметры для chat.completions.create()
         """
-        # Build messages list for this request
-        messages = self.messages.copy()
-        if user_input:
-            messages.append({"role": "user", "content": user_input})
-        
+        # Build messages list for this request, fitted into the context budget
+        messages = self._request_messages(user_input)
+
         api_params = {
             "model": self.model,
             "messages": messages,
@@ -91,10 +87,21 @@ class OpenAIClient(AbstractLLMClient):
             # OpenAI API не требует специальных заголовков
             self._client = get_openai_client()(
                 api_key=self.api_key,
-                base_url=self.api_url
+                base_url=self.api_url,
+                timeout=self.network_settings.sdk_timeout
             )
         return self._client
 
+    @property
+    def native_transport(self) -> NativeChatTransport:
+        """Built-in SSE transport (used instead of the SDK when transport: native)"""
+        if self._native_transport is None:
+            self._native_transport = NativeChatTransport(
+                self.api_url, self.api_key,
+                session=self.session, timeout=self.network_settings.timeout
+            )
+        return self._native_transport
+
     def ask_stream(self, user_input: str) -> str:
         """Потоковый режим с сохранением контекста и обработкой Markdown в реальном времени.
 
@@ -117,10 +124,23 @@ class OpenAIClient(AbstractLLMClient):
             api_params: API parameters prepared by _prepare_api_params()
             
         Returns:
-            Stream object from OpenAI SDK
+            Stream object from OpenAI SDK, or SSEStream of chunk dicts
+            when the native transport is enabled
         """
+        from penguin_tamer.config_manager import config
+
+        if config.get("global", "transport", "sdk") == "native":
+            return self.native_transport.create_stream(api_params, self._encode_body(api_params))
         return self.client.chat.completions.create(**api_params)
 
+    def _stream_url(self) -> Optional[str]:
+        """Native transport endpoint (the SDK keeps its own connection pool)."""
+        from penguin_tamer.config_manager import config
+
+        if config.get("global", "transport", "sdk") == "native":
+            return self.native_transport.url
+        return None
+
     def _extract_chunk_content(self, chunk) -> Optional[str]:
         """Extract text content from stream chunk (OpenAI-specific).
         
@@ -130,6 +150,13 @@ class OpenAIClient(AbstractLLMClient):
         Returns:
             Text content or None if chunk has no content
         """
+        if isinstance(chunk, dict):
+            # Native transport: plain JSON chunk
+            choices = chunk.get('choices')
+            if not choices:
+                return None
+            return (choices[0].get('delta') or {}).get('content') or None
+
         try:
             if not hasattr(chunk, 'choices') or not chunk.choices:
                 return None
@@ -152,6 +179,15 @@ class OpenAIClient(AbstractLLMClient):
         Returns:
             Dict with 'prompt_tokens' and 'completion_tokens', or None
         """
+        if isinstance(chunk, dict):
+            usage = chunk.get('usage')
+            if not usage:
+                return None
+            return {
+                'prompt_tokens': usage.get('prompt_tokens', 0),
+                'completion_tokens': usage.get('completion_tokens', 0)
+            }
+
         try:
             if hasattr(chunk, 'usage') and chunk.usage:
                 return {
@@ -196,7 +232,8 @@ class OpenAIClient(AbstractLLMClient):
             pass
 
     @staticmethod
-    def fetch_models(api_list_url: str, api_key: str = "", model_filter: Optional[str] = None) -> List[Dict[str, str]]:
+    def fetch_models(api_list_url: str, api_key: str = "", model_filter: Optional[str] = None,
+                     session=None) -> List[Dict[str, str]]:
         """
         Fetch list of available models from OpenAI API.
         
@@ -207,6 +244,7 @@ class OpenAIClient(AbstractLLMClient):
             api_list_url: OpenAI models endpoint (e.g., "https://api.openai.com/v1/models")
             api_key: API key for authentication (required for OpenAI)
             model_filter: Filter string to match against model id/name (case-insensitive, optional)
+            session: Pooled requests.Session (shared OpenAI session if None)
         
         Returns:
             List of model dictionaries: [{"id": "model-id", "name": "Model Display Name"}, ...]
@@ -221,14 +259,14 @@ class OpenAIClient(AbstractLLMClient):
             {'id': 'gpt-4', 'name': 'gpt-4'}
         """
         try:
-            requests = get_requests_module()
-            
+            http = session if session is not None else get_shared_session("openai")
+            timeout = NetworkSettings.from_config("openai").models_timeout
             # OpenAI требует API ключ
             headers = {}
             if api_key:
                 headers["Authorization"] = f"Bearer {api_key}"
             
-            response = requests.get(api_list_url, headers=headers, timeout=10)
+            response = http.get(api_list_url, headers=headers, timeout=timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -286,6 +324,17 @@ class OpenAIClient(AbstractLLMClient):
         api_list_url = f"{base_url}/models"
         
         # Используем статический метод для получения моделей
-        return self.fetch_models(api_list_url, self.api_key, model_filter)
+        return self.fetch_models(api_list_url, self.api_key, model_filter, session=self.session)
+
+
+@dataclass
+class AsyncOpenAIClient(AbstractAsyncLLMClient, OpenAIClient):
+    """Asynchronous OpenAI client over httpx (same request format and parsing)."""
 
+    def _stream_request(self, api_params: dict) -> Tuple[str, Dict[str, str]]:
+        # Same endpoint and headers as the native sync transport
+        transport = self.native_transport
+        return transport.url, transport.headers
 
+    def _decode_event(self, payload: str) -> dict:
+        return decode_json_event(payload)
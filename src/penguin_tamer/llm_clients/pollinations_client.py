@@ -6,26 +6,18 @@ POST https://text.pollinations.ai/openai
 API documentation: https://pollinations.ai/
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 import json
 
 from penguin_tamer.llm_clients.base import AbstractLLMClient, LLMConfig
-from penguin_tamer.utils.lazy_import import lazy_import
+from penguin_tamer.llm_clients.async_base import AbstractAsyncLLMClient
+from penguin_tamer.llm_clients.http_session import (
+    NetworkSettings, get_shared_session, get_sseclient_module, open_event_stream
+)
 
-# Ленивый импорт requests для работы с API
-@lazy_import
-def get_requests_module():
-    """Ленивый импорт requests для API запросов"""
-    import requests
-    return requests
-
-# Ленивый импорт sseclient для SSE streaming
-@lazy_import
-def get_sseclient_module():
-    """Ленивый импорт sseclient для SSE streaming"""
-    import sseclient
-    return sseclient
+# OpenAI-compatible endpoint для Pollinations
+_STREAM_URL = "https://text.pollinations.ai/openai"
 
 
 @dataclass
@@ -42,6 +34,8 @@ class PollinationsClient(AbstractLLMClient):
     - Response parsing
     """
 
+    client_name = "pollinations"
+
     # === API-specific methods (формирование запросов и парсинг ответов) ===
 
     def _prepare_api_params(self, user_input: str) -> dict:
@@ -56,9 +50,9 @@ class PollinationsClient(AbstractLLMClient):
         Returns:
             dict: Параметры для передачи в OpenAI-совместимый endpoint
         """
-        # Формируем список сообщений включая текущий запрос
+        # Формируем список сообщений включая текущий запрос, вписанный в бюджет контекста
         # НЕ добавляем в self.messages - это сделает StreamProcessor
-        messages = self.messages + [{"role": "user", "content": user_input}] if user_input else self.messages
+        messages = self._request_messages(user_input)
 
         # Pollinations использует OpenAI-совместимый формат
         api_params = {
@@ -94,24 +88,20 @@ class PollinationsClient(AbstractLLMClient):
         Returns:
             Итератор SSE событий для потоковой обработки
         """
-        requests = get_requests_module()
-        sseclient = get_sseclient_module()
-        
-        # OpenAI-compatible endpoint для Pollinations
-        url = "https://text.pollinations.ai/openai"
-        
-        headers = {
+        # Сессия с пулом: следующие запросы используют уже открытое соединение
+        return open_event_stream(self.session, _STREAM_URL, self._request_headers(),
+                                 self._encode_body(api_params), self.network_settings.timeout)
+
+    def _request_headers(self) -> Dict[str, str]:
+        """Заголовки потокового запроса (API ключ не нужен)."""
+        return {
             "Content-Type": "application/json",
             "Accept": "text/event-stream"
         }
-        
-        try:
-            response = requests.post(url, headers=headers, json=api_params, stream=True, timeout=30)
-            response.raise_for_status()
-            client = sseclient.SSEClient(response)
-            return client.events()
-        except Exception as e:
-            raise RuntimeError(f"Pollinations API error: {e}")
+
+    def _stream_url(self) -> Optional[str]:
+        """Endpoint для предварительного открытия соединения."""
+        return _STREAM_URL
 
     def _extract_chunk_content(self, chunk) -> Optional[str]:
         """Извлечение текстового контента из SSE event.
@@ -199,7 +189,8 @@ class PollinationsClient(AbstractLLMClient):
     def fetch_models(
         api_list_url: str,
         api_key: str = "",
-        model_filter: Optional[str] = None
+        model_filter: Optional[str] = None,
+        session=None
     ) -> List[Dict[str, str]]:
         """Получение списка доступных моделей от Pollinations API.
         
@@ -209,17 +200,17 @@ class PollinationsClient(AbstractLLMClient):
             api_list_url: URL для получения списка моделей (игнорируется, используется стандартный endpoint)
             api_key: API ключ (не требуется для Pollinations)
             model_filter: Фильтр для моделей (опционально)
+            session: Сессия requests с пулом (общая сессия Pollinations, если None)
             
         Returns:
             List[Dict]: Список моделей в формате [{"id": "model-name", "name": "Model Name"}, ...]
         """
-        requests = get_requests_module()
-        
         # Pollinations models endpoint
         models_url = "https://text.pollinations.ai/models"
         
         try:
-            response = requests.get(models_url, timeout=10)
+            http = session if session is not None else get_shared_session("pollinations")
+            response = http.get(models_url, timeout=NetworkSettings.from_config("pollinations").models_timeout)
             response.raise_for_status()
             models_data = response.json()
             
@@ -281,8 +272,19 @@ class PollinationsClient(AbstractLLMClient):
         models = self.fetch_models(
             api_list_url="",  # Не используется
             api_key="",  # Не требуется
-            model_filter=None
+            model_filter=None,
+            session=self.session
         )
         return [model["id"] for model in models]
 
 
+@dataclass
+class AsyncPollinationsClient(AbstractAsyncLLMClient, PollinationsClient):
+    """Асинхронный клиент Pollinations (тот же формат запроса и разбор ответа)."""
+
+    def _stream_request(self, api_params: dict) -> Tuple[str, Dict[str, str]]:
+        return _STREAM_URL, self._request_headers()
+
+    def _decode_event(self, payload: str):
+        # Методы разбора ожидают SSE event с полем .data
+        return get_sseclient_module().Event(data=payload)
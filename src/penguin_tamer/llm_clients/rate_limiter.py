@@ -0,0 +1,257 @@
+"""
+Rate Limiter - Клиентский планировщик запросов по лимитам провайдера.
+
+Для каждого провайдера в процессе есть один RateLimiter с двумя ведрами
+токенов: запросы и токены. Ведра наполняются по заголовкам
+x-ratelimit-* ответов и опустошаются ответами 429. Перед отправкой
+запрос резервирует один запрос и оценку своих токенов; если лимит
+исчерпан, он ждёт, пока ведро наполнится, а не тратит запрос на
+гарантированный 429. Планировщик общий для обычных запросов, fan-out,
+хеджирования и фоновых вызовов, поэтому потокобезопасен.
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from penguin_tamer.error_handlers import RateLimitWaitError
+from penguin_tamer.llm_clients.token_estimator import count_message_tokens
+
+
+# Pause after a 429 without Retry-After when the request rate is unknown
+_DEFAULT_PAUSE = 1.0
+
+
+def estimate_request_tokens(api_params: dict) -> int:
+    """Estimate the token cost of a request before sending it.
+
+    Counts message text with the local token estimator and adds `max_tokens`, which
+    providers reserve from the token limit when the request arrives.
+
+    Args:
+        api_params: Request body from _prepare_api_params()
+
+    Returns:
+        Estimated number of tokens
+    """
+    tokens = sum(count_message_tokens(message) for message in api_params.get("messages") or [])
+    max_tokens = api_params.get("max_tokens")
+    if isinstance(max_tokens, int) and max_tokens > 0:
+        tokens += max_tokens
+    return tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for 429 responses of the SDK and of native transports."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the `Retry-After` (or `retry-after-ms`) header of an error response.
+
+    Returns:
+        Seconds to wait, None if the header is missing or invalid
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(float(value) / 1000, 0.0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            # HTTP date form
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class _Bucket:
+    """Token bucket refilled at `capacity / window` per second."""
+
+    def __init__(self, capacity: float, window: float):
+        self.capacity = capacity
+        self.level = capacity
+        self.rate = capacity / window
+
+    def resize(self, capacity: float, window: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.level = min(self.level, capacity)
+
+    def refill(self, elapsed: float) -> None:
+        self.level = min(self.capacity, self.level + self.rate * elapsed)
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until the bucket holds `amount` (queued reservations included)."""
+        deficit = min(amount, self.capacity) - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        # The level may go negative: later requests queue behind this one
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Request and token buckets of one provider.
+
+    Buckets appear when the provider first reports its limits; until then
+    only pauses after 429 responses apply. Limits are assumed to refill
+    evenly over `window` seconds (providers report per-minute limits).
+    """
+
+    def __init__(self, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """Initialize limiter.
+
+        Args:
+            window: Seconds in which a full limit is restored
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests: Optional[_Bucket] = None
+        self._tokens: Optional[_Bucket] = None
+        self._blocked_until = 0.0
+        self._refilled_at = clock()
+
+    def update(self, limit_requests: Optional[int] = None, remaining_requests: Optional[int] = None,
+               limit_tokens: Optional[int] = None, remaining_tokens: Optional[int] = None) -> None:
+        """Apply limits reported in response headers.
+
+        The remaining values of the provider replace the local estimate.
+        """
+        with self._lock:
+            self._refill()
+            self._requests = self._updated_bucket(self._requests, limit_requests, remaining_requests)
+            self._tokens = self._updated_bucket(self._tokens, limit_tokens, remaining_tokens)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Pause all requests after a 429 response.
+
+        Args:
+            retry_after: Delay requested by the provider, None to wait for
+                one request to refill
+        """
+        with self._lock:
+            self._refill()
+            if retry_after is None:
+                retry_after = 1 / self._requests.rate if self._requests else _DEFAULT_PAUSE
+            self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+            # The provider has no capacity left, whatever we estimated
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.level = min(bucket.level, 0.0)
+
+    def reserve(self, cost: int) -> float:
+        """Reserve one request and `cost` tokens.
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            self._refill()
+            delay = max(self._blocked_until - self._clock(), 0.0)
+            if self._requests is not None:
+                delay = max(delay, self._requests.wait_for(1))
+                self._requests.take(1)
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.wait_for(cost))
+                self._tokens.take(cost)
+            return delay
+
+    def cancel(self, cost: int) -> None:
+        """Return a reservation of a request that is not sent."""
+        with self._lock:
+            for bucket, amount in ((self._requests, 1), (self._tokens, cost)):
+                if bucket is not None:
+                    bucket.level = min(bucket.capacity, bucket.level + min(amount, bucket.capacity))
+
+    def acquire(self, cost: int, max_wait: Optional[float] = None,
+                on_wait: Optional[Callable[[float], None]] = None) -> float:
+        """Wait until the request fits into the limits.
+
+        Args:
+            cost: Estimated tokens of the request
+            max_wait: Give up instead of waiting longer than this
+            on_wait: Called with the delay before waiting
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitWaitError: Required wait is longer than `max_wait`
+        """
+        delay = self._checked_reserve(cost, max_wait)
+        if delay > 0:
+            if on_wait is not None:
+                on_wait(delay)
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, cost: int, max_wait: Optional[float] = None) -> float:
+        """Asynchronous `acquire()`, the event loop keeps running while waiting."""
+        delay = self._checked_reserve(cost, max_wait)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def _checked_reserve(self, cost: int, max_wait: Optional[float]) -> float:
+        delay = self.reserve(cost)
+        if max_wait is not None and delay > max_wait:
+            self.cancel(cost)
+            raise RateLimitWaitError(f"Rate limit exhausted, next request in {delay:.0f} s", wait=delay)
+        return delay
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        for bucket in (self._requests, self._tokens):
+            if bucket is not None:
+                bucket.refill(elapsed)
+
+    def _updated_bucket(self, bucket: Optional[_Bucket], limit: Optional[int],
+                        remaining: Optional[int]) -> Optional[_Bucket]:
+        if limit is None and remaining is None:
+            return bucket
+        capacity = limit or max(bucket.capacity if bucket else 0, remaining or 0)
+        if capacity <= 0:
+            return bucket
+        if bucket is None:
+            bucket = _Bucket(capacity, self.window)
+        else:
+            bucket.resize(capacity, self.window)
+        if remaining is not None:
+            bucket.level = min(float(remaining), capacity)
+        return bucket
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, window: float = 60.0) -> RateLimiter:
+    """Process-wide rate limiter of a provider.
+
+    Args:
+        provider: Provider key (API host)
+        window: Seconds in which a full limit is restored
+
+    Returns:
+        RateLimiter shared by all clients of the provider
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(window)
+        else:
+            limiter.window = window
+        return limiter
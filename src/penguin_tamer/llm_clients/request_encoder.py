@@ -0,0 +1,93 @@
+"""
+Request Encoder - Инкрементальная сериализация тела запроса.
+
+Каждый запрос заново сериализовал в JSON весь диалог, и для длинной
+сессии эта работа росла с каждым ходом. Кодировщик хранит закодированные
+сообщения предыдущего запроса по дайджесту их роли и текста: при
+следующем запросе кодируются лишь новые сообщения и небольшой заголовок
+параметров. Сообщения узнаются и тогда, когда бюджет контекста каждый
+раз собирает их заново или сдвигает историю (обрезка старых ходов,
+подстановка сводки), изменённое сообщение кодируется повторно.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Tuple
+
+
+_SEPARATORS = (",", ":")
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=_SEPARATORS).encode("utf-8", "surrogatepass")
+
+
+def _digest(message) -> bytes:
+    """Digest of a message: its role and text, or its whole JSON for other shapes."""
+    if isinstance(message, dict) and isinstance(message.get("content"), str) and message.keys() <= {"role", "content"}:
+        digest = hashlib.blake2b(str(message.get("role")).encode("utf-8", "surrogatepass"), digest_size=16)
+        digest.update(b"\0")
+        digest.update(message["content"].encode("utf-8", "surrogatepass"))
+        return digest.digest()
+    return hashlib.blake2b(b"\1" + _encode(message), digest_size=16).digest()
+
+
+class RequestBodyEncoder:
+    """JSON encoder of request bodies reusing the encoded messages of the previous request.
+
+    Messages are matched by a digest of their role and content, wherever
+    they stand in the list, so messages rebuilt or shifted by the context
+    budget are not encoded again. The digest of a message seen in the
+    previous request is not recomputed while its content stays the same
+    object; a message edited in place is encoded again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encoded: Dict[bytes, bytes] = {}  # Digest -> encoded message of the previous request
+        self._digests: Dict[int, Tuple[dict, object, bytes]] = {}  # id -> (message, its content, digest)
+        self.reused_messages = 0
+        self.encoded_messages = 0
+
+    def encode(self, api_params: dict) -> bytes:
+        """Encode a request body.
+
+        Args:
+            api_params: Request body from _prepare_api_params()
+
+        Returns:
+            UTF-8 JSON of the same object as json.dumps(api_params)
+        """
+        messages = api_params.get("messages")
+        if not isinstance(messages, list):
+            return _encode(api_params)
+        header = _encode({key: value for key, value in api_params.items() if key != "messages"})
+        with self._lock:
+            encoded: Dict[bytes, bytes] = {}
+            digests: Dict[int, Tuple[dict, object, bytes]] = {}
+            parts = []
+            reused = 0
+            for message in messages:
+                digest = self._message_digest(message)
+                body = encoded.get(digest) or self._encoded.get(digest)
+                if body is None:
+                    body = _encode(message)
+                else:
+                    reused += 1
+                encoded[digest] = body
+                digests[id(message)] = (message, message.get("content") if isinstance(message, dict) else None, digest)
+                parts.append(body)
+            self._encoded, self._digests = encoded, digests
+            self.reused_messages += reused
+            self.encoded_messages += len(messages) - reused
+            rest = b"}" if header == b"{}" else b"," + header[1:]
+            return b"".join((b'{"messages":[', b",".join(parts), b"]", rest))
+
+    def _message_digest(self, message) -> bytes:
+        known = self._digests.get(id(message))
+        if known is not None:
+            previous, content, digest = known
+            if message is previous and isinstance(message, dict) and message.get("content") is content:
+                return digest
+        return _digest(message)
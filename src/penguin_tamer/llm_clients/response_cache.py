@@ -0,0 +1,236 @@
+"""
+Response Cache - Кэш ответов LLM на диске для повторяющихся запросов.
+
+С заданным seed и низкой температурой или при повторном прогоне
+скриптовых промптов в CI один и тот же запрос (модель, сообщения,
+параметры) снова оплачивается у провайдера. Кэш хранит ответы в SQLite
+в каталоге конфигурации по каноническому хэшу тела запроса из
+_prepare_api_params(). Размер ограничен (вытесняются давно не
+использованные записи), устаревшие по TTL записи удаляются. Кэш
+включается явно; ошибки базы никогда не ломают запрос.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+
+# Database file in the config dir
+CACHE_FILE_NAME = "response_cache.sqlite3"
+
+# Highest temperature treated as deterministic without a seed
+_DETERMINISTIC_TEMPERATURE = 0.3
+
+# Request keys that change the transport, not the reply
+_TRANSPORT_KEYS = frozenset({"stream", "stream_options"})
+
+# Seed keys of the request bodies of different providers (Mistral uses random_seed)
+_SEED_KEYS = ("seed", "random_seed")
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Response cache policy from the `global.response_cache` config section."""
+    enabled: bool = False
+    deterministic_only: bool = True  # Cache only requests with a seed or a low temperature
+    max_mb: float = 32.0             # Size limit of cached replies
+    ttl: float = 86400.0             # Seconds a reply stays valid
+
+    @classmethod
+    def from_config(cls) -> "CacheSettings":
+        """Read settings, invalid values keep their defaults."""
+        from penguin_tamer.config_manager import config
+
+        section = config.get("global", "response_cache", None) or {}
+        values = {
+            "enabled": bool(section.get("enabled", False)),
+            "deterministic_only": bool(section.get("deterministic_only", True)),
+        }
+        for name in ("max_mb", "ttl"):
+            try:
+                value = float(section[name])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if value > 0:
+                values[name] = value
+        return cls(**values)
+
+    def accepts(self, api_params: dict) -> bool:
+        """Whether the reply to this request may be cached."""
+        if not self.enabled:
+            return False
+        if not self.deterministic_only or any(api_params.get(key) is not None for key in _SEED_KEYS):
+            return True
+        temperature = api_params.get("temperature")
+        return isinstance(temperature, (int, float)) and temperature <= _DETERMINISTIC_TEMPERATURE
+
+
+def request_key(provider: str, api_params: dict) -> str:
+    """Canonical hash of a request: provider and body, independent of key order.
+
+    Args:
+        provider: Provider key (API host), the same model name may differ between providers
+        api_params: Request body from _prepare_api_params()
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    body = {key: value for key, value in api_params.items() if key not in _TRANSPORT_KEYS}
+    canonical = json.dumps([provider, body], sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of replies with LRU eviction by size and TTL expiry."""
+
+    def __init__(self, path: Path, max_bytes: int, ttl: float, clock: Callable[[], float] = time.time):
+        """Initialize cache, the database is opened on first use.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Total size of cached replies (UTF-8 bytes)
+            ttl: Seconds a reply stays valid
+            clock: Wall clock (entries outlive the process)
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached reply of a request, marked as recently used.
+
+        Returns:
+            Reply text or None on miss (expired entries are removed)
+        """
+        now = self._clock()
+        with self._lock:
+            try:
+                db = self._db()
+                row = db.execute("SELECT reply, created FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                db.commit()
+            except (sqlite3.Error, OSError):
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, reply: str) -> None:
+        """Store a reply and evict entries beyond the size limit."""
+        size = len(reply.encode("utf-8", "surrogatepass"))
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, reply, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, reply, size, now, now)
+                )
+                self._evict(db, now)
+                db.commit()
+            except (sqlite3.Error, OSError):
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Hits and misses of this process, entries and size on disk."""
+        with self._lock:
+            try:
+                entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            except (sqlite3.Error, OSError):
+                entries, size = 0, 0
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Used under the lock from the render thread and background readers
+            self._connection = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, reply TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+        return self._connection
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+        total = 0
+        stale = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed DESC"):
+            total += size
+            if total > self.max_bytes:
+                stale.append((key,))
+        db.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+
+class CachedReplyStream:
+    """Stream replaying a cached reply line by line.
+
+    Provides the chunk extractors of StreamReader itself, so the replay
+    goes through the same reader and rendering path as a provider stream.
+    Usage is not replayed: a cached reply costs no tokens.
+    """
+
+    def __init__(self, reply: str):
+        self.reply = reply
+
+    def __iter__(self) -> Iterator[dict]:
+        for line in self.reply.splitlines(keepends=True):
+            yield {"content": line}
+
+    @staticmethod
+    def _extract_chunk_content(chunk: dict) -> Optional[str]:
+        return chunk.get("content")
+
+    @staticmethod
+    def _extract_usage_stats(chunk: dict) -> Optional[dict]:
+        return None
+
+
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache(settings: CacheSettings) -> Optional[ResponseCache]:
+    """Shared response cache in the config dir, None if the cache is off."""
+    global _response_cache
+    if not settings.enabled:
+        return None
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(_cache_file(), int(settings.max_mb * 1024 * 1024), settings.ttl)
+        else:
+            _response_cache.max_bytes = int(settings.max_mb * 1024 * 1024)
+            _response_cache.ttl = settings.ttl
+        return _response_cache
+
+
+def _cache_file() -> Path:
+    from penguin_tamer.config_manager import config
+    return Path(config.user_config_dir) / CACHE_FILE_NAME
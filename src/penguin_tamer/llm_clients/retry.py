@@ -0,0 +1,60 @@
+"""
+Retry - Повтор запросов после временных ошибок.
+
+Обрыв соединения, таймаут, 429 или 5xx до первого чанка больше не
+прерывают ход диалога: запрос повторяется с экспоненциальной задержкой
+и джиттером (или через время из Retry-After), пока не исчерпано число
+попыток или общий бюджет ожидания. Повторяются только ошибки, которые
+ErrorHandler считает восстановимыми; ответ, уже начавший выводиться,
+не повторяется никогда.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from penguin_tamer.error_handlers import ErrorHandler
+from penguin_tamer.llm_clients.rate_limiter import retry_after_seconds
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter, capped by a total delay."""
+    retries: int = 2            # Attempts after the first one (0 - no retries)
+    backoff: float = 0.5        # Base delay of the first retry, doubled every attempt
+    max_backoff: float = 8.0    # Upper bound of a single delay without Retry-After
+    max_delay: float = 20.0     # Total seconds the request may spend waiting between attempts
+
+    @classmethod
+    def from_settings(cls, settings) -> "RetryPolicy":
+        """Policy of a provider from its NetworkSettings."""
+        return cls(
+            retries=settings.retries,
+            backoff=settings.retry_backoff,
+            max_backoff=settings.retry_max_backoff,
+            max_delay=settings.retry_max_delay,
+        )
+
+    def next_delay(self, error: Exception, attempt: int, waited: float,
+                   rng: Callable[[], float] = random.random) -> Optional[float]:
+        """Delay before the next attempt.
+
+        Args:
+            error: Error of the failed attempt
+            attempt: Number of retries made so far
+            waited: Seconds already spent waiting between attempts
+            rng: Source of jitter in [0, 1)
+
+        Returns:
+            Seconds to wait, None if the request must not be retried
+        """
+        if attempt >= self.retries or not ErrorHandler.is_recoverable(error):
+            return None
+        delay = retry_after_seconds(error)
+        if delay is None:
+            # "Equal jitter": half of the backoff is kept, half is random
+            backoff = min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay = backoff / 2 + backoff / 2 * rng()
+        if waited + delay > self.max_delay:
+            return None
+        return delay
@@ -7,13 +7,46 @@ Stream Processor - Общий процессор для обработки по
 
 import threading
 import time
+from contextlib import nullcontext
 from typing import List, Optional
 
 from rich.live import Live
 
 from penguin_tamer.i18n import t
 from penguin_tamer.config_manager import config
-from penguin_tamer.error_handlers import ErrorHandler, ErrorContext, ErrorSeverity
+from penguin_tamer.text_utils import LabeledCodeBlockParser
+from penguin_tamer.error_handlers import ErrorHandler, ErrorContext, ErrorSeverity, StreamStallError
+from penguin_tamer.llm_clients.context_window import ContextSettings
+from penguin_tamer.llm_clients.hedging import DeferredStream, HedgeLane, HedgeSettings
+from penguin_tamer.llm_clients.markdown_stream import IncrementalMarkdownRenderer, RenderScheduler
+from penguin_tamer.llm_clients.metrics import RequestMetrics
+from penguin_tamer.llm_clients.response_cache import CacheSettings, CachedReplyStream, get_response_cache, request_key
+from penguin_tamer.llm_clients.retry import RetryPolicy
+from penguin_tamer.llm_clients.stream_reader import StreamReader, CONTENT, USAGE, ERROR, DONE, _POLL_INTERVAL
+from penguin_tamer.llm_clients.token_estimator import count_prompt_tokens
+
+
+# Queue wait per stream while two hedged streams race for the first chunk
+_HEDGE_POLL_INTERVAL = 0.02
+
+# Follow-up requests per reply after stalls (network.continue_on_stall)
+_MAX_CONTINUATIONS = 2
+
+# Request sent with the partial reply to continue it after a stall
+_CONTINUE_PROMPT = (
+    "Your previous answer was cut off. Continue it exactly from where it stopped, "
+    "without repeating anything."
+)
+
+
+class _NullOutput:
+    """File stand-in that discards the reply (events carry it instead)."""
+
+    def write(self, text: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
 
 
 class StreamProcessor:
@@ -21,6 +54,33 @@ class StreamProcessor:
 
     Encapsulates the logic of processing streaming responses from LLM API,
     including error handling, chunk processing, and live display management.
+
+    The provider stream is read by a background StreamReader, so slow
+    terminal painting never delays socket reads; the render loop consumes
+    extracted content from the reader's bounded queue.
+
+    When output is not a terminal (or raw output is forced), the spinner and
+    Markdown rendering are skipped and chunks are written to the console file
+    as they are. In "json" mode nothing is displayed and the reply is reported
+    only through NDJSON events of the client's event emitter.
+
+    If the client has a hedge client and `hedging.after` is set, a late first
+    chunk triggers the same request to the backup LLM; the stream answering
+    first is used for the rest of the reply.
+
+    When the provider keeps failing before the first chunk (retries
+    exhausted, authentication error), the request moves on to the client's
+    fallback clients in order. They share the dialog messages, so the
+    conversation continues unchanged.
+
+    A watchdog aborts streams that send nothing for longer than the
+    first-byte timeout (the attempt fails and may be retried) or, once the
+    reply has started, the idle timeout. A stalled reply is kept and marked
+    as truncated, or continued by a follow-up request if
+    `network.continue_on_stall` is on.
+
+    With `response_cache` enabled, replies to identical requests are
+    replayed from the on-disk cache through the same reader and rendering.
     """
 
     def __init__(self, client):
@@ -33,6 +93,18 @@ class StreamProcessor:
         self.interrupted = threading.Event()
         self.reply_parts: List[str] = []
         self.user_input: str = ""  # Store user input to add to context only on success
+        self._reader: Optional[StreamReader] = None
+        self.metrics = RequestMetrics(model=client.model)
+        # Client whose stream is being read (main, fallback or hedge backup) and its network settings
+        self.active_client = client
+        self._network = client.network_settings
+        self.truncated = False  # Reply was cut by a stalled stream
+        self._cache_key: Optional[str] = None  # Key under which a complete reply is cached
+        self.output_mode = self._resolve_output_mode()
+
+        # Code blocks become available as soon as their closing fence arrives
+        self.code_block_parser = LabeledCodeBlockParser()
+        client.code_blocks = self.code_block_parser.blocks
 
     def process(self, user_input: str) -> str:
         """Process user input and return AI response.
@@ -45,51 +117,112 @@ class StreamProcessor:
         """
         # Store user input to add to context only if request succeeds
         self.user_input = user_input
+        self._apply_context_summary()
+        self._emit("request_start", model=self.client.model, output_mode=self.output_mode)
 
         # Create error handler
         debug_mode = config.get("global", "debug", False)
         error_handler = ErrorHandler(console=self.client.console, debug_mode=debug_mode)
 
-        # Phase 1: Connect and wait for first chunk
-        stream, first_chunk = self._connect_and_wait(error_handler)
-        if stream is None:
-            # Error occurred - don't add user message to context
-            return ""
-
-        # Phase 2: Process stream with live display
+        status = "error"
         try:
-            reply = self._stream_with_live_display(stream, first_chunk)
+            # Phase 1: Connect and wait for first chunk.
+            # Built once: the cache key and the sent request share the fitted context
+            api_params = self.client._prepare_api_params(self.user_input)
+            reader, first_chunk = self._connect_and_wait(error_handler, api_params)
+            if reader is None:
+                # Error occurred - don't add user message to context
+                return ""
+            self._report_answering_llm()
+            if debug_mode:
+                self._report_context_trim()
+
+            # Phase 2: Process stream with live display (or plain output)
+            try:
+                if first_chunk is None:
+                    # The reader already reported DONE: empty or usage-only stream
+                    reply = ""
+                elif self.output_mode == "raw":
+                    reply = self._stream_plain(reader, first_chunk, self.client.console.file)
+                elif self.output_mode == "json":
+                    reply = self._stream_plain(reader, first_chunk, None)
+                else:
+                    reply = self._stream_with_live_display(reader, first_chunk)
+            except KeyboardInterrupt:
+                self.interrupted.set()
+                # Interrupted - don't add to context
+                raise
+            usage_stats = self.active_client._estimated_usage(self.metrics, reply)
+            if usage_stats:
+                self._record_usage(usage_stats)
+            status = "ok" if reply.strip() else "empty"
+            if self.truncated:
+                status = "truncated"
+                self._report_truncated()
+            elif status == "ok":
+                self._cache_reply(reply)
         except KeyboardInterrupt:
-            self.interrupted.set()
-            # Interrupted - don't add to context
+            status = "interrupted"
+            raise
+        except Exception as e:
+            self._emit_error(e)
             raise
+        finally:
+            # Stops the reader thread and releases the connection
+            if self._reader is not None:
+                self._reader.close()
+            self.metrics.finish(status)
+            self.client._store_metrics(self.metrics)
+            self._emit("response_end", status=status, metrics=self.metrics.to_dict())
 
         # Phase 3: Finalize (will add user message to context if successful)
-        return self._finalize_response(reply)
+        reply = self._finalize_response(reply)
+        if self.client.summarizer is not None:
+            self.client.summarizer.schedule(ContextSettings.from_config(self.client.model))
+        return reply
+
+    def _apply_context_summary(self) -> None:
+        """Swap a ready background summary into the dialog before the next request."""
+        summarizer = self.client.summarizer
+        if summarizer is None:
+            return
+        turns = summarizer.summarized_turns
+        saved = summarizer.apply()
+        if saved is not None and config.get("global", "debug", False) and self.output_mode != "json":
+            self.client.console.print(
+                t("[dim]Context: {turns} old turns replaced by a summary, ~{tokens} tokens saved.[/dim]").format(
+                    turns=summarizer.summarized_turns - turns, tokens=saved
+                )
+            )
 
-    def _connect_and_wait(self, error_handler: ErrorHandler) -> tuple:
-        """Connect to API and wait for first chunk.
+    def _connect_and_wait(self, error_handler: ErrorHandler, api_params: dict) -> tuple:
+        """Connect to API, start background reader and wait for first chunk.
+
+        Args:
+            error_handler: Handler reporting a failed request
+            api_params: Request body of the main client
 
         Returns:
-            Tuple of (stream, first_chunk) or (None, None) on error
+            Tuple of (reader, first_chunk) or (None, None) on error
         """
-        with self.client._managed_spinner(t('Connecting...')) as status_message:
-            try:
-                # Send API request with user input (but don't add to permanent context yet)
-                api_params = self.client._prepare_api_params(self.user_input)
-                stream = self.client._create_stream(api_params)
+        if self.output_mode in ("raw", "json"):
+            spinner = nullcontext({})
+        else:
+            spinner = self.client._managed_spinner(t('Connecting...'))
 
-                # Try to extract rate limit info from stream (if available)
-                self.client._extract_rate_limits(stream)
-
-                # Wait for first chunk
-                status_message['text'] = t('Ai thinking...')
-                first_chunk = self._wait_first_chunk(stream)
+        with spinner as status_message:
+            try:
+                self.metrics.warmup_saved = self.client.take_warmup_savings()
+                if self._open_cached_reply(api_params):
+                    first_chunk = self._wait_first_chunk(self._reader)
+                else:
+                    first_chunk = self._send_with_failover(status_message, api_params)
 
                 if first_chunk:
-                    self.reply_parts.append(first_chunk)
+                    self._emit("first_chunk", ttft=self.metrics.ttft)
+                    self._accept_chunk(first_chunk)
 
-                return stream, first_chunk
+                return self._reader, first_chunk
 
             except KeyboardInterrupt:
                 self.interrupted.set()
@@ -103,79 +236,604 @@ class StreamProcessor:
                 )
                 error_message = error_handler.handle(e, context)
                 self.client.console.print(error_message)
+                self._emit_error(e)
                 return None, None
 
-    def _wait_first_chunk(self, stream) -> Optional[str]:
-        """Ожидание первого чанка с контентом (используется API-специфичный парсинг)."""
+    def _send_with_failover(self, status_message: dict, api_params: dict) -> Optional[str]:
+        """Send the request to the client, then to its fallback clients while providers fail.
+
+        Args:
+            status_message: Spinner status
+            api_params: Request body of the main client (fallback clients build their own)
+
+        Returns:
+            First content chunk, None for an empty reply
+
+        Raises:
+            KeyboardInterrupt: When interrupted
+            Exception: Error of the last client tried
+        """
+        chain = [self.client] + list(self.client.fallback_clients)
+        for index, client in enumerate(chain):
+            try:
+                return self._send_with_retries(client, status_message, api_params if index == 0 else None)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                if index + 1 == len(chain) or not ErrorHandler.is_failover_error(e):
+                    raise
+                self._switch_to_fallback(chain[index + 1], e, status_message)
+
+    def _send_with_retries(self, client, status_message: dict, api_params: Optional[dict] = None) -> Optional[str]:
+        """Send the request to one client, repeating it after recoverable errors.
+
+        Args:
+            client: Main client or one of its fallback clients
+            status_message: Spinner status
+            api_params: Request body, built for the client if None
+
+        Returns:
+            First content chunk, None for an empty reply
+
+        Raises:
+            KeyboardInterrupt: When interrupted
+            Exception: Error of the last attempt
+        """
+        # Send API request with user input (but don't add to permanent context yet)
+        if api_params is None:
+            api_params = client._prepare_api_params(self.user_input)
+        self.metrics.estimated_prompt_tokens = count_prompt_tokens(api_params["messages"])
+        policy = RetryPolicy.from_settings(client.network_settings)
+        # Every client of the chain gets its own attempts and delay budget
+        retries = self.metrics.retries
+        waited_before = self.metrics.retry_delay + (self.metrics.throttled or 0.0)
+
+        while True:
+            try:
+                return self._open_and_wait(client, api_params, status_message)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                client._observe_error(e)
+                # Nothing has been shown yet, so the request can safely be sent again.
+                # Rate limit waits count towards the total delay as well.
+                waited = self.metrics.retry_delay + (self.metrics.throttled or 0.0) - waited_before
+                delay = policy.next_delay(e, self.metrics.retries - retries, waited)
+                if delay is None:
+                    raise
+                self._wait_before_retry(e, delay, status_message)
+
+    def _open_and_wait(self, client, api_params: dict, status_message: dict) -> Optional[str]:
+        """Send one attempt of the request and wait for its first chunk.
+
+        Args:
+            client: Client sending the attempt
+            api_params: Request body
+            status_message: Spinner status
+
+        Returns:
+            First content chunk, None for an empty reply
+
+        Raises:
+            KeyboardInterrupt: When interrupted
+            Exception: Error of the attempt (before any content)
+        """
+        self.active_client = client
+        self._network = client.network_settings
+        # Wait here rather than burn the request on a certain 429
+        throttled = client._throttle(
+            api_params,
+            on_wait=lambda delay: status_message.update(
+                text=t('Rate limit: waiting {seconds} s...').format(seconds=f"{delay:.0f}"))
+        )
+        if throttled is not None:
+            self.metrics.throttled = (self.metrics.throttled or 0.0) + throttled
+        hedge = HedgeSettings.from_config()
+        hedging = client.hedge_client is not None and hedge.after > 0
+        if hedging:
+            # Connect in the reader thread: slow providers often stall before the headers
+            stream = DeferredStream(client, api_params, self.metrics, throttle=False)
+        else:
+            stream = client._create_stream(api_params)
+            self.metrics.mark_connected()
+
+            # Rate limit info from stream (if available) also feeds the rate limiter
+            client._observe_rate_limits(stream)
+            client._observe_connected()
+            self._emit_rate_limits(client)
+
+        self._reader = StreamReader(
+            client, stream, self.interrupted, metrics=self.metrics
+        ).start()
+
+        # Wait for first chunk
+        if client is self.client:
+            status_message['text'] = t('Ai thinking...')
+        else:
+            status_message['text'] = t('Ai thinking ({model})...').format(model=client.model)
+        if hedging:
+            first_chunk = self._race_first_chunk(client, hedge.after, status_message)
+            self._emit_rate_limits(client)
+            return first_chunk
+        return self._wait_first_chunk(self._reader)
+
+    def _drop_attempt(self) -> None:
+        """Stop the reader of a failed attempt before the request is sent again."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        # Closing the reader has set its stop event, the next attempt needs a fresh one
+        self.interrupted = threading.Event()
+
+    def _wait_before_retry(self, error: Exception, delay: float, status_message: dict) -> None:
+        """Drop the failed attempt and sleep before the next one."""
+        self._drop_attempt()
+        self.metrics.record_retry(delay)
+        self._emit("retry", attempt=self.metrics.retries, delay=delay, error=type(error).__name__)
+        status_message['text'] = t('Retrying in {seconds} s...').format(seconds=f"{delay:.1f}")
+        time.sleep(delay)
+
+    def _switch_to_fallback(self, client, error: Exception, status_message: dict) -> None:
+        """Drop the failed provider and continue the request with the next fallback client."""
+        self._drop_attempt()
+        self.metrics.model = client.model
+        self.metrics.fallback = client.model
+        self._emit("fallback", model=client.model, error=type(error).__name__)
+        status_message['text'] = t('Switching to {model}...').format(model=client.model)
+
+    def _wait_first_chunk(self, reader: StreamReader) -> Optional[str]:
+        """Ожидание первого чанка с контентом из очереди фонового читателя.
+
+        Raises:
+            KeyboardInterrupt: When interrupted
+            Exception: Error raised by the provider stream
+        """
+        while True:
+            if self.interrupted.is_set():
+                raise KeyboardInterrupt("Stream interrupted")
+
+            item = reader.get()
+            if item is None:
+                stall = self._check_stall(reader)
+                if stall is not None:
+                    raise stall
+                continue
+
+            kind, payload = item
+            if kind == CONTENT:
+                return payload
+            if kind == USAGE:
+                self._record_usage(payload)
+            elif kind == ERROR:
+                raise payload
+            elif kind == DONE:
+                return None
+
+    def _race_first_chunk(self, client, hedge_after: float, status_message: dict) -> Optional[str]:
+        """Wait for the first chunk, sending a backup request if it is late.
+
+        After `hedge_after` seconds without content the same request goes to
+        the hedge client. The stream delivering content first wins and
+        becomes the reader of this processor, the other one is closed.
+
+        Args:
+            client: Client of the primary stream
+            hedge_after: Seconds to wait before the backup request
+            status_message: Spinner status, shows that the backup was asked
+
+        Raises:
+            KeyboardInterrupt: When interrupted
+            Exception: Error of the primary stream (of the first failed one
+                if both failed)
+        """
+        lanes = [HedgeLane("primary", client, self._reader, self.metrics, self.interrupted)]
+        winner, first_chunk = None, None
         try:
-            for chunk in stream:
+            while winner is None:
                 if self.interrupted.is_set():
                     raise KeyboardInterrupt("Stream interrupted")
 
-                # Use client-specific chunk content extraction
-                content = self.client._extract_chunk_content(chunk)
-                if content:
-                    return content
-        except (AttributeError, IndexError):
-            return None
-        return None
-
-    def _stream_with_live_display(self, stream, first_chunk: str) -> str:
+                running = [lane for lane in lanes if not lane.done]
+                if not running:
+                    # Nobody delivered content: empty reply, or errors everywhere
+                    errors = [lane.error for lane in lanes if lane.error is not None]
+                    if len(errors) == len(lanes):
+                        raise errors[0]
+                    winner = next(lane for lane in lanes if lane.error is None)
+                    break
+
+                if len(lanes) == 1:
+                    remaining = hedge_after - self.metrics.elapsed()
+                    if remaining <= 0:
+                        backup = client.hedge_client
+                        lanes.append(self._start_backup_lane(backup))
+                        status_message['text'] = t('No answer yet, asking {model} too...').format(model=backup.model)
+                        continue
+                    timeout = min(remaining, _POLL_INTERVAL)
+                else:
+                    timeout = _HEDGE_POLL_INTERVAL
+
+                for lane in running:
+                    item = lane.reader.get(timeout=timeout)
+                    if item is None:
+                        stall = self._check_stall(lane.reader)
+                        if stall is not None:
+                            lane.error, lane.done = stall, True
+                            lane.client._observe_error(stall)
+                        continue
+                    kind, payload = item
+                    if kind == CONTENT:
+                        winner, first_chunk = lane, payload
+                        break
+                    if kind == USAGE:
+                        lane.usage.append(payload)
+                    elif kind == ERROR:
+                        lane.error = payload
+                        lane.client._observe_error(payload)
+                    elif kind == DONE:
+                        lane.done = True
+
+            self._adopt_lane(winner, hedged=len(lanes) > 1)
+            return first_chunk
+        finally:
+            # Losers (or every backup on error) stop and release their connections
+            for lane in lanes:
+                if lane.reader is not self._reader:
+                    lane.reader.close()
+
+    def _start_backup_lane(self, backup) -> HedgeLane:
+        """Send the pending request to the backup client in a background reader."""
+        metrics = RequestMetrics(model=backup.model)
+        # TTFT of the backup counts from the user's request, not from the hedge
+        metrics.share_start(self.metrics)
+        stop_event = threading.Event()
+        stream = DeferredStream(backup, backup._prepare_api_params(self.user_input), metrics)
+        reader = StreamReader(backup, stream, stop_event, metrics=metrics).start()
+        return HedgeLane("backup", backup, reader, metrics, stop_event)
+
+    def _adopt_lane(self, lane: HedgeLane, hedged: bool) -> None:
+        """Continue the reply with the stream of the winning lane."""
+        if hedged:
+            self.metrics.hedged = True
+            self.metrics.hedge_winner = lane.role
+        if lane.role == "backup":
+            # Every reader stops on its own event, follow the one of the winner
+            self.interrupted = lane.stop_event
+            self._reader = lane.reader
+            self.metrics.merge_hedge(lane.metrics)
+            self.active_client = lane.client
+            self._network = lane.client.network_settings
+        for usage_stats in lane.usage:
+            self._record_usage(usage_stats)
+        if hedged:
+            self._emit("hedge", winner=lane.role, model=lane.client.model)
+
+    def _report_answering_llm(self) -> None:
+        """Tell the user that the reply comes from a backup or fallback LLM."""
+        if self.output_mode != "rich":
+            return
+        if self.metrics.hedge_winner == "backup":
+            self.client.console.print(
+                t("[dim]Backup {model} answered first.[/dim]").format(model=self.metrics.model)
+            )
+        elif self.metrics.fallback:
+            self.client.console.print(
+                t("[dim]Answered by fallback {model}.[/dim]").format(model=self.metrics.fallback)
+            )
+
+    def _report_context_trim(self) -> None:
+        """Show what the token budget removed from the request (debug mode)."""
+        trim = self.active_client.last_context_trim
+        if trim is None or not trim.trimmed or self.output_mode == "json":
+            return
+        self.client.console.print(t(
+            "[dim]Context: {turns} old turns dropped, {messages} messages truncated, ~{tokens} tokens saved.[/dim]"
+        ).format(turns=trim.dropped_turns, messages=trim.truncated_messages, tokens=trim.saved_tokens))
+
+    def _stream_with_live_display(self, reader: StreamReader, first_chunk: str) -> str:
         """Process stream with live markdown display.
 
+        Completed markdown blocks are printed once above the live region,
+        only the open tail block is re-rendered. Chunks are read without any
+        delay; redraws are paced by `refresh_per_second` and merge all chunks
+        received since the previous frame.
+
         Args:
-            stream: API response stream
+            reader: Started background reader of the API stream
             first_chunk: First chunk of content
 
         Returns:
             Complete response text
         """
-        sleep_time = config.get("global", "sleep_time", 0.01)
         refresh_per_second = config.get("global", "refresh_per_second", 10)
         theme_name = config.get("global", "markdown_theme", "default")
 
         with Live(
             console=self.client.console,
-            refresh_per_second=refresh_per_second,
-            auto_refresh=True
+            auto_refresh=False
         ) as live:
+            renderer = IncrementalMarkdownRenderer(
+                live,
+                lambda text: self.client._create_markdown(text, theme_name),
+                # Only committed blocks are final, the tail changes every frame
+                lambda text: self.client._create_markdown(text, theme_name, cache_document=True)
+            )
+            scheduler = RenderScheduler(refresh_per_second)
+
             # Show first chunk
             if first_chunk:
-                markdown = self.client._create_markdown(first_chunk, theme_name)
-                live.update(markdown)
-                # Record first chunk for demo
-                if self.client._demo_manager:
-                    self.client._demo_manager.record_llm_chunk(first_chunk)
+                renderer.append(first_chunk)
+                scheduler.mark_dirty()
 
             # Process remaining chunks
             try:
-                for chunk in stream:
+                finished = False
+                while not finished:
                     if self.interrupted.is_set():
                         raise KeyboardInterrupt("Stream interrupted")
 
-                    # Use client-specific chunk content extraction
-                    text = self.client._extract_chunk_content(chunk)
-                    if text:
-                        self.reply_parts.append(text)
-                        # Record chunk for demo
-                        if self.client._demo_manager:
-                            self.client._demo_manager.record_llm_chunk(text)
-                        full_text = "".join(self.reply_parts)
-                        markdown = self.client._create_markdown(full_text, theme_name)
-                        live.update(markdown)
-                        time.sleep(sleep_time)
-
-                    # Use client-specific usage stats extraction (ВСЕГДА проверяем, не только если нет контента)
-                    usage_stats = self.client._extract_usage_stats(chunk)
-                    if usage_stats:
-                        self.client.total_prompt_tokens += usage_stats.get('prompt_tokens', 0)
-                        self.client.total_completion_tokens += usage_stats.get('completion_tokens', 0)
-                        self.client.total_requests += 1
-            except (AttributeError, IndexError):
-                pass
+                    # Sleep on the queue until data arrives or the next frame is due
+                    item = reader.get(timeout=scheduler.time_until_next_frame())
+                    stall = self._check_stall(reader) if item is None else None
+                    if stall is not None:
+                        reader = self._recover_from_stall(stall)
+                        if reader is None:
+                            break
+
+                    while item is not None:
+                        kind, payload = item
+                        if kind == CONTENT:
+                            self._accept_chunk(payload)
+                            renderer.append(payload)
+                            scheduler.mark_dirty()
+                        elif kind == USAGE:
+                            self._record_usage(payload)
+                        elif kind == ERROR:
+                            raise payload
+                        elif kind == DONE:
+                            finished = True
+                            break
+                        # Drain everything that is already queued before rendering
+                        item = reader.get_nowait()
+
+                    if scheduler.due():
+                        self._render_frame(renderer, scheduler)
+            finally:
+                # Final frame with everything received so far
+                if scheduler.dirty:
+                    self._render_frame(renderer, scheduler)
 
         return "".join(self.reply_parts)
 
+    def _stream_plain(self, reader: StreamReader, first_chunk: str, out) -> str:
+        """Write stream to a file without spinner or Markdown.
+
+        Chunks go to the file buffer as they are; it is flushed only when the
+        reader queue is drained, so bursts of chunks cost a single write call.
+
+        Args:
+            reader: Started background reader of the API stream
+            first_chunk: First chunk of content
+            out: Text file for the reply, None to report it only through events
+
+        Returns:
+            Complete response text
+        """
+        if out is None:
+            out = _NullOutput()
+
+        if first_chunk:
+            out.write(first_chunk)
+
+        try:
+            while True:
+                if self.interrupted.is_set():
+                    raise KeyboardInterrupt("Stream interrupted")
+
+                item = reader.get_nowait()
+                if item is None:
+                    out.flush()
+                    item = reader.get()
+                    if item is None:
+                        stall = self._check_stall(reader)
+                        if stall is not None:
+                            reader = self._recover_from_stall(stall)
+                            if reader is None:
+                                break
+                        continue
+
+                kind, payload = item
+                if kind == CONTENT:
+                    self._accept_chunk(payload)
+                    out.write(payload)
+                elif kind == USAGE:
+                    self._record_usage(payload)
+                elif kind == ERROR:
+                    raise payload
+                elif kind == DONE:
+                    break
+
+            reply = "".join(self.reply_parts)
+            if reply and not reply.endswith("\n"):
+                out.write("\n")
+        finally:
+            out.flush()
+
+        return reply
+
+    # === Response cache ===
+
+    def _open_cached_reply(self, api_params: dict) -> bool:
+        """Start replaying the cached reply to this request, if there is one.
+
+        Also remembers the cache key, so a fresh complete reply is stored.
+
+        Args:
+            api_params: Request body of the main client
+
+        Returns:
+            True if the reader replays a cached reply
+        """
+        settings = CacheSettings.from_config()
+        cache = get_response_cache(settings)
+        if cache is None:
+            return False
+        if not settings.accepts(api_params):
+            return False
+
+        self._cache_key = request_key(self.client._provider_key, api_params)
+        reply = cache.get(self._cache_key)
+        self._emit("cache", hit=reply is not None)
+        if config.get("global", "debug", False):
+            self.client.console.print(f"[dim]Response cache: {'hit' if reply is not None else 'miss'}[/dim]")
+        if reply is None:
+            return False
+
+        self.metrics.cached = True
+        self.metrics.mark_connected()
+        stream = CachedReplyStream(reply)
+        self._reader = StreamReader(stream, stream, self.interrupted, metrics=self.metrics).start()
+        return True
+
+    def _cache_reply(self, reply: str) -> None:
+        """Store a complete fresh reply of the main client."""
+        if self._cache_key is None or self.metrics.cached or self.active_client is not self.client:
+            return
+        cache = get_response_cache(CacheSettings.from_config())
+        if cache is not None:
+            cache.put(self._cache_key, reply)
+
+    # === Stall watchdog ===
+
+    def _check_stall(self, reader: StreamReader) -> Optional[StreamStallError]:
+        """Error for a stream silent longer than its timeout, None while it is alive.
+
+        The first-byte timeout applies until the provider sends its first
+        chunk, the idle timeout afterwards. A stream that has ended never
+        stalls, however long its DONE waits to be consumed.
+        """
+        if reader.finished:
+            return None
+        if reader.chunks_read:
+            timeout = self._network.idle_timeout
+        else:
+            timeout = self._network.first_byte_timeout
+        if reader.idle_time() <= timeout:
+            return None
+        return StreamStallError(f"No data from the provider in {timeout:.0f} s", timeout=timeout)
+
+    def _recover_from_stall(self, error: StreamStallError) -> Optional[StreamReader]:
+        """Abort a stalled reply stream, continuing the reply if enabled.
+
+        Returns:
+            Reader of the continuation request, None if the reply stays truncated
+        """
+        client = self.active_client
+        self._drop_attempt()
+        # A stalled stream counts as an outage of the provider
+        client._observe_error(error)
+        self.metrics.stalls += 1
+        self._emit("stall", timeout=error.timeout, chars=self.metrics.chars)
+
+        if self._network.continue_on_stall and self.metrics.continuations < _MAX_CONTINUATIONS:
+            try:
+                return self._open_continuation(client)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                client._observe_error(e)
+        self.truncated = True
+        return None
+
+    def _open_continuation(self, client) -> StreamReader:
+        """Ask the model to continue the partial reply and read the new stream."""
+        api_params = client._prepare_api_params(self.user_input)
+        api_params["messages"] = list(api_params["messages"]) + [
+            {"role": "assistant", "content": "".join(self.reply_parts)},
+            {"role": "user", "content": _CONTINUE_PROMPT},
+        ]
+        client._throttle(api_params)
+        stream = client._create_stream(api_params)
+        client._observe_rate_limits(stream)
+        client._observe_connected()
+        self.metrics.continuations += 1
+        self._emit("continuation", attempt=self.metrics.continuations)
+        self._reader = StreamReader(client, stream, self.interrupted, metrics=self.metrics).start()
+        return self._reader
+
+    def _report_truncated(self) -> None:
+        """Mark a reply cut by a stalled stream."""
+        if self.output_mode == "json":
+            return
+        self.client.console.print(
+            f"[dim italic]{t('Answer truncated: the provider stopped sending data.')}[/dim italic]"
+        )
+
+    def _resolve_output_mode(self) -> str:
+        """Pick "rich", "raw" or "json" output from client setting and terminal state."""
+        mode = getattr(self.client, "output_mode", "auto")
+        if mode == "auto":
+            return "rich" if self.client.console.is_terminal else "raw"
+        return mode
+
+    def _accept_chunk(self, text: str) -> None:
+        """Store content chunk, feed code block parser and demo recorder."""
+        self.reply_parts.append(text)
+        self._emit("chunk", text=text)
+
+        for block in self.code_block_parser.feed(text):
+            self._emit(
+                "code_block",
+                number=len(self.code_block_parser.blocks),
+                label=block.label,
+                language=block.language,
+                code=block.code,
+                start=block.start,
+                end=block.end,
+            )
+
+        # Record chunk for demo
+        if self.client._demo_manager:
+            self.client._demo_manager.record_llm_chunk(text)
+
+    # === Events (NDJSON output mode) ===
+
+    def _emit(self, event: str, **fields) -> None:
+        """Send event to the client's event emitter, if there is one."""
+        emitter = getattr(self.client, "event_emitter", None)
+        if emitter is not None:
+            emitter.emit(event, **fields)
+
+    def _emit_error(self, error: Exception) -> None:
+        """Report request error as an event."""
+        self._emit("error", type=type(error).__name__, message=str(error))
+
+    def _emit_rate_limits(self, client) -> None:
+        """Report rate limits extracted from response headers of the client, if any."""
+        limits = {
+            'requests': client.rate_limit_requests,
+            'tokens': client.rate_limit_tokens,
+            'remaining_requests': client.rate_limit_remaining_requests,
+            'remaining_tokens': client.rate_limit_remaining_tokens,
+        }
+        if any(value is not None for value in limits.values()):
+            self._emit("rate_limits", **limits)
+
+    def _render_frame(self, renderer: IncrementalMarkdownRenderer, scheduler: RenderScheduler) -> None:
+        """Render one frame and record its duration in metrics."""
+        started = time.perf_counter()
+        renderer.render()
+        scheduler.frame_rendered()
+        self.metrics.record_frame(time.perf_counter() - started)
+
+    def _record_usage(self, usage_stats: dict) -> None:
+        """Add usage statistics of a chunk to client totals."""
+        self.metrics.record_usage(usage_stats)
+        self._emit("usage", **usage_stats)
+        self.client.total_prompt_tokens += usage_stats.get('prompt_tokens', 0)
+        self.client.total_completion_tokens += usage_stats.get('completion_tokens', 0)
+        self.client.total_requests += 1
+
     def _finalize_response(self, reply: str) -> str:
         """Finalize response and update messages.
 
@@ -0,0 +1,151 @@
+"""
+Stream Reader - Фоновое чтение потока провайдера.
+
+Читает поток ответа LLM в отдельном потоке (thread), извлекает из чанков
+текст и статистику использования и складывает их в ограниченную очередь.
+Сокет читается независимо от скорости отрисовки в терминале.
+"""
+
+import queue
+import threading
+import time
+from typing import Optional, Tuple, Any
+
+
+# Queue item kinds
+CONTENT = "content"
+USAGE = "usage"
+ERROR = "error"
+DONE = "done"
+
+# Interval for re-checking the stop event while blocked on the queue
+_POLL_INTERVAL = 0.1
+
+
+class StreamReader:
+    """Producer thread that drains a provider stream into a bounded queue.
+
+    Each chunk is parsed with the client's `_extract_chunk_content` and
+    `_extract_usage_stats`, so the consumer receives ready-to-use items:
+    `(CONTENT, str)`, `(USAGE, dict)`, `(ERROR, Exception)` and finally
+    `(DONE, None)`.
+    """
+
+    def __init__(self, client, stream, stop_event: threading.Event, maxsize: int = 1024, metrics=None):
+        """Initialize reader.
+
+        Args:
+            client: LLM client providing chunk extraction methods
+            stream: Stream object returned by client._create_stream()
+            stop_event: Event that stops reading when set (shared with consumer)
+            maxsize: Maximum number of queued items
+            metrics: Optional RequestMetrics receiving chunk arrival times
+        """
+        self.client = client
+        self.stream = stream
+        self.stop_event = stop_event
+        self.metrics = metrics
+        self.queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=maxsize)
+        # Raw chunks read so far and monotonic time of the last one (or of the start)
+        self.chunks_read = 0
+        self.last_activity = time.monotonic()
+        # The provider stream has ended (DONE is queued or about to be)
+        self.finished = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name="penguin-tamer-stream-reader",
+            daemon=True
+        )
+
+    def start(self) -> "StreamReader":
+        """Start reading in background thread."""
+        self.last_activity = time.monotonic()
+        self._thread.start()
+        return self
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """Get next item from the queue.
+
+        Args:
+            timeout: Seconds to wait, None to use the default poll interval
+
+        Returns:
+            Tuple (kind, payload) or None if nothing arrived in time
+        """
+        try:
+            return self.queue.get(timeout=_POLL_INTERVAL if timeout is None else timeout)
+        except queue.Empty:
+            return None
+
+    def get_nowait(self) -> Optional[Tuple[str, Any]]:
+        """Get next item without blocking, None if the queue is empty."""
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def idle_time(self) -> float:
+        """Seconds since the last chunk of the provider (since the start if there was none)."""
+        return time.monotonic() - self.last_activity
+
+    def close(self, timeout: float = 0.5) -> None:
+        """Stop reading and release the underlying connection.
+
+        Args:
+            timeout: Maximum time to wait for the reader thread
+        """
+        self.stop_event.set()
+        close = getattr(self.stream, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                # Generator already executing in the reader thread, etc.
+                pass
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        """Thread body: iterate stream and enqueue extracted data."""
+        try:
+            for chunk in self.stream:
+                if self.stop_event.is_set():
+                    return
+                # Any chunk, even one without content, shows that the stream is alive
+                self.chunks_read += 1
+                self.last_activity = time.monotonic()
+
+                content = self.client._extract_chunk_content(chunk)
+                if content:
+                    # Arrival is timed here, not when the render loop gets to it
+                    if self.metrics is not None:
+                        self.metrics.record_chunk(len(content))
+                    if not self._put((CONTENT, content)):
+                        return
+
+                usage_stats = self.client._extract_usage_stats(chunk)
+                if usage_stats and not self._put((USAGE, usage_stats)):
+                    return
+        except (AttributeError, IndexError):
+            # Malformed chunk structure ends the stream like a normal finish
+            pass
+        except Exception as e:
+            if not self.stop_event.is_set():
+                self._put((ERROR, e))
+        finally:
+            self.finished = True
+            self._put((DONE, None))
+
+    def _put(self, item: Tuple[str, Any]) -> bool:
+        """Put item into the queue, giving up when reading is stopped.
+
+        Returns:
+            True if item was queued
+        """
+        while True:
+            try:
+                self.queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                if self.stop_event.is_set():
+                    return False
@@ -0,0 +1,272 @@
+"""
+Context Summarizer - Фоновое сжатие старых ходов диалога.
+
+Обрезка истории по бюджету теряет сведения из старых ходов. Когда
+история приближается к бюджету контекста, фоновый запрос к той же или
+более дешёвой LLM сжимает самые старые ходы в одну системную заметку.
+Диалог её не ждёт: готовая заметка подменяет покрытые ходы в messages
+между ходами, и только если эти ходы не изменились. Следующая заметка
+включает предыдущую, поэтому сводка накатывается. Заметки кэшируются
+на диске по хэшу покрытых ходов, и возобновлённый диалог не сжимает те
+же ходы повторно.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from penguin_tamer.llm_clients.context_window import SUMMARY_PREFIX, ContextSettings, pinned_count, split_turns
+from penguin_tamer.llm_clients.token_estimator import count_message_tokens
+
+
+# File with cached summaries in the config dir
+CACHE_FILE_NAME = "context_summaries.json"
+
+# Summaries kept in the cache file
+_CACHE_ENTRIES = 200
+
+# Characters of one message quoted in the summary request
+_MESSAGE_CHARS = 4000
+
+_SUMMARY_REQUEST = (
+    "Condense the conversation below into a compact note for your own later use. "
+    "Keep facts about the user's system, decisions, commands with their outcomes, file paths and errors. "
+    "If it starts with an earlier summary, merge it in. Reply with the note only.\n\n{transcript}"
+)
+
+
+@dataclass(frozen=True)
+class SummarySettings:
+    """Background summaries from the `global.context` config section."""
+    enabled: bool = False    # On with the "summarize" policy
+    at: float = 0.75         # Share of the budget at which summarizing starts
+    turns: int = 4           # Oldest turns condensed into one note
+    llm: str = ""            # LLM ID of the summaries, "" - the current LLM
+
+    @classmethod
+    def from_config(cls) -> "SummarySettings":
+        """Read settings, invalid values keep their defaults."""
+        from penguin_tamer.config_manager import config
+
+        section = config.get("global", "context", None) or {}
+        values = {"enabled": section.get("policy") == "summarize"}
+        try:
+            at = float(section["summarize_at"])
+            if 0 < at <= 1:
+                values["at"] = at
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            turns = int(section["summary_turns"])
+            if turns > 0:
+                values["turns"] = turns
+        except (KeyError, TypeError, ValueError):
+            pass
+        llm = section.get("summary_llm")
+        if isinstance(llm, str):
+            values["llm"] = llm.strip()
+        return cls(**values)
+
+
+class SummaryCache:
+    """JSON file of summaries keyed by the hash of the turns they cover."""
+
+    def __init__(self, path: Optional[Path], entries: int = _CACHE_ENTRIES):
+        self.path = path
+        self.entries = entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._read().get(key)
+        return summary if isinstance(summary, str) else None
+
+    def put(self, key: str, summary: str) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            summaries = self._read()
+            summaries.pop(key, None)
+            summaries[key] = summary
+            while len(summaries) > self.entries:
+                summaries.pop(next(iter(summaries)))
+            # Written aside and renamed, a concurrent `pt` never reads half a file
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                tmp_path.write_text(json.dumps(summaries, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+    def _read(self) -> Dict[str, str]:
+        if self.path is None:
+            return {}
+        try:
+            summaries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return summaries if isinstance(summaries, dict) else {}
+
+
+def turns_key(messages: List[Dict[str, str]]) -> str:
+    """Hash of the covered messages, independent of key order."""
+    canonical = json.dumps(messages, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ContextSummarizer:
+    """Rolling summary of the oldest turns of a shared dialog.
+
+    schedule() is called after a turn and starts a background summary when
+    the history is close to the budget; apply() is called before the next
+    turn and swaps a ready summary into the messages. Both run on the
+    dialog thread, the background thread only produces the note.
+    """
+
+    def __init__(self, messages: List[Dict[str, str]], client, settings: SummarySettings,
+                 cache: Optional[SummaryCache] = None):
+        """Initialize summarizer.
+
+        Args:
+            messages: Shared dialog messages
+            client: AbstractAsyncLLMClient writing the summaries (its own messages are not used)
+            settings: Threshold and size of a summary
+            cache: Summaries of earlier sessions
+        """
+        self.messages = messages
+        self.client = client
+        self.settings = settings
+        self.cache = cache or SummaryCache(None)
+        self.summarized_turns = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._covered: Optional[List[Dict[str, str]]] = None
+        self._start = 0
+        self._turns = 0
+        self._ready: Optional[Dict[str, str]] = None
+        self._failed = set()
+        self._closed = False
+
+    @property
+    def busy(self) -> bool:
+        """A summary is being written or waits to be applied."""
+        with self._lock:
+            return self._covered is not None
+
+    def schedule(self, context: ContextSettings) -> bool:
+        """Start summarizing the oldest turns if the history nears the budget.
+
+        Args:
+            context: Budget of the current model
+
+        Returns:
+            True if a summary was started or taken from the cache
+        """
+        if self._closed or context.budget <= 0 or self.busy:
+            return False
+        tokens = sum(count_message_tokens(message) for message in self.messages)
+        if tokens < self.settings.at * context.budget:
+            return False
+
+        start = pinned_count(self.messages)
+        turns = split_turns(self.messages[start:])
+        # A previous summary is the first "turn" and rolls into the new one
+        if len(turns) < self.settings.turns + max(context.keep_turns, 1):
+            return False
+        covered = [message for turn in turns[:self.settings.turns] for message in turn]
+        key = turns_key(covered)
+        if key in self._failed:
+            return False
+
+        with self._lock:
+            self._covered, self._start, self._turns = covered, start, self.settings.turns
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._finish(key, cached, store=False)
+            return True
+        self._thread = threading.Thread(target=self._run, args=(key, covered), daemon=True)
+        self._thread.start()
+        return True
+
+    def apply(self) -> Optional[int]:
+        """Swap a ready summary into the messages.
+
+        The swap is skipped if the covered messages changed meanwhile.
+
+        Returns:
+            Tokens saved by the swap, None if nothing was applied
+        """
+        with self._lock:
+            note, covered, start = self._ready, self._covered, self._start
+            if note is None:
+                return None
+            self._ready = self._covered = None
+        end = start + len(covered)
+        current = self.messages[start:end]
+        if len(current) != len(covered) or any(a is not b for a, b in zip(current, covered)):
+            return None
+        saved = sum(count_message_tokens(message) for message in covered) - count_message_tokens(note)
+        self.messages[start:end] = [note]
+        self.summarized_turns += self._turns
+        return saved
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background summary (tests and shutdown)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def close(self) -> None:
+        """Drop pending work and close the client, a running summary is discarded when it finishes."""
+        self._closed = True
+        with self._lock:
+            self._ready = self._covered = None
+        self.client.close()
+
+    def _run(self, key: str, covered: List[Dict[str, str]]) -> None:
+        try:
+            summary = asyncio.run(self._summarize(covered))
+        except Exception:
+            summary = ""
+        if summary.strip():
+            self._finish(key, summary.strip(), store=True)
+            return
+        with self._lock:
+            self._failed.add(key)
+            self._covered = None
+
+    async def _summarize(self, covered: List[Dict[str, str]]) -> str:
+        lines = []
+        for message in covered:
+            content = message.get("content")
+            if not isinstance(content, str):
+                content = json.dumps(content, ensure_ascii=False)
+            if content.startswith(SUMMARY_PREFIX):
+                content = content[len(SUMMARY_PREFIX):]
+            lines.append(f"{message.get('role', 'user')}: {content[:_MESSAGE_CHARS]}")
+        self.client.messages = []
+        try:
+            return await self.client.aask(_SUMMARY_REQUEST.format(transcript="\n\n".join(lines)),
+                                          add_to_context=False)
+        finally:
+            await self.client.aclose()
+
+    def _finish(self, key: str, summary: str, store: bool) -> None:
+        if store:
+            self.cache.put(key, summary)
+        with self._lock:
+            if self._covered is not None and not self._closed:
+                self._ready = {"role": "system", "content": SUMMARY_PREFIX + summary}
+
+
+def summary_cache_file() -> Optional[Path]:
+    """Summary cache in the config dir."""
+    from penguin_tamer.config_manager import config
+
+    config_dir = getattr(config, "user_config_dir", None)
+    return Path(config_dir) / CACHE_FILE_NAME if config_dir else None
@@ -0,0 +1,123 @@
+"""
+Token Estimator - Быстрая локальная оценка числа токенов без токенизатора.
+
+Pollinations и часть прокси не присылают usage, а решения о бюджете
+контекста и лимитах нельзя откладывать до ответа провайдера. Оценщик
+повторяет поведение BPE-токенизаторов эвристиками: частые короткие
+слова латиницей - один токен, длинные слова, числа и знаки делятся на
+части, а число символов на токен откалибровано для каждой письменности
+(латиница, кириллица, CJK и прочие). Подсчёт кэшируется по тексту
+сообщения, поэтому при оценке длинного диалога заново разбираются
+только новые сообщения. Тяжёлые зависимости (tiktoken) не нужны.
+"""
+
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+# Tokens added per message for role and formatting
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Tokens priming the reply of the assistant
+_REPLY_PRIMING_TOKENS = 3
+
+# Characters per token of word pieces, by script
+_CHARS_PER_TOKEN = {
+    "latin": 4.0,
+    "cyrillic": 3.0,
+    "cjk": 1.0,
+    "other": 2.0,
+}
+# Latin words up to this length are usually a single vocabulary token
+_WHOLE_WORD_CHARS = 8
+_DIGITS_PER_TOKEN = 3
+_SYMBOLS_PER_TOKEN = 2
+
+# Texts shorter than this are cheaper to count than to look up
+_CACHE_MIN_CHARS = 64
+_CACHE_SIZE = 4096
+
+# A leading space merges into the following piece, as in BPE vocabularies
+_PIECE_RE = re.compile(r" ?[^\W\d_]+| ?\d+| ?[^\w\s]+|\s+")
+
+
+def _script(char: str) -> str:
+    code = ord(char)
+    if code < 0x250:
+        return "latin"
+    if 0x400 <= code < 0x530:
+        return "cyrillic"
+    if 0x3040 <= code < 0x3100 or 0x3400 <= code < 0xA000 or 0xAC00 <= code < 0xD7B0 or 0xF900 <= code < 0xFB00:
+        return "cjk"
+    return "other"
+
+
+def _count(text: str) -> int:
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        word = piece.lstrip(" ")
+        if not word or word.isspace():
+            # Whitespace runs (newlines, indentation) merge into one token
+            tokens += 1
+        elif word[0].isdigit():
+            tokens += math.ceil(len(word) / _DIGITS_PER_TOKEN)
+        elif word[0].isalpha():
+            script = _script(word[0])
+            if script == "latin" and len(word) <= _WHOLE_WORD_CHARS:
+                tokens += 1
+            else:
+                tokens += math.ceil(len(word) / _CHARS_PER_TOKEN[script])
+        else:
+            tokens += math.ceil(len(word) / _SYMBOLS_PER_TOKEN)
+    return tokens
+
+
+_counts: "OrderedDict[str, int]" = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def count_text_tokens(text: str) -> int:
+    """Estimate the tokens of a text.
+
+    Counts of long texts are cached by the text itself, so the messages of
+    a dialog are parsed once however often the history is re-sent.
+    """
+    if len(text) < _CACHE_MIN_CHARS:
+        return _count(text)
+    with _counts_lock:
+        tokens = _counts.get(text)
+        if tokens is not None:
+            _counts.move_to_end(text)
+            return tokens
+    tokens = _count(text)
+    with _counts_lock:
+        _counts[text] = tokens
+        if len(_counts) > _CACHE_SIZE:
+            _counts.popitem(last=False)
+    return tokens
+
+
+def count_message_tokens(message) -> int:
+    """Estimate the tokens of one message: its text plus role overhead."""
+    content = message.get("content", "") if isinstance(message, dict) else message
+    if content is None:
+        content = ""
+    elif not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    return count_text_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def count_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate the prompt tokens of a request, as providers report them in usage."""
+    return sum(count_message_tokens(message) for message in messages) + _REPLY_PRIMING_TOKENS
+
+
+def estimate_error(estimated: Optional[int], reported: Optional[int]) -> Optional[float]:
+    """Relative error of an estimate against reported usage, None if either is unknown."""
+    if not estimated or not reported:
+        return None
+    return abs(estimated - reported) / reported
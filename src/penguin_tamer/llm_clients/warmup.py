@@ -0,0 +1,118 @@
+"""
+Warm-up - Предварительное открытие соединения с провайдером.
+
+Пока диалог ждёт ввода пользователя, фоновый поток открывает соединение
+(DNS, TCP, TLS) в пуле сессии клиента и переоткрывает его до истечения
+таймаута простоя на стороне сервера. Следующий запрос берёт готовое
+соединение из пула, а сэкономленное время попадает в метрики запроса.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from penguin_tamer.llm_clients.http_session import get_requests_module
+
+
+class ConnectionWarmer:
+    """Keeps one fresh kept-alive connection to an endpoint in a session pool.
+
+    The connection is opened without sending a request: it is taken from the
+    urllib3 pool the session would use for `url`, connected and put back,
+    so the next request through the same session reuses it.
+    """
+
+    def __init__(self, session, url: str, connect_timeout: float = 10.0, refresh_interval: float = 50.0):
+        """Initialize warmer.
+
+        Args:
+            session: Pooled requests.Session of the client
+            url: Endpoint the next request goes to
+            connect_timeout: Seconds allowed for DNS, TCP and TLS setup
+            refresh_interval: Seconds after which the connection is reopened,
+                should stay below the server idle timeout
+        """
+        self.session = session
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.refresh_interval = refresh_interval
+        self.setup_time: Optional[float] = None  # Seconds spent opening the current connection
+        self.error: Optional[Exception] = None
+        self._conn = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="connection-warmer", daemon=True)
+
+    def start(self) -> "ConnectionWarmer":
+        """Start warming in a daemon thread."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop refreshing, the opened connection stays in the pool.
+
+        Does not wait for a handshake in progress, the request in the main
+        thread simply opens its own connection then.
+        """
+        self._stop.set()
+
+    def saved_time(self) -> Optional[float]:
+        """Setup time of the warmed connection if it is still open and idle.
+
+        Returns:
+            Seconds of connection setup done ahead of the request, None if
+            there is no usable warmed connection
+        """
+        try:
+            from urllib3.util.connection import is_connection_dropped
+        except ImportError:
+            return None
+
+        conn = self._conn
+        if conn is None or self.setup_time is None or getattr(conn, "sock", None) is None:
+            return None
+        if is_connection_dropped(conn):
+            return None
+        return self.setup_time
+
+    def _run(self) -> None:
+        """Thread body: open the connection, reopen it every refresh interval."""
+        while not self._stop.is_set():
+            try:
+                self._warm()
+                self.error = None
+            except AttributeError as e:
+                # The pool API used here is private to urllib3 and may change: give up warming
+                self.error = e
+                return
+            except Exception as e:
+                # Warm-up is best effort, the request will report real errors
+                self.error = e
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def _connection_pool(self):
+        """urllib3 pool the session uses for requests to `url`."""
+        requests = get_requests_module()
+        adapter = self.session.get_adapter(self.url)
+        env = self.session.merge_environment_settings(self.url, {}, None, None, None)
+        if hasattr(adapter, "get_connection_with_tls_context"):
+            request = requests.Request("POST", self.url).prepare()
+            return adapter.get_connection_with_tls_context(request, env["verify"], env["proxies"], env["cert"])
+        return adapter.get_connection(self.url, env["proxies"])
+
+    def _warm(self) -> None:
+        """Replace an idle connection in the pool with a freshly opened one."""
+        pool = self._connection_pool()
+        # Private urllib3 API, an AttributeError stops warming (see _run)
+        get_conn, put_conn = pool._get_conn, pool._put_conn
+        conn = get_conn()
+        try:
+            # Reopen even a live connection: the server may drop it any moment
+            conn.close()
+            conn.timeout = self.connect_timeout
+            started = time.monotonic()
+            conn.connect()
+            self.setup_time = time.monotonic() - started
+            self._conn = conn
+        finally:
+            put_conn(conn)
@@ -373,21 +373,6 @@ class ConfigMenuApp(App):
 
                             yield Static("")
 
-                            # Stream Delay
-                            stream_delay = config.get("global", "sleep_time", 0.01)
-                            with Horizontal(classes="setting-row"):
-                                yield Static(
-                                    f"{t('Stream delay')}\n"
-                                    f"[dim]{t('Pause between displaying new chunks (0.001-0.1)')}[/dim]",
-                                    classes="param-label"
-                                )
-                                yield Input(
-                                    value=str(stream_delay),
-                                    id="stream-delay-input",
-                                    placeholder="0.001-0.1",
-                                    classes="param-control"
-                                )
-
                             # Refresh Rate
                             refresh_rate = config.get("global", "refresh_per_second", 10)
                             with Horizontal(classes="setting-row"):
@@ -647,8 +632,6 @@ class ConfigMenuApp(App):
         elif input_id == "seed-input":
             self.set_seed()
         # System
-        elif input_id == "stream-delay-input":
-            self.set_stream_delay()
         elif input_id == "refresh-rate-input":
             self.set_refresh_rate()
 
@@ -986,20 +969,6 @@ class ConfigMenuApp(App):
         self.notify(t("User context saved"), severity="information")
 
     # System Settings Methods
-    def set_stream_delay(self) -> None:
-        """Set stream delay."""
-        input_field = self.query_one("#stream-delay-input", Input)
-        try:
-            value = float(input_field.value.replace(",", "."))
-            if 0.001 <= value <= 0.1:
-                config.set("global", "sleep_time", value)
-                self.refresh_status()
-                self.notify(t("Stream delay set to {value} sec", value=value), severity="information")
-            else:
-                self.notify(t("Error: Must be between 0.001 and 0.1"), severity="error")
-        except ValueError:
-            self.notify(t("Error: Invalid number format"), severity="error")
-
     def set_refresh_rate(self) -> None:
         """Set refresh rate."""
         input_field = self.query_one("#refresh-rate-input", Input)
@@ -1148,10 +1117,6 @@ class ConfigMenuApp(App):
             seed_input.value = seed_str
 
             # Обновляем системные настройки
-            stream_delay_input = self.query_one("#stream-delay-input", Input)
-            stream_delay = config.get("global", "sleep_time", 0.01)
-            stream_delay_input.value = str(stream_delay)
-
             refresh_rate_input = self.query_one("#refresh-rate-input", Input)
             refresh_rate = config.get("global", "refresh_per_second", 10)
             refresh_rate_input.value = str(refresh_rate)
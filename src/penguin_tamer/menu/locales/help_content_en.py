@@ -452,24 +452,6 @@ Ensures reproducibility of results.
 [bold]Note:[/bold]
 Same seed with same parameters will give identical response.""",
 
-    "stream-delay-input": """[bold cyan]STREAM DELAY[/bold cyan]
-
-Pause between text chunks during streaming generation.
-
-[bold]Range:[/bold] 0.001 - 0.1 seconds
-
-[bold]Small values (0.001-0.01):[/bold]
-• Fast display
-• May flicker
-
-[bold]Medium values (0.02-0.05):[/bold]
-• Comfortable speed
-• Recommended
-
-[bold]Large values (0.06-0.1):[/bold]
-• Slow display
-• Easier to read in real-time""",
-
     "refresh-rate-input": """[bold cyan]REFRESH RATE[/bold cyan]
 
 Interface update speed.
@@ -450,24 +450,6 @@ WIDGET_HELP = {
 [bold]Примечание:[/bold]
 Одинаковый seed с одинаковыми параметрами даст идентичный ответ.""",
 
-    "stream-delay-input": """[bold cyan]ЗАДЕРЖКА СТРИМА[/bold cyan]
-
-Пауза между порциями текста при потоковой генерации.
-
-[bold]Диапазон:[/bold] 0.001 - 0.1 секунд
-
-[bold]Малые значения (0.001-0.01):[/bold]
-• Быстрое отображение
-• Может мерцать
-
-[bold]Средние значения (0.02-0.05):[/bold]
-• Комфортная скорость
-• Рекомендуется
-
-[bold]Большие значения (0.06-0.1):[/bold]
-• Медленное отображение
-• Легче читать в реальном времени""",
-
     "refresh-rate-input": """[bold cyan]ЧАСТОТА ОБНОВЛЕНИЙ[/bold cyan]
 
 Скорость обновления интерфейса.
@@ -0,0 +1,231 @@
+"""
+Output Compaction - Сжатие вывода команд перед добавлением в контекст LLM.
+
+Результат каждой выполненной команды попадал в messages целиком: один
+`journalctl` или `find /` добавлял мегабайты, которые заново
+отправлялись с каждым следующим запросом. Перед добавлением в контекст
+вывод очищается от ANSI-последовательностей и перерисовок прогресса
+через возврат каретки, серии одинаковых и почти одинаковых строк
+сворачиваются со счётчиком, а остаток вписывается в бюджет токенов с
+сохранением начала и конца. Результат, совпадающий с одним из прежних,
+заменяется ссылкой на него. Полный вывод сжатых результатов
+сохраняется на диске, чтобы пользователь мог его просмотреть.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from penguin_tamer.llm_clients.token_estimator import count_text_tokens
+
+
+# Directory in the config dir with full outputs of compacted results
+OUTPUTS_DIR_NAME = "command_outputs"
+
+# CSI sequences (colors, cursor movement) and OSC sequences (titles, links)
+_ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]")
+
+# Digit runs are ignored when comparing lines ("Downloading 10%", "line 11")
+_DIGITS_RE = re.compile(r"\d+")
+
+# Consecutive lines of the same shape collapsed into a counted run
+_MIN_RUN = 3
+
+# Lines longer than this keep only their beginning (minified JSON, base64)
+_MAX_LINE_CHARS = 2000
+
+# Share of the budget given to the beginning of the output
+_HEAD_SHARE = 0.6
+
+# Outputs shorter than this are repeated instead of referenced
+_DEDUP_MIN_CHARS = 200
+
+
+@dataclass(frozen=True)
+class CompactionSettings:
+    """Command output policy from the `global.command_output` config section."""
+    max_tokens: int = 2000   # Token budget of one command result (0 - add full output)
+    keep_files: int = 50     # Full outputs kept on disk
+
+    @classmethod
+    def from_config(cls) -> "CompactionSettings":
+        """Read settings, invalid values keep their defaults."""
+        from penguin_tamer.config_manager import config
+
+        section = config.get("global", "command_output", None) or {}
+        values = {}
+        for name in ("max_tokens", "keep_files"):
+            try:
+                value = int(section[name])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if value >= 0:
+                values[name] = value
+        return cls(**values)
+
+
+def clean_terminal_output(text: str) -> str:
+    """Remove ANSI escapes and progress lines redrawn with carriage returns."""
+    text = _ANSI_RE.sub("", text).replace("\r\n", "\n")
+    if "\r" not in text:
+        return text
+    # Only the last redraw of a line stays on the screen
+    return "\n".join(line.rstrip("\r").rsplit("\r", 1)[-1] for line in text.split("\n"))
+
+
+def collapse_repeats(lines: List[str]) -> List[str]:
+    """Collapse runs of identical or near-identical lines into a counted marker.
+
+    Lines differing only in numbers count as near-identical; the first and
+    last line of such a run are kept. Runs of blank lines become one.
+    """
+    result: List[str] = []
+    index = 0
+    while index < len(lines):
+        shape = _DIGITS_RE.sub("#", lines[index].strip())
+        end = index + 1
+        while end < len(lines) and _DIGITS_RE.sub("#", lines[end].strip()) == shape:
+            end += 1
+        run = lines[index:end]
+        if not shape:
+            result.append("")
+        elif len(run) < _MIN_RUN:
+            result.extend(run)
+        elif all(line == run[0] for line in run):
+            result.extend([run[0], f"[... previous line repeated {len(run) - 1} more times ...]"])
+        else:
+            result.extend([run[0], f"[... {len(run) - 2} similar lines ...]", run[-1]])
+        index = end
+    return result
+
+
+def fit_lines(lines: List[str], max_tokens: int) -> List[str]:
+    """Keep the beginning and the end of the lines within a token budget."""
+    lines = [_shorten_line(line) for line in lines]
+    costs = [count_text_tokens(line) + 1 for line in lines]
+    if max_tokens <= 0 or sum(costs) <= max_tokens:
+        return lines
+
+    head_budget = int(max_tokens * _HEAD_SHARE)
+    head = 0
+    while head < len(lines) and costs[head] <= head_budget:
+        head_budget -= costs[head]
+        head += 1
+    tail_budget = max_tokens - int(max_tokens * _HEAD_SHARE) + head_budget
+    tail = len(lines)
+    while tail > head and costs[tail - 1] <= tail_budget:
+        tail_budget -= costs[tail - 1]
+        tail -= 1
+    omitted = tail - head
+    return lines[:head] + [f"[... {omitted} lines omitted ...]"] + lines[tail:]
+
+
+def compact_output(text: str, max_tokens: int) -> str:
+    """Compact command output for the LLM context.
+
+    Args:
+        text: Raw stdout or stderr of a command
+        max_tokens: Token budget (0 - only clean and collapse)
+
+    Returns:
+        Compacted text
+    """
+    lines = clean_terminal_output(text).rstrip("\n").split("\n")
+    return "\n".join(fit_lines(collapse_repeats(lines), max_tokens))
+
+
+def _shorten_line(line: str) -> str:
+    if len(line) <= _MAX_LINE_CHARS:
+        return line
+    return line[:_MAX_LINE_CHARS] + f" [... {len(line) - _MAX_LINE_CHARS} characters trimmed ...]"
+
+
+class OutputLog:
+    """Outputs of the commands executed in this session.
+
+    Remembers a digest of every output to spot repeated results and keeps
+    full outputs of compacted results on disk, pruning the oldest files.
+    """
+
+    def __init__(self, directory: Optional[Path], keep_files: int = 50):
+        """Initialize log.
+
+        Args:
+            directory: Directory for full outputs, None - do not save
+            keep_files: Files kept in the directory (0 - do not save)
+        """
+        self.directory = directory
+        self.keep_files = keep_files
+        self._commands: Dict[bytes, str] = {}
+        self._saved = 0
+        self._lock = threading.Lock()
+
+    def previous_command(self, output: str) -> Optional[str]:
+        """Command of an earlier result with the same output, None if the output is new or short."""
+        if len(output) < _DEDUP_MIN_CHARS:
+            return None
+        with self._lock:
+            return self._commands.get(_digest(output))
+
+    def remember(self, command: str, output: str) -> None:
+        """Record an output added to the context."""
+        if len(output) >= _DEDUP_MIN_CHARS:
+            with self._lock:
+                self._commands.setdefault(_digest(output), command)
+
+    def save(self, command: str, output: str) -> Optional[Path]:
+        """Write the full output to a file.
+
+        Returns:
+            Path of the file, None if saving is off or failed
+        """
+        if self.directory is None or self.keep_files <= 0:
+            return None
+        with self._lock:
+            self._saved += 1
+            path = self.directory / f"output-{os.getpid()}-{self._saved}.log"
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path.write_text(f"$ {command}\n{output}", encoding="utf-8")
+                self._prune()
+            except OSError:
+                return None
+        return path
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("output-*.log"), key=lambda p: p.stat().st_mtime)
+        for stale in files[:max(len(files) - self.keep_files, 0)]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+_output_log: Optional[OutputLog] = None
+_log_lock = threading.Lock()
+
+
+def get_output_log(settings: CompactionSettings) -> OutputLog:
+    """Output log of this session, full outputs go to the config dir."""
+    global _output_log
+    with _log_lock:
+        if _output_log is None:
+            _output_log = OutputLog(_outputs_dir(), settings.keep_files)
+        else:
+            _output_log.keep_files = settings.keep_files
+        return _output_log
+
+
+def _outputs_dir() -> Optional[Path]:
+    from penguin_tamer.config_manager import config
+
+    config_dir = getattr(config, "user_config_dir", None)
+    return Path(config_dir) / OUTPUTS_DIR_NAME if config_dir else None
@@ -0,0 +1,178 @@
+"""
+Render Cache - LRU-кэш отрисованных сегментов Markdown и блоков кода.
+
+Подсветка синтаксиса через Pygments - самая дорогая часть перерисовки.
+Блоки, текст которых не изменился с прошлого кадра, берутся из кэша по ключу
+(хэш текста, тема, ширина). Кэш общий для стриминга ответов LLM и демо-плеера,
+ограничен по памяти и считает попадания и промахи.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+from rich.markdown import Markdown, CodeBlock
+from rich.segment import Segment
+from rich.syntax import Syntax
+
+
+# Approximate memory cost of one Segment besides its text
+_SEGMENT_OVERHEAD = 120
+
+_DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def text_digest(text: str) -> bytes:
+    """Stable hash of block text used in cache keys."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _segments_size(segments: List[Segment]) -> int:
+    """Approximate memory used by rendered segments."""
+    return sum(len(segment.text) for segment in segments) + _SEGMENT_OVERHEAD * len(segments)
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered segments bounded by memory size."""
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES):
+        """Initialize cache.
+
+        Args:
+            max_bytes: Approximate memory bound for all cached segments
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[List[Segment]]:
+        """Get cached segments and mark them as recently used.
+
+        Returns:
+            List of segments or None on miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, segments: List[Segment]) -> None:
+        """Store segments, evicting least recently used entries over the bound."""
+        size = _segments_size(segments)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (segments, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _key, (_segments, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Counters for debug output."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Shared render cache sized from `render_cache_mb` setting."""
+    global _render_cache
+    if _render_cache is None:
+        from penguin_tamer.config_manager import config
+        size_mb = config.get("global", "render_cache_mb", 8)
+        _render_cache = RenderCache(max_bytes=int(float(size_mb) * 1024 * 1024))
+    return _render_cache
+
+
+class CachedCodeBlock(CodeBlock):
+    """Code block whose highlighted output is reused while its text is unchanged."""
+
+    def __rich_console__(self, console, options):
+        code = str(self.text).rstrip()
+        cache = get_render_cache()
+        key = ("code", text_digest(code), self.lexer_name, self.theme, options.max_width)
+        segments = cache.get(key)
+        if segments is None:
+            syntax = Syntax(code, self.lexer_name, theme=self.theme, word_wrap=True, padding=1)
+            segments = list(console.render(syntax, options))
+            cache.put(key, segments)
+        yield from segments
+
+
+class CachedMarkdown(Markdown):
+    """Markdown whose highlighted code blocks are cached.
+
+    The whole output is cached only with `cache_document`, for text that
+    is rendered again unchanged (committed blocks, finished answers). A
+    growing live tail changes every frame, its entries would never be read
+    and would only evict the code blocks.
+    """
+
+    elements = {
+        **Markdown.elements,
+        "fence": CachedCodeBlock,
+        "code_block": CachedCodeBlock,
+    }
+
+    def __init__(self, markup: str, *args, cache_document: bool = False, **kwargs):
+        super().__init__(markup, *args, **kwargs)
+        self.cache_document = cache_document
+
+    def __rich_console__(self, console, options):
+        if not self.cache_document:
+            yield from super().__rich_console__(console, options)
+            return
+        cache = get_render_cache()
+        key = ("markdown", text_digest(self.markup), self.code_theme, options.max_width)
+        segments = cache.get(key)
+        if segments is None:
+            segments = list(super().__rich_console__(console, options))
+            cache.put(key, segments)
+        yield from segments
+
+
+def create_markdown(text: str, code_theme: str = "monokai", cache_document: bool = False) -> Markdown:
+    """Create Markdown renderable backed by the shared render cache.
+
+    Args:
+        text: Markdown text
+        code_theme: Pygments theme for code blocks
+        cache_document: Cache the whole output, not only code blocks
+
+    Returns:
+        CachedMarkdown instance
+    """
+    return CachedMarkdown(text, code_theme=code_theme, cache_document=cache_document)
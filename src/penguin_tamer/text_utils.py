@@ -1,4 +1,6 @@
-import re
+from dataclasses import dataclass
+from typing import List
+
 from penguin_tamer.i18n import t
 
 
@@ -14,11 +16,143 @@ def format_api_key_display(api_key: str) -> str:
         return f"{api_key[:5]}...{api_key[-5:]}"
 
 
+@dataclass
+class CodeBlock:
+    """Labeled code block found in AI reply."""
+    label: str      # Text inside square brackets: "Code #1", "Пример", ...
+    language: str   # First word of the fence info string ("" if absent)
+    code: str       # Stripped block content
+    start: int      # Offset of the opening "[" of the label in the reply
+    end: int        # Offset right after the closing fence
+
+
+class LabeledCodeBlockParser:
+    """Incremental parser of labeled code blocks.
+
+    Accepts the reply chunk by chunk and reports every block as soon as its
+    closing fence arrives. A block is a label in square brackets, optional
+    whitespace, an opening ``` fence with its info line and the content up to
+    the next ```. Every character is scanned once, so the total cost is
+    linear in the reply length.
+    """
+
+    _SEEK, _LABEL, _GAP, _INFO, _BODY = range(5)
+
+    def __init__(self):
+        self.blocks: List[CodeBlock] = []
+        self._buffer = ""       # Unprocessed part of the reply
+        self._base = 0          # Reply offset of _buffer[0]
+        self._pos = 0           # Reply offset where scanning continues
+        self._state = self._SEEK
+        self._start = 0         # Offset of "[" of the current candidate
+        self._label = ""
+        self._info_start = 0
+        self._language = ""
+        self._body_start = 0
+
+    def feed(self, text: str) -> List[CodeBlock]:
+        """Consume next chunk of the reply.
+
+        Args:
+            text: New chunk of the reply
+
+        Returns:
+            Blocks completed by this chunk
+        """
+        if text:
+            self._buffer += text
+        buffer, base = self._buffer, self._base
+        completed = len(self.blocks)
+        # Step of each state, indexed by the state; a step returns False when it needs more text
+        steps = (self._seek, self._read_label, self._skip_gap, self._read_info, self._read_body)
+
+        while steps[self._state](buffer, base, self._pos - base):
+            pass
+
+        # Drop text that can no longer be part of a block
+        keep = self._pos if self._state == self._SEEK else self._start
+        if keep > base:
+            self._buffer = buffer[keep - base:]
+            self._base = keep
+
+        return self.blocks[completed:]
+
+    def _seek(self, buffer: str, base: int, i: int) -> bool:
+        j = buffer.find("[", i)
+        if j == -1:
+            self._pos = base + len(buffer)
+            return False
+        self._start = base + j
+        self._pos = self._start + 1
+        self._state = self._LABEL
+        return True
+
+    def _read_label(self, buffer: str, base: int, i: int) -> bool:
+        j = buffer.find("]", i)
+        if j == -1:
+            self._pos = base + len(buffer)
+            return False
+        self._pos = base + j + 1
+        if base + j == self._start + 1:
+            # Empty label "[]" is not a label
+            self._state = self._SEEK
+            return True
+        self._label = buffer[self._start - base + 1:j]
+        self._state = self._GAP
+        return True
+
+    def _skip_gap(self, buffer: str, base: int, i: int) -> bool:
+        while i < len(buffer) and buffer[i].isspace():
+            i += 1
+        self._pos = base + i
+        rest = buffer[i:i + 3]
+        if rest == "```":
+            self._pos += 3
+            self._info_start = self._pos
+            self._state = self._INFO
+        elif len(rest) < 3 and "```".startswith(rest):
+            # Opening fence may still be on its way
+            return False
+        else:
+            # Not a labeled block, the offending char may start a new label
+            self._state = self._SEEK
+        return True
+
+    def _read_info(self, buffer: str, base: int, i: int) -> bool:
+        j = buffer.find("\n", i)
+        if j == -1:
+            self._pos = base + len(buffer)
+            return False
+        info = buffer[self._info_start - base:j].split()
+        self._language = info[0] if info else ""
+        self._body_start = self._pos = base + j + 1
+        self._state = self._BODY
+        return True
+
+    def _read_body(self, buffer: str, base: int, i: int) -> bool:
+        j = buffer.find("```", i)
+        if j == -1:
+            # Keep last two chars: they may be the start of the closing fence
+            self._pos = base + max(i, len(buffer) - 2)
+            return False
+        block = CodeBlock(
+            label=self._label,
+            language=self._language,
+            code=buffer[self._body_start - base:j].strip(),
+            start=self._start,
+            end=base + j + 3,
+        )
+        self.blocks.append(block)
+        self._pos = block.end
+        self._state = self._SEEK
+        return True
+
+
 def extract_labeled_code_blocks(text: str) -> list[str]:
     """
     Извлекает содержимое блоков кода, у которых сверху есть подпись в квадратных скобках.
     Подпись может быть любой: [Код #1], [Пример], [Test], и т.п.
     """
-    pattern = r"\[[^\]]+\]\s*```.*?\n(.*?)```"
-    matches = re.findall(pattern, text, flags=re.DOTALL)
-    return [m.strip() for m in matches]
+    parser = LabeledCodeBlockParser()
+    parser.feed(text)
+    return [block.code for block in parser.blocks]
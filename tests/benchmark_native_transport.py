@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: встроенный SSE-транспорт против openai SDK.
+
+Сравнивает:
+- время запуска (импорт модулей и создание клиента в новом процессе);
+- процессорное время на один чанк при чтении потокового ответа
+  от локального сервера (сервер работает в отдельном процессе и
+  в замер не попадает).
+
+Использование:
+    python tests/benchmark_native_transport.py [--chunks 20000] [--runs 5]
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+STARTUP_SNIPPETS = {
+    "baseline": "pass",
+    # Both paths load the client package, the difference is the SDK itself
+    "sdk": (
+        "import penguin_tamer.llm_clients\n"
+        "from openai import OpenAI\n"
+        "OpenAI(api_key='x', base_url='http://127.0.0.1:1/v1')"
+    ),
+    "native": (
+        "from penguin_tamer.llm_clients.native_transport import NativeChatTransport\n"
+        "NativeChatTransport('http://127.0.0.1:1/v1', 'x').session"
+    ),
+}
+
+
+def _sse_body(chunks: int) -> bytes:
+    """Realistic chat.completion.chunk stream."""
+    parts = []
+    for i in range(chunks):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 1700000000,
+            "model": "bench-model",
+            "choices": [{"index": 0, "delta": {"content": f"token{i} "}, "finish_reason": None}],
+        }
+        parts.append(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+    usage = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": 1700000000,
+             "model": "bench-model", "choices": [],
+             "usage": {"prompt_tokens": 10, "completion_tokens": chunks, "total_tokens": chunks + 10}}
+    parts.append(b"data: " + json.dumps(usage).encode() + b"\n\n")
+    parts.append(b"data: [DONE]\n\n")
+    return b"".join(parts)
+
+
+def _serve(port_queue, chunks: int) -> None:
+    """Run SSE server in a child process."""
+    body = _sse_body(chunks)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def measure_startup(runs: int) -> dict:
+    """Median wall time of a fresh interpreter running each snippet."""
+    results = {}
+    for name, code in STARTUP_SNIPPETS.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {str(SRC)!r})\n{code}"],
+                           check=True)
+            timings.append(time.perf_counter() - started)
+        results[name] = statistics.median(timings)
+    return results
+
+
+def _consume(stream, extract) -> int:
+    chars = 0
+    for chunk in stream:
+        content = extract(chunk)
+        if content:
+            chars += len(content)
+    return chars
+
+
+def measure_chunks(url: str, chunks: int, runs: int) -> dict:
+    """Median CPU time per chunk for both transports."""
+    from penguin_tamer.llm_clients import OpenAIClient
+    from penguin_tamer.llm_clients.native_transport import NativeChatTransport
+
+    client = OpenAIClient.create(console=None, api_key="x", api_url=url, model="bench-model", system_message=[])
+    params = client._prepare_api_params("benchmark")
+    native = NativeChatTransport(url, "x")
+
+    paths = {
+        "sdk": lambda: client.client.chat.completions.create(**params),
+        "native": lambda: native.create_stream(params),
+    }
+
+    results = {}
+    for name, create in paths.items():
+        _consume(create(), client._extract_chunk_content)  # warm-up (imports, connection)
+        timings = []
+        for _ in range(runs):
+            started = time.process_time()
+            _consume(create(), client._extract_chunk_content)
+            timings.append(time.process_time() - started)
+        results[name] = statistics.median(timings) / chunks
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000, help="Chunks per streamed response")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    startup = measure_startup(args.runs)
+    baseline = startup.pop("baseline")
+    print("Startup (median, minus bare interpreter):")
+    for name, value in startup.items():
+        print(f"  {name:<7} {(value - baseline) * 1000:8.1f} ms")
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(port_queue, args.chunks), daemon=True)
+    server.start()
+    try:
+        url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/v1"
+        per_chunk = measure_chunks(url, args.chunks, args.runs)
+    finally:
+        server.terminate()
+
+    print(f"CPU per chunk (median of {args.runs} x {args.chunks} chunks):")
+    for name, value in per_chunk.items():
+        print(f"  {name:<7} {value * 1e6:8.1f} us")
+    print(f"Speedup: {per_chunk['sdk'] / per_chunk['native']:.1f}x per chunk, "
+          f"{(startup['sdk'] - startup['native']) * 1000:.0f} ms faster startup")
+
+
+if __name__ == "__main__":
+    main()
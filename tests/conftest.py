@@ -2,8 +2,188 @@
 Конфигурация pytest.
 """
 
+import json
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 # Добавляем src в Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limiters():
+    """Limits and 429 pauses of one test must not delay requests of the next."""
+    from penguin_tamer.llm_clients import rate_limiter
+    rate_limiter._limiters.clear()
+    yield
+    rate_limiter._limiters.clear()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_circuit_breakers(tmp_path, monkeypatch):
+    """Breakers start closed and keep their state out of the user's config dir."""
+    from penguin_tamer.llm_clients import circuit_breaker
+    monkeypatch.setattr(circuit_breaker, "_state_file", lambda: tmp_path / circuit_breaker.STATE_FILE_NAME)
+    circuit_breaker._breakers.clear()
+    yield
+    circuit_breaker._breakers.clear()
+
+
+def _chunk(text):
+    return {"choices": [{"delta": {"content": text}, "index": 0}]}
+
+
+@pytest.fixture
+def network_config(monkeypatch):
+    """Replace `global.network` with the given dict."""
+    from penguin_tamer.config_manager import config
+
+    original_get = config.get
+
+    def apply(network):
+        monkeypatch.setattr(
+            config, "get",
+            lambda section, key=None, default=None:
+                network if key == "network" else original_get(section, key, default)
+        )
+    return apply
+
+
+class SlowSSEAPI:
+    """Local server streaming SSE events with a delay before the first one."""
+
+    def __init__(self, events, status=200, delay=0.0):
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                api.requests.append((dict(self.headers), json.loads(self.rfile.read(length))))
+                time.sleep(delay)
+                if status >= 400:
+                    body = json.dumps({"error": {"message": "bad key"}}).encode()
+                else:
+                    body = b"".join(b"data: " + json.dumps(e).encode() + b"\n\n" for e in events)
+                    body += b"data: [DONE]\n\n"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("x-ratelimit-limit-requests", "42")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def sse_api():
+    """Start SlowSSEAPI servers, closed after the test."""
+    servers = []
+
+    def start(events=(), **kwargs):
+        server = SlowSSEAPI(list(events), **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+class FlakyAPI:
+    """Local server answering requests with a scripted sequence of failures.
+
+    Steps: an HTTP status code, "reset" (reply cut before the body),
+    "cut" (one chunk, then the connection is dropped), "silent" (headers,
+    then no data for a second) or "stall" (one chunk, then no data for a
+    second). Requests after the script get a complete reply.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.requests = 0
+        self.bodies = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                api.bodies.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                step = api.steps[api.requests] if api.requests < len(api.steps) else None
+                api.requests += 1
+                if isinstance(step, int):
+                    body = json.dumps({"error": {"message": "upstream failed"}}).encode()
+                    self.send_response(step)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if step == "reset":
+                    self.close_connection = True
+                    return
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                if step == "silent":
+                    self.wfile.flush()
+                    time.sleep(1)
+                    self.close_connection = True
+                    return
+                self._write_chunk(b"data: " + json.dumps(_chunk("partial ")).encode() + b"\n\n")
+                self.close_connection = True
+                if step == "cut":
+                    time.sleep(0.2)  # The client shows the chunk, then the connection drops
+                    return
+                if step == "stall":
+                    time.sleep(1)
+                    return
+                self._write_chunk(b"data: " + json.dumps(_chunk("answer")).encode() + b"\n\ndata: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def flaky_api(network_config):
+    """Start FlakyAPI servers with the given steps, retries wait 10 ms."""
+    network_config({"retry_backoff": 0.01})
+    servers = []
+
+    def start(steps):
+        server = FlakyAPI(steps)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
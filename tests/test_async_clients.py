@@ -0,0 +1,101 @@
+"""Tests for asynchronous LLM clients."""
+
+import asyncio
+import time
+
+import pytest
+
+from penguin_tamer.error_handlers import HTTPStatusError, TransportConnectionError
+from penguin_tamer.llm_clients import (
+    AbstractAsyncLLMClient, AsyncMistralClient, AsyncOpenAIClient, ClientFactory, MistralClient
+)
+from penguin_tamer.llm_clients.base import LLMConfig
+from penguin_tamer.llm_clients.stream_reader import CONTENT, USAGE
+from tests.conftest import _chunk
+
+
+def _collect(client, prompt, **kwargs):
+    async def run():
+        try:
+            return [item async for item in client.astream(prompt, **kwargs)]
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+class TestAsyncClients:
+    """astream/aask of the async client flavors."""
+
+    def test_openai_astream_yields_content_and_usage(self, sse_api):
+        usage = {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 2}}
+        api = sse_api([_chunk("Hel"), _chunk("lo"), usage])
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        items = _collect(client, "hi")
+
+        assert items == [(CONTENT, "Hel"), (CONTENT, "lo"),
+                         (USAGE, {"prompt_tokens": 5, "completion_tokens": 2})]
+        headers, body = api.requests[0]
+        assert headers["Authorization"] == "Bearer k"
+        assert body["messages"][-1] == {"role": "user", "content": "hi"}
+        assert client.messages[-2:] == [{"role": "user", "content": "hi"},
+                                        {"role": "assistant", "content": "Hello"}]
+        assert client.total_prompt_tokens == 5
+        assert client.rate_limit_requests == 42
+        assert client.request_metrics[-1].status == "ok"
+        assert client.request_metrics[-1].chunks == 2
+
+    def test_mistral_parses_content_blocks(self, sse_api):
+        thinking = {"choices": [{"delta": {"content": [{"type": "thinking", "thinking": "hmm"},
+                                                       {"type": "text", "text": "Answer"}]}}]}
+        api = sse_api([thinking])
+        client = AsyncMistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        assert _collect(client, "q", add_to_context=False) == [(CONTENT, "Answer")]
+        assert client.messages == []
+
+    def test_requests_run_concurrently(self, sse_api):
+        api = sse_api([_chunk("ok")], delay=0.3)
+        clients = [AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model=f"m{i}",
+                                            system_message=[]) for i in range(3)]
+
+        async def run():
+            try:
+                return await asyncio.gather(*(c.aask("ping") for c in clients))
+            finally:
+                for c in clients:
+                    await c.aclose()
+
+        started = time.monotonic()
+        replies = asyncio.run(run())
+        assert replies == ["ok", "ok", "ok"]
+        assert time.monotonic() - started < 0.8
+
+    def test_status_and_connection_errors(self, sse_api):
+        api = sse_api(status=401)
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        with pytest.raises(HTTPStatusError) as exc_info:
+            _collect(client, "hi")
+        assert exc_info.value.status_code == 401
+        assert client.request_metrics[-1].status == "error"
+
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url="http://127.0.0.1:9/v1",
+                                          model="m", system_message=[])
+        with pytest.raises(TransportConnectionError):
+            _collect(client, "hi")
+        assert client.messages == []
+
+
+class TestClientFactoryFlavors:
+    """ClientFactory builds sync and async clients from one LLMConfig."""
+
+    def test_both_flavors_from_same_config(self):
+        llm_config = LLMConfig(api_key="k", api_url="https://api.mistral.ai/v1", model="m")
+        sync_client = ClientFactory.create_client("mistral", None, [], llm_config)
+        async_client = ClientFactory.create_client("Mistral", None, [], llm_config, asynchronous=True)
+
+        assert type(sync_client) is MistralClient
+        assert isinstance(async_client, AbstractAsyncLLMClient)
+        assert isinstance(async_client, MistralClient)  # sync ask_stream still available
+        assert async_client.llm_config is llm_config
+        assert async_client._prepare_api_params("x") == sync_client._prepare_api_params("x")
@@ -0,0 +1,132 @@
+"""Tests for the per-provider circuit breaker."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.error_handlers import (
+    CircuitOpenError, ErrorHandler, HTTPStatusError, TransportConnectionError, TransportTimeoutError
+)
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients.circuit_breaker import CircuitBreaker
+from tests.test_rate_limiter import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _breaker(clock, **kwargs):
+    kwargs.setdefault("failures", 2)
+    kwargs.setdefault("cooldown", 30)
+    return CircuitBreaker("api.example", clock=clock, **kwargs)
+
+
+def _client(api):
+    client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                  api_url=api.url, model="m", system_message=[])
+    client.output_mode = "raw"
+    return client
+
+
+class TestCircuitBreaker:
+    """State transitions of a single breaker."""
+
+    @pytest.mark.parametrize("error, outage", [
+        (TransportConnectionError("refused"), True),
+        (TransportTimeoutError("timed out"), True),
+        (HTTPStatusError("down", status_code=503), True),
+        (HTTPStatusError("slow down", status_code=429), False),
+        (HTTPStatusError("bad key", status_code=401), False),
+        (ValueError("bug"), False),
+    ])
+    def test_outage_errors(self, error, outage):
+        assert ErrorHandler.is_outage_error(error) is outage
+
+    def test_opens_after_consecutive_outages(self, clock):
+        breaker = _breaker(clock)
+        breaker.record_failure(TransportConnectionError("refused"))
+        breaker.record_success()
+        breaker.record_failure(TransportConnectionError("refused"))
+        breaker.record_failure(HTTPStatusError("slow down", status_code=429))
+        assert breaker.state == "closed"
+
+        breaker.record_failure(HTTPStatusError("down", status_code=502))
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_request()
+        assert exc_info.value.retry_in == 30
+        assert "api.example" in ErrorHandler().handle(exc_info.value)
+
+    def test_single_probe_after_cooldown(self, clock):
+        breaker = _breaker(clock)
+        for _ in range(2):
+            breaker.record_failure(TransportTimeoutError("timed out"))
+        clock.now += 30
+        assert breaker.state == "half_open"
+
+        breaker.before_request()  # The probe passes
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        # A failed probe restarts the cool-down, a successful one closes the breaker
+        breaker.record_failure(TransportTimeoutError("timed out"))
+        clock.now += 29
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        clock.now += 1
+        breaker.before_request()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_request()
+
+    def test_state_survives_restart_within_ttl(self, clock, tmp_path):
+        path = tmp_path / "breakers.json"
+        breaker = _breaker(clock, ttl=60, state_file=path)
+        for _ in range(2):
+            breaker.record_failure(TransportConnectionError("refused"))
+
+        with pytest.raises(CircuitOpenError):
+            _breaker(clock, ttl=60, state_file=path).before_request()
+        assert CircuitBreaker("other.example", clock=clock, state_file=path).state == "closed"
+
+        clock.now += 61
+        assert _breaker(clock, ttl=60, state_file=path).state == "closed"
+
+        breaker.record_success()
+        assert path.read_text() == "{}"
+
+    def test_zero_failures_disables(self, clock):
+        breaker = _breaker(clock, failures=0)
+        for _ in range(5):
+            breaker.record_failure(TransportConnectionError("refused"))
+        breaker.before_request()
+
+
+class TestClientCircuitBreaker:
+    """Clients fail fast while their provider is down."""
+
+    def test_down_provider_is_not_contacted(self, flaky_api, network_config):
+        network_config({"retries": 0, "breaker_failures": 2})
+        api = flaky_api([503, 503, 503])
+        client = _client(api)
+
+        for _ in range(3):
+            assert client.ask_stream("hi") == ""
+        assert api.requests == 2
+        assert "not responding" in client.console.file.getvalue()
+
+    def test_open_breaker_goes_to_fallback(self, flaky_api, network_config):
+        network_config({"retries": 0, "breaker_failures": 1})
+        primary_api, fallback_api = flaky_api([503]), flaky_api([])
+        client = _client(primary_api)
+        client.circuit_breaker.record_failure(TransportConnectionError("refused"))
+        fallback = _client(fallback_api)
+        fallback.messages = client.messages
+        client.fallback_clients.append(fallback)
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert primary_api.requests == 0
+        assert client.request_metrics[-1].fallback == "m"
@@ -0,0 +1,107 @@
+"""Tests for client setup and run modes of the command-line interface."""
+
+import io
+import sys
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer import cli
+from penguin_tamer.config_manager import config
+from penguin_tamer.llm_clients import AsyncMistralClient, MistralClient
+
+LLMS = {
+    "mistral": {"provider": "Mistral", "model": "m", "api_url": "http://localhost", "api_key": "k",
+                "client_name": "mistral"},
+    "nokey": {"provider": "Mistral", "model": "m", "api_url": "http://localhost", "api_key": " ",
+              "client_name": "mistral"},
+}
+
+
+@pytest.fixture
+def console():
+    return Console(file=io.StringIO(), width=120)
+
+
+@pytest.fixture
+def llms(monkeypatch):
+    monkeypatch.setattr(config, "get_llm_effective_config", lambda llm_id: dict(LLMS.get(llm_id, {})))
+
+
+class TestBuildClient:
+    """Every extra client is built and skipped the same way."""
+
+    def test_client_of_known_llm(self, console, llms):
+        assert isinstance(cli._build_client(console, "mistral"), MistralClient)
+        assert isinstance(cli._build_client(console, "mistral", asynchronous=True), AsyncMistralClient)
+        assert cli._build_client(console, "label", LLMS["mistral"]).model == "m"
+
+    @pytest.mark.parametrize("llm_id, message", [("missing", "Unknown LLM 'missing'"), ("nokey", "no API key")])
+    def test_unusable_llm_is_skipped(self, console, llms, llm_id, message):
+        assert cli._build_client(console, llm_id) is None
+        assert message in console.file.getvalue()
+
+
+class RecordingClient:
+    """Chat client stand-in recording how main() uses it."""
+
+    def __init__(self, reply="answer"):
+        self.reply = reply
+        self.output_mode = "auto"
+        self.closed = False
+
+    def init_dialog_mode(self, educational_prompt):
+        pass
+
+    def ask_stream(self, prompt):
+        emitter = getattr(self, "event_emitter", None)
+        if emitter is not None:
+            if not self.reply:
+                emitter.emit("error", type="APIError", message="boom")
+            emitter.emit("response_end", status="ok" if self.reply else "error")
+        return self.reply
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def run_main(monkeypatch, console):
+    """Run main() with the given arguments and chat client, return its exit status."""
+    monkeypatch.setattr(config, "get_current_llm_effective_config", lambda: dict(LLMS["mistral"]))
+    monkeypatch.setattr(cli, "_create_console", lambda stderr=False: console)
+    for name in ("_create_hedge_client", "_create_fallback_clients", "_create_summarizer"):
+        monkeypatch.setattr(cli, name, lambda console, chat_client: None)
+
+    def run(client, *argv):
+        monkeypatch.setattr(sys, "argv", ["pt", *argv])
+        monkeypatch.setattr(cli, "_create_chat_client", lambda console: client)
+        return cli.main()
+    return run
+
+
+class TestMain:
+    """main() releases every client it built."""
+
+    def test_client_is_closed(self, run_main):
+        client = RecordingClient()
+        assert run_main(client, "-r", "hi") == 0
+        assert client.closed
+
+    def test_client_is_closed_after_failure(self, run_main, monkeypatch):
+        client = RecordingClient()
+        monkeypatch.setattr(cli, "run_single_query", lambda *args: 1 / 0)
+        assert run_main(client, "-r", "hi") == 1
+        assert client.closed
+
+    @pytest.mark.parametrize("reply, status", [("answer", 0), ("", 1)])
+    def test_json_exit_status(self, run_main, capsys, reply, status):
+        client = RecordingClient(reply)
+        assert run_main(client, "--json", "hi") == status
+        assert '"response_end"' in capsys.readouterr().out
+        assert client.closed
+
+    def test_json_dialog_fails_if_any_request_failed(self, run_main, monkeypatch):
+        client = RecordingClient("")
+        monkeypatch.setattr(sys, "stdin", io.StringIO("first\nsecond\n"))
+        assert run_main(client, "--json") == 1
@@ -0,0 +1,155 @@
+"""Tests for the token budget of the dialog history."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient, OpenAIClient
+from penguin_tamer.llm_clients.context_window import (
+    SUMMARY_PREFIX, ContextSettings, MessageHistory, fit_messages, pinned_count
+)
+
+SYSTEM = [{"role": "system", "content": "You are a helpful assistant."}]
+EDUCATIONAL = [{"role": "user", "content": "Number code blocks."}, {"role": "assistant", "content": "OK."}]
+
+
+@pytest.fixture
+def context_config(monkeypatch):
+    """Replace `global.context` with the given dict."""
+    from penguin_tamer.config_manager import config
+
+    original_get = config.get
+
+    def apply(section, debug=False):
+        def get(section_name, key=None, default=None):
+            if key == "context":
+                return section
+            if key == "debug":
+                return debug
+            return original_get(section_name, key, default)
+        monkeypatch.setattr(config, "get", get)
+    return apply
+
+
+def _turn(index, size=40):
+    return [
+        {"role": "user", "content": f"question {index} " + "q" * size},
+        {"role": "assistant", "content": f"answer {index} " + "a" * size},
+    ]
+
+
+def _dialog(turns, size=40):
+    messages = MessageHistory(SYSTEM + EDUCATIONAL)
+    for index in range(turns):
+        messages.extend(_turn(index, size))
+    return messages
+
+
+class TestContextSettings:
+    """Budget, policy and per-model overrides come from the config."""
+
+    def test_model_override_and_invalid_values(self, context_config):
+        context_config({"budget": 1000, "models": {"big": 0}, "policy": "forget", "keep_turns": -1})
+        assert ContextSettings.from_config("small") == ContextSettings(budget=1000)
+        assert ContextSettings.from_config("big").budget == 0
+
+
+class TestFitMessages:
+    """Older turns are trimmed, the prompts and latest turns never are."""
+
+    def test_within_budget_is_unchanged(self):
+        messages = _dialog(2)
+        fitted, trim = fit_messages(messages, pinned_count(messages), ContextSettings(budget=10000))
+        assert fitted is messages and not trim.trimmed
+
+    def test_drop_keeps_pinned_and_latest_turns(self):
+        messages = _dialog(6) + [{"role": "user", "content": "current"}]
+        settings = ContextSettings(budget=120, policy="drop", keep_turns=2)
+        fitted, trim = fit_messages(messages, 3, settings)
+
+        assert fitted[:3] == SYSTEM + EDUCATIONAL
+        assert fitted[-3:] == _turn(5) + [{"role": "user", "content": "current"}]
+        assert trim.dropped_turns > 0 and trim.tokens_after <= 120
+        assert trim.saved_tokens == trim.tokens_before - trim.tokens_after
+
+    def test_truncate_shortens_long_messages_first(self):
+        messages = _dialog(3, size=4000) + [{"role": "user", "content": "current"}]
+        fitted, trim = fit_messages(messages, 3, ContextSettings(budget=2500, policy="truncate", keep_turns=1))
+
+        assert trim.dropped_turns == 0 and trim.truncated_messages > 0
+        assert "characters trimmed" in fitted[3]["content"]
+        assert fitted[3]["content"].startswith("question 0")
+        # The original history is not modified
+        assert "characters trimmed" not in messages[3]["content"]
+
+    def test_summarize_lists_dropped_requests(self):
+        messages = _dialog(6) + [{"role": "user", "content": "current"}]
+        fitted, trim = fit_messages(messages, 3, ContextSettings(budget=120, policy="summarize", keep_turns=1))
+
+        assert trim.summarized
+        summary = fitted[3]
+        assert summary["role"] == "system" and "- question 0" in summary["content"]
+        assert fitted[-1] == {"role": "user", "content": "current"}
+
+    def test_summary_note_is_kept(self):
+        note = {"role": "system", "content": SUMMARY_PREFIX + "user runs Debian"}
+        messages = _dialog(0) + [note] + _dialog(6)[3:] + [{"role": "user", "content": "current"}]
+        fitted, trim = fit_messages(messages, 3, ContextSettings(budget=120, policy="drop", keep_turns=1))
+        assert trim.dropped_turns > 0 and fitted[3] == note
+
+    def test_command_result_stays_with_its_turn(self):
+        messages = _dialog(0) + [
+            {"role": "user", "content": "Executed command: ls"},
+            {"role": "system", "content": "output " * 200},
+            {"role": "user", "content": "current"},
+        ]
+        fitted, trim = fit_messages(messages, 3, ContextSettings(budget=50, policy="drop", keep_turns=1))
+        assert trim.dropped_turns == 1
+        assert fitted == SYSTEM + EDUCATIONAL + [{"role": "user", "content": "current"}]
+
+    def test_plain_list_pins_system_messages(self):
+        assert pinned_count(SYSTEM + EDUCATIONAL) == 1
+        assert pinned_count(_dialog(2)) == 3
+
+
+class TestClientContext:
+    """_prepare_api_params() sends the fitted messages."""
+
+    def _client(self, cls=MistralClient, api_url="http://localhost"):
+        client = cls.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                            api_url=api_url, model="m", system_message=SYSTEM)
+        client.init_dialog_mode(EDUCATIONAL)
+        for index in range(6):
+            client.messages.extend(_turn(index))
+        return client
+
+    @pytest.mark.parametrize("cls", [MistralClient, OpenAIClient])
+    def test_request_is_trimmed_history_is_not(self, context_config, cls):
+        context_config({"budget": 120, "policy": "drop", "keep_turns": 2})
+        client = self._client(cls)
+
+        messages = client._prepare_api_params("current")["messages"]
+        assert messages[:3] == SYSTEM + EDUCATIONAL
+        assert messages[-1] == {"role": "user", "content": "current"}
+        assert len(client.messages) == 15
+        assert client.last_context_trim.dropped_turns > 0
+
+    def test_shared_history_keeps_pins(self, context_config):
+        context_config({"budget": 120, "policy": "drop", "keep_turns": 1})
+        client = self._client()
+        fallback = MistralClient.create(console=client.console, api_key="k", api_url="http://localhost",
+                                        model="m", system_message=[])
+        fallback.messages = client.messages
+
+        assert fallback._prepare_api_params("current")["messages"][:3] == SYSTEM + EDUCATIONAL
+
+    def test_debug_reports_trim(self, flaky_api, context_config):
+        context_config({"budget": 120, "policy": "drop", "keep_turns": 1}, debug=True)
+        api = flaky_api([])
+        client = self._client(api_url=api.url)
+        client.output_mode = "rich"
+
+        assert client.ask_stream("current") == "partial answer"
+        assert len(api.bodies[0]["messages"]) < len(client.messages)
+        assert "tokens saved" in client.console.file.getvalue()
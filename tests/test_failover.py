@@ -0,0 +1,124 @@
+"""Tests for failover to fallback LLMs."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.error_handlers import (
+    ErrorHandler, HTTPStatusError, RateLimitWaitError, TransportConnectionError
+)
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients.metrics import summarize_metrics
+
+
+LLMS = {
+    "llm_1": {"provider": "Main", "model": "main-model",
+              "fallbacks": ["llm_2", {"provider": "Spare", "model": "spare-model"},
+                            "llm_9", {"provider": "Unknown", "model": "x"}, "llm_1"]},
+    "llm_2": {"provider": "Spare", "model": "other-model"},
+}
+PROVIDERS = {
+    "Main": {"client_name": "openai", "api_url": "https://main.example/v1", "api_key": "a"},
+    "Spare": {"client_name": "mistral", "api_url": "https://spare.example/v1", "api_key": "b"},
+}
+
+
+@pytest.fixture
+def llm_config(monkeypatch):
+    from penguin_tamer.config_manager import config
+
+    sections = {"supported_LLMs": LLMS, "supported_Providers": PROVIDERS}
+    original_get = config.get
+    monkeypatch.setattr(
+        config, "get",
+        lambda section, key=None, default=None:
+            sections[section] if section in sections and key is None else original_get(section, key, default)
+    )
+    return config
+
+
+def _clients(*apis):
+    console = Console(file=io.StringIO(), width=80)
+    clients = [
+        MistralClient.create(console=console, api_key="k", api_url=api.url, model=f"model-{index}",
+                             system_message=[{"role": "system", "content": "sys"}] if index == 0 else [])
+        for index, api in enumerate(apis)
+    ]
+    main = clients[0]
+    main.output_mode = "raw"
+    for fallback in clients[1:]:
+        fallback.messages = main.messages
+        main.fallback_clients.append(fallback)
+    return main
+
+
+class TestFallbackConfig:
+    """Fallback lists of supported_LLMs entries."""
+
+    def test_fallbacks_resolve_ids_and_pairs(self, llm_config):
+        fallbacks = llm_config.get_llm_fallbacks("llm_1")
+        assert [(f["provider"], f["model"]) for f in fallbacks] == [
+            ("Spare", "other-model"), ("Spare", "spare-model")]
+        assert fallbacks[1]["client_name"] == "mistral"
+        assert fallbacks[1]["api_url"] == "https://spare.example/v1"
+        assert llm_config.get_llm_fallbacks("llm_2") == []
+
+    @pytest.mark.parametrize("error, failover", [
+        (TransportConnectionError("refused"), True),
+        (HTTPStatusError("down", status_code=502), True),
+        (HTTPStatusError("bad key", status_code=401), True),
+        (HTTPStatusError("forbidden", status_code=403), True),
+        (RateLimitWaitError("exhausted", wait=90), True),
+        (HTTPStatusError("bad request", status_code=400), False),
+        (HTTPStatusError("no model", status_code=404), False),
+    ])
+    def test_failover_errors(self, error, failover):
+        assert ErrorHandler.is_failover_error(error) is failover
+
+
+class TestFailover:
+    """Failed providers hand the request to the next fallback."""
+
+    def test_fallback_answers_after_retries(self, flaky_api, network_config):
+        network_config({"retries": 1, "retry_backoff": 0.01})
+        primary_api, fallback_api = flaky_api([503, 503]), flaky_api([])
+        client = _clients(primary_api, fallback_api)
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert primary_api.requests == 2 and fallback_api.requests == 1
+        metrics = client.request_metrics[-1]
+        assert metrics.fallback == "model-1" and metrics.model == "model-1"
+        assert metrics.retries == 1 and metrics.status == "ok"
+        assert summarize_metrics(client.request_metrics)["fallback_requests"] == 1
+        # The dialog continues in the shared messages
+        assert client.messages[-2:] == [{"role": "user", "content": "hi"},
+                                        {"role": "assistant", "content": "partial answer"}]
+        assert client.fallback_clients[0].messages is client.messages
+
+    def test_chain_is_tried_in_order(self, flaky_api, network_config):
+        network_config({"retries": 0})
+        apis = [flaky_api([401]), flaky_api(["reset"]), flaky_api([])]
+        client = _clients(*apis)
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert [api.requests for api in apis] == [1, 1, 1]
+        assert client.request_metrics[-1].fallback == "model-2"
+
+    def test_request_errors_do_not_fail_over(self, flaky_api, network_config):
+        network_config({"retries": 0})
+        primary_api, fallback_api = flaky_api([400]), flaky_api([])
+        client = _clients(primary_api, fallback_api)
+
+        assert client.ask_stream("hi") == ""
+        assert fallback_api.requests == 0
+        assert client.request_metrics[-1].fallback is None
+
+    def test_last_error_is_reported(self, flaky_api, network_config):
+        network_config({"retries": 0})
+        primary_api, fallback_api = flaky_api([503]), flaky_api([401])
+        client = _clients(primary_api, fallback_api)
+
+        assert client.ask_stream("hi") == ""
+        assert "401" in client.console.file.getvalue()
+        assert client.messages == [{"role": "system", "content": "sys"}]
@@ -0,0 +1,128 @@
+"""Tests for multi-model fan-out."""
+
+import io
+import time
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import AsyncOpenAIClient
+from penguin_tamer.llm_clients.fanout import FanOut, FanOutLane
+from penguin_tamer.llm_clients.token_estimator import count_text_tokens
+from tests.conftest import SlowSSEAPI, _chunk
+
+
+@pytest.fixture
+def apis():
+    servers = [
+        SlowSSEAPI([_chunk("Slow "), _chunk("answer"),
+                    {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}}], delay=0.4),
+        SlowSSEAPI([_chunk("[Code #1]\n```bash\nls\n```\n")], delay=0.1),
+    ]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def _fanout(apis, width=120, layout="auto"):
+    console = Console(file=io.StringIO(), width=width, force_terminal=True, color_system=None)
+    messages = [{"role": "system", "content": "sys"}]
+    clients = [(f"model {i}", AsyncOpenAIClient.create(console=console, api_key="k", api_url=api.url,
+                                                       model=f"m{i}", system_message=[]))
+               for i, api in enumerate(apis)]
+    return FanOut(console, clients, messages, layout=layout, refresh_per_second=50), messages
+
+
+class TestFanOut:
+    """FanOut runs models concurrently and continues with the chosen answer."""
+
+    def test_answers_stream_concurrently(self, apis):
+        fanout, messages = _fanout(apis)
+        try:
+            started = time.monotonic()
+            lanes = fanout.ask("question")
+            elapsed = time.monotonic() - started
+
+            assert [lane.status for lane in lanes] == ["ok", "ok"]
+            assert lanes[0].text == "Slow answer"
+            assert lanes[0].completion_tokens == 2
+            assert elapsed < 0.4 + 0.1 + 0.3  # slowest model, not the sum
+            assert all(lane.ttft is not None for lane in lanes)
+            # The panels show the metrics the clients store for /stats
+            assert lanes[0].metrics is fanout.clients[0][1].request_metrics[-1]
+            assert lanes[1].metrics.usage_estimated
+            assert fanout.fastest() is lanes[1]
+            # Both requests carried the shared history, nothing added yet
+            assert messages == [{"role": "system", "content": "sys"}]
+            assert apis[0].requests[0][1]["messages"][0]["content"] == "sys"
+
+            output = fanout.console.file.getvalue()
+            assert "1. model 0" in output and "2. model 1" in output
+            assert "TTFT" in output and "tok/s" in output
+        finally:
+            fanout.close()
+
+    def test_choose_continues_dialog_for_all_models(self, apis):
+        fanout, messages = _fanout(apis)
+        try:
+            lanes = fanout.ask("question")
+            reply = fanout.choose(lanes[0], "question")
+
+            assert reply == "Slow answer"
+            assert messages[-2:] == [{"role": "user", "content": "question"},
+                                     {"role": "assistant", "content": "Slow answer"}]
+            fanout.ask("next")
+            assert apis[1].requests[-1][1]["messages"][-2]["content"] == "Slow answer"
+        finally:
+            fanout.close()
+
+    def test_failed_model_does_not_block_others(self, apis):
+        apis[0].close()
+        fanout, _ = _fanout(apis)
+        try:
+            lanes = fanout.ask("question")
+            assert lanes[0].status == "error" and lanes[0].error
+            assert lanes[1].status == "ok"
+            assert fanout.fastest() is lanes[1]
+        finally:
+            fanout.close()
+
+    @pytest.mark.parametrize("layout, width, columns", [
+        ("auto", 120, True), ("auto", 60, False), ("stacked", 200, False), ("columns", 60, True),
+    ])
+    def test_layout(self, apis, layout, width, columns):
+        fanout, _ = _fanout(apis, width=width, layout=layout)
+        fanout.lanes = [FanOutLane("a", None), FanOutLane("b", None)]
+        try:
+            assert fanout._use_columns() is columns
+        finally:
+            fanout.close()
+
+    def test_speed_is_estimated_without_usage(self):
+        lane = FanOutLane("a", None)
+        lane.add_content("word " * 10)
+        lane.metrics.ttft, lane.metrics._last_chunk = 0.5, 1.5
+        assert lane.tokens_per_second() == (pytest.approx(count_text_tokens("word " * 10)), True)
+        lane.metrics.record_usage({"completion_tokens": 20})
+        assert lane.tokens_per_second() == (pytest.approx(20.0), False)
+
+    @pytest.mark.parametrize("theme_name, code_theme", [("default", "monokai"), ("solarized_dark", "solarized-dark")])
+    def test_code_theme_matches_single_replies(self, apis, monkeypatch, theme_name, code_theme):
+        from penguin_tamer import render_cache
+
+        themes = []
+        create = render_cache.create_markdown
+        monkeypatch.setattr(render_cache, "create_markdown", lambda text, code_theme, **kwargs:
+                            themes.append(code_theme) or create(text, code_theme, **kwargs))
+        console = Console(file=io.StringIO(), width=120, force_terminal=True, color_system=None)
+        client = AsyncOpenAIClient.create(console=console, api_key="k", api_url=apis[0].url, model="m",
+                                          system_message=[])
+        fanout = FanOut(console, [("a", client), ("b", client)], [], theme_name=theme_name)
+        fanout.lanes = [FanOutLane("a", client, parts=["```bash\nls\n```"])]
+        try:
+            fanout._render()
+            # The same Pygments style as a single reply with this theme
+            client._create_markdown("x", theme_name)
+            assert themes == [code_theme, code_theme]
+        finally:
+            fanout.close()
@@ -0,0 +1,128 @@
+"""Tests for hedged requests to a backup LLM."""
+
+import io
+import time
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients.hedging import HedgeSettings
+from penguin_tamer.llm_clients.metrics import summarize_metrics
+from tests.conftest import _chunk
+
+
+@pytest.fixture
+def hedging_config(monkeypatch):
+    """Replace `global.hedging` with the given dict."""
+    from penguin_tamer.config_manager import config
+
+    original_get = config.get
+
+    def apply(hedging):
+        monkeypatch.setattr(
+            config, "get",
+            lambda section, key=None, default=None:
+                hedging if key == "hedging" else original_get(section, key, default)
+        )
+    return apply
+
+
+def _clients(primary_api, backup_api):
+    console = Console(file=io.StringIO(), width=80)
+    primary = MistralClient.create(console=console, api_key="k", api_url=primary_api.url, model="slow",
+                                   system_message=[{"role": "system", "content": "sys"}])
+    primary.output_mode = "raw"
+    backup = MistralClient.create(console=console, api_key="k", api_url=backup_api.url, model="fast",
+                                  system_message=[])
+    backup.messages = primary.messages
+    primary.hedge_client = backup
+    return primary, backup
+
+
+class TestHedgeSettings:
+    """Tests for HedgeSettings.from_config."""
+
+    @pytest.mark.parametrize("hedging, expected", [
+        (None, HedgeSettings()),
+        ({"after": "2.5", "llm": " llm_1 "}, HedgeSettings(after=2.5, llm="llm_1")),
+        ({"after": "soon", "llm": "llm_1"}, HedgeSettings(llm="llm_1")),
+        ({"after": -1, "llm": "llm_1"}, HedgeSettings(llm="llm_1")),
+    ])
+    def test_from_config(self, hedging_config, hedging, expected):
+        hedging_config(hedging)
+        assert HedgeSettings.from_config() == expected
+        assert HedgeSettings.from_config().enabled is (expected.after > 0)
+
+
+class TestHedgedRequests:
+    """A late first chunk triggers the backup request, the first stream wins."""
+
+    def test_backup_wins_when_primary_is_late(self, sse_api, hedging_config):
+        hedging_config({"after": 0.1, "llm": "llm_2"})
+        primary_api = sse_api([_chunk("slow")], delay=1.5)
+        backup_api = sse_api([_chunk("fast "), _chunk("answer"),
+                              {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2}}])
+        client, _ = _clients(primary_api, backup_api)
+
+        started = time.monotonic()
+        assert client.ask_stream("question") == "fast answer"
+        assert time.monotonic() - started < 1.0
+
+        metrics = client.request_metrics[-1]
+        assert (metrics.model, metrics.hedged, metrics.hedge_winner) == ("fast", True, "backup")
+        assert metrics.ttft >= 0.1 and metrics.status == "ok"
+        assert client.total_completion_tokens == 2
+        # The backup got the same dialog, the reply continues the shared one
+        assert backup_api.requests[0][1]["messages"][0]["content"] == "sys"
+        assert client.messages[-1] == {"role": "assistant", "content": "fast answer"}
+        assert summarize_metrics(client.request_metrics)["hedge_backup_wins"] == 1
+
+    def test_backup_win_keeps_primary_retries(self, flaky_api, sse_api, network_config,
+                                              hedging_config):
+        network_config({"retry_backoff": 0.01})
+        hedging_config({"after": 0.1, "llm": "llm_2"})
+        # The first attempt fails, the second one is silent until the backup answers
+        primary_api = flaky_api([503, "silent"])
+        backup_api = sse_api([_chunk("fast "), _chunk("answer")])
+        client, _ = _clients(primary_api, backup_api)
+
+        assert client.ask_stream("question") == "fast answer"
+
+        metrics = client.request_metrics[-1]
+        assert (metrics.model, metrics.hedge_winner) == ("fast", "backup")
+        assert metrics.retries == 1 and metrics.retry_delay > 0
+        assert metrics.estimated_prompt_tokens
+        assert (metrics.chunks, metrics.chars) == (2, len("fast answer"))
+
+    def test_primary_can_still_win_after_hedge(self, sse_api, hedging_config):
+        hedging_config({"after": 0.1, "llm": "llm_2"})
+        primary_api = sse_api([_chunk("primary")], delay=0.3)
+        backup_api = sse_api([_chunk("backup")], delay=2.0)
+        client, _ = _clients(primary_api, backup_api)
+
+        started = time.monotonic()
+        assert client.ask_stream("question") == "primary"
+        assert time.monotonic() - started < 1.5
+        metrics = client.request_metrics[-1]
+        assert (metrics.model, metrics.hedged, metrics.hedge_winner) == ("slow", True, "primary")
+        assert len(backup_api.requests) == 1
+
+    def test_no_backup_request_when_primary_is_fast(self, sse_api, hedging_config):
+        hedging_config({"after": 1.0, "llm": "llm_2"})
+        primary_api = sse_api([_chunk("primary")])
+        backup_api = sse_api([_chunk("backup")])
+        client, _ = _clients(primary_api, backup_api)
+
+        assert client.ask_stream("question") == "primary"
+        assert backup_api.requests == []
+        assert client.request_metrics[-1].hedged is False
+
+    def test_failed_backup_does_not_break_primary(self, sse_api, hedging_config):
+        hedging_config({"after": 0.05, "llm": "llm_2"})
+        primary_api = sse_api([_chunk("primary")], delay=0.4)
+        backup_api = sse_api(status=401)
+        client, _ = _clients(primary_api, backup_api)
+
+        assert client.ask_stream("question") == "primary"
+        assert client.request_metrics[-1].hedge_winner == "primary"
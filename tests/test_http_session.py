@@ -0,0 +1,195 @@
+"""Tests for pooled HTTP sessions and connection warm-up of LLM clients."""
+
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient, OpenAIClient
+from penguin_tamer.llm_clients.http_session import NetworkSettings, create_session
+from penguin_tamer.llm_clients.warmup import ConnectionWarmer
+
+
+class PortRecordingAPI:
+    """Local keep-alive server remembering the client port of every request."""
+
+    def __init__(self):
+        self.ports = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, body, content_type):
+                api.ports.append(self.client_address[1])
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("x-ratelimit-limit-requests", "60")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                chunk = {"choices": [{"delta": {"content": "pong"}}]}
+                body = b"data: " + json.dumps(chunk).encode() + b"\n\ndata: [DONE]\n\n"
+                self._reply(body, "text/event-stream")
+
+            def do_GET(self):
+                self._reply(json.dumps({"data": [{"id": "mistral-small-latest"}]}).encode(), "application/json")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    server = PortRecordingAPI()
+    yield server
+    server.close()
+
+
+def _reply(client):
+    stream = client._create_stream(client._prepare_api_params("ping"))
+    return "".join(filter(None, (client._extract_chunk_content(event) for event in stream)))
+
+
+class TestNetworkSettings:
+    """Tests for NetworkSettings.from_config."""
+
+    def test_defaults_without_section(self, network_config):
+        network_config(None)
+        settings = NetworkSettings.from_config("mistral")
+        assert settings == NetworkSettings()
+        assert settings.timeout == (10.0, 600.0)
+        assert settings.models_timeout == (10.0, 10.0)
+
+    def test_provider_overrides_and_invalid_values(self, network_config):
+        network_config({
+            "pool_size": "8", "connect_timeout": 3, "read_timeout": -1, "keep_alive": False,
+            "providers": {"mistral": {"read_timeout": 120}},
+        })
+        assert NetworkSettings.from_config("openai") == NetworkSettings(
+            pool_size=8, keep_alive=False, connect_timeout=3.0, read_timeout=600.0)
+        assert NetworkSettings.from_config("mistral").timeout == (3.0, 120.0)
+
+    def test_session_pool_and_keep_alive(self):
+        session = create_session(NetworkSettings(pool_size=2, keep_alive=False))
+        assert session.get_adapter("https://example.com")._pool_maxsize == 2
+        assert session.headers["Connection"] == "close"
+
+
+class TestPooledClients:
+    """Clients reuse one kept-alive connection across turns."""
+
+    def test_mistral_reuses_connection(self, api):
+        client = MistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        stream = client._create_stream(client._prepare_api_params("ping"))
+        client._extract_rate_limits(stream)
+        assert "".join(filter(None, map(client._extract_chunk_content, stream))) == "pong"
+        assert _reply(client) == "pong"
+        assert client.get_available_models()[0]["id"] == "mistral-small-latest"
+
+        assert client.rate_limit_requests == 60
+        assert len(api.ports) == 3
+        assert len(set(api.ports)) == 1
+
+    def test_keep_alive_disabled_opens_new_connections(self, api, network_config):
+        network_config({"keep_alive": False})
+        client = MistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        _reply(client)
+        _reply(client)
+        assert len(set(api.ports)) == 2
+
+    def test_native_transport_shares_client_session(self, api, network_config):
+        network_config({"connect_timeout": 2, "read_timeout": 30})
+        client = OpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        transport = client.native_transport
+        assert transport.session is client.session
+        assert transport.timeout == (2.0, 30.0)
+        list(transport.create_stream({"model": "m", "messages": []}))
+        client.get_available_models()
+        assert len(set(api.ports)) == 1
+
+
+def _wait_warm(warmer, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while warmer.setup_time is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert warmer.setup_time is not None, warmer.error
+
+
+def _local_port(warmer):
+    sock = getattr(warmer._conn, "sock", None)
+    return sock.getsockname()[1] if sock is not None else None
+
+
+class TestConnectionWarmup:
+    """Background warm-up while the dialog waits for input."""
+
+    def test_request_uses_warmed_connection(self, api):
+        console = Console(file=io.StringIO(), width=60)
+        client = MistralClient.create(console=console, api_key="k", api_url=api.url, model="m", system_message=[])
+        client.output_mode = "raw"
+
+        client.start_warmup()
+        _wait_warm(client._warmer)
+        warmed_port = _local_port(client._warmer)
+        client.stop_warmup()
+
+        assert client.ask_stream("ping") == "pong"
+        assert api.ports == [warmed_port]
+        assert client.request_metrics[-1].warmup_saved > 0
+        assert client._warmer is None
+
+    def test_refresh_reopens_connection(self, api):
+        client = MistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        warmer = ConnectionWarmer(client.session, client._stream_url(), refresh_interval=0.05).start()
+        _wait_warm(warmer)
+        first = _local_port(warmer)
+        deadline = time.monotonic() + 5.0
+        while _local_port(warmer) in (first, None) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        warmer.stop()
+        warmer._thread.join(timeout=5.0)
+
+        _reply(client)
+        assert api.ports != [first]
+        assert warmer.saved_time() is not None
+
+    def test_missing_pool_api_stops_warming(self, api, monkeypatch):
+        client = MistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        # A urllib3 release without the private pool methods
+        monkeypatch.setattr(ConnectionWarmer, "_connection_pool", lambda self: object())
+        warmer = ConnectionWarmer(client.session, client._stream_url(), refresh_interval=0.01).start()
+        warmer._thread.join(timeout=5.0)
+
+        assert not warmer._thread.is_alive()
+        assert isinstance(warmer.error, AttributeError)
+        assert warmer.saved_time() is None
+        assert _reply(client) == "pong"
+
+    def test_no_warmup_for_sdk_transport_or_when_disabled(self, api, network_config):
+        openai_client = OpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        openai_client.start_warmup()
+        assert openai_client._warmer is None
+        assert openai_client.take_warmup_savings() is None
+
+        network_config({"warmup": False})
+        client = MistralClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        client.start_warmup()
+        assert client._warmer is None
@@ -0,0 +1,210 @@
+"""Tests for incremental markdown renderer."""
+
+import io
+import re
+
+import pytest
+from rich.console import Console
+from rich.markdown import Markdown
+
+from penguin_tamer.llm_clients.markdown_stream import IncrementalMarkdownRenderer, RenderScheduler
+
+
+REPLY = """# Title
+
+Some *text* here
+continues.
+
+[Code #1]
+```bash
+echo hi
+
+echo there
+```
+After code directly.
+
+- a
+- b
+
+- c
+
+1. one
+2. two
+
+Paragraph after list.
+
+---
+
+> quote
+
+> other quote
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+    indented code
+
+Para with ![img](x.png) image
+
+Final para."""
+
+
+class FakeLive:
+    """Minimal stand-in for rich.live.Live."""
+
+    def __init__(self, console):
+        self.console = console
+        self.renderable = None
+        self.updates = 0
+
+    def update(self, renderable, refresh=False):
+        self.renderable = renderable
+        self.updates += 1
+
+
+def _make_console(width=70, color_system="truecolor"):
+    return Console(file=io.StringIO(), width=width, force_terminal=True, color_system=color_system)
+
+
+def _output(console) -> str:
+    # Hyperlink ids are random, drop them before comparing
+    return re.sub(r"id=\d+;", "", console.file.getvalue())
+
+
+def _render_full(text: str, width: int) -> str:
+    console = _make_console(width)
+    console.print(Markdown(text, code_theme="monokai"))
+    return _output(console)
+
+
+def _render_incremental(text: str, width: int, chunk_size: int):
+    console = _make_console(width)
+    live = FakeLive(console)
+    renderer = IncrementalMarkdownRenderer(live, lambda t: Markdown(t, code_theme="monokai"))
+    for i in range(0, len(text), chunk_size):
+        renderer.feed(text[i:i + chunk_size])
+    console.print(live.renderable)
+    return _output(console), renderer
+
+
+class TestIncrementalMarkdownRenderer:
+    """Tests for IncrementalMarkdownRenderer."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 50, 10000])
+    @pytest.mark.parametrize("width", [40, 100])
+    def test_output_matches_full_render(self, chunk_size, width):
+        """Committed blocks plus tail look exactly like a single render."""
+        incremental, _ = _render_incremental(REPLY, width, chunk_size)
+        assert incremental == _render_full(REPLY, width)
+
+    def test_only_tail_is_kept(self):
+        """Completed blocks are dropped from the live buffer."""
+        _, renderer = _render_incremental(REPLY, 70, 5)
+        # The previous block is committed once the next line is complete
+        assert renderer.tail == "Para with ![img](x.png) image\n\nFinal para."
+
+    def test_code_block_not_split_on_blank_line(self):
+        """Blank lines inside an open fence are not block boundaries."""
+        console = _make_console()
+        live = FakeLive(console)
+        renderer = IncrementalMarkdownRenderer(live, Markdown)
+        renderer.feed("```bash\necho 1\n\necho 2\n")
+        assert console.file.getvalue() == ""
+        assert "echo 1" in renderer.tail
+
+    def test_closed_fence_is_committed(self):
+        """Closing fence followed by a new block commits the code block."""
+        console = _make_console(color_system=None)
+        live = FakeLive(console)
+        renderer = IncrementalMarkdownRenderer(live, Markdown)
+        renderer.feed("```bash\necho 1\n```\nNext line\n")
+        assert "echo 1" in console.file.getvalue()
+        assert renderer.tail == "Next line\n"
+
+    def test_loose_list_is_not_split(self):
+        """List items separated by blank lines stay in one block."""
+        console = _make_console()
+        live = FakeLive(console)
+        renderer = IncrementalMarkdownRenderer(live, Markdown)
+        renderer.feed("1. one\n\n2. two\n\n3. three\n")
+        assert console.file.getvalue() == ""
+
+    @pytest.mark.parametrize("text", [
+        "[x]: https://example.com\n\nSee [x] and [the docs][X].\n\nEnd.",
+        "See [the docs][x] here.\n\nMore text.\n\n[x]: https://example.com\n\nEnd.",
+        "Index `m[0][1]`.\n\n```python\nm[0][1]\n```\n\nEnd.",
+    ])
+    @pytest.mark.parametrize("chunk_size", [1, 7, 10000])
+    def test_reference_links_match_full_render(self, text, chunk_size):
+        """Definitions reach later blocks, full references wait for theirs."""
+        incremental, _ = _render_incremental(text, 70, chunk_size)
+        assert incremental == _render_full(text, 70)
+
+    def test_unresolved_full_reference_stays_in_tail(self):
+        _, renderer = _render_incremental("See [the docs][x].\n\nMore text.\n\nLast", 70, 5)
+        assert renderer.tail.startswith("See [the docs][x].")
+
+    def test_shortcut_reference_before_definition_is_text(self):
+        """Known limitation: "[x]" is committed before "[x]: url" arrives."""
+        text = "See [x] here.\n\n[x]: https://example.com\n\nEnd."
+        incremental, _ = _render_incremental(text, 70, 5)
+        assert "See [x] here." in incremental
+        assert "See [x] here." not in _render_full(text, 70)
+
+    def test_append_does_not_render(self):
+        """append() only buffers text, render() updates live region."""
+        live = FakeLive(_make_console())
+        renderer = IncrementalMarkdownRenderer(live, Markdown)
+        renderer.append("Hello")
+        assert live.updates == 0
+        renderer.render()
+        assert live.updates == 1
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRenderScheduler:
+    """Tests for RenderScheduler frame pacing."""
+
+    def test_first_frame_is_due_immediately(self):
+        """First content is rendered without waiting."""
+        scheduler = RenderScheduler(10, clock=FakeClock())
+        assert not scheduler.due()
+        scheduler.mark_dirty()
+        assert scheduler.due()
+
+    def test_chunks_between_frames_are_merged(self):
+        """Many chunks inside one frame interval produce a single frame."""
+        clock = FakeClock()
+        scheduler = RenderScheduler(10, clock=clock)
+        rendered = 0
+        for _ in range(100):
+            scheduler.mark_dirty()
+            if scheduler.due():
+                scheduler.frame_rendered()
+                rendered += 1
+            clock.now += 0.001
+        # 100 chunks over 0.1 s at 10 fps -> one or two frames
+        assert rendered <= 2
+        assert scheduler.dirty
+
+    def test_time_until_next_frame(self):
+        """Remaining frame time is reported only when there is content."""
+        clock = FakeClock()
+        scheduler = RenderScheduler(4, clock=clock)
+        assert scheduler.time_until_next_frame() is None
+        scheduler.mark_dirty()
+        scheduler.frame_rendered()
+        scheduler.mark_dirty()
+        assert scheduler.time_until_next_frame() == pytest.approx(0.25)
+        clock.now += 1
+        assert scheduler.time_until_next_frame() == 0.0
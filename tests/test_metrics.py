@@ -0,0 +1,134 @@
+"""Tests for per-request latency metrics."""
+
+import json
+
+import pytest
+
+from penguin_tamer.llm_clients.metrics import (
+    RequestMetrics, append_metrics_record, summarize_metrics, GAP_BUCKET_LABELS
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _metrics_with_clock():
+    clock = FakeClock()
+    metrics = RequestMetrics(model="test-model")
+    metrics._clock = clock
+    metrics._start = 0.0
+    return metrics, clock
+
+
+class TestRequestMetrics:
+    """Tests for RequestMetrics record."""
+
+    def test_ttft_gaps_and_speed(self):
+        """First chunk sets TTFT, later chunks fill the gap histogram."""
+        metrics, clock = _metrics_with_clock()
+        clock.now = 0.2
+        metrics.mark_connected()
+        clock.now = 0.5
+        metrics.record_chunk(10)
+        clock.now = 0.505
+        metrics.record_chunk(10)
+        clock.now = 1.6
+        metrics.record_chunk(24)
+        metrics.record_usage({'prompt_tokens': 5, 'completion_tokens': 11})
+        metrics.finish("ok")
+
+        assert metrics.connect_time == 0.2
+        assert metrics.ttft == 0.5
+        assert metrics.chunks == 3
+        assert metrics.gap_histogram[GAP_BUCKET_LABELS[0]] == 1
+        assert metrics.gap_histogram[GAP_BUCKET_LABELS[-1]] == 1
+        assert metrics.chars_per_second == pytest.approx(40.0)
+        assert metrics.tokens_per_second == pytest.approx(10.0)
+        assert metrics.total_time == 1.6
+
+    def test_render_frames(self):
+        """Frame durations are accumulated."""
+        metrics = RequestMetrics()
+        metrics.record_frame(0.01)
+        metrics.record_frame(0.03)
+        assert metrics.frames == 2
+        assert metrics.max_frame_time == 0.03
+        assert abs(metrics.avg_frame_time - 0.02) < 1e-9
+
+    def test_merge_hedge_keeps_primary_counters(self):
+        """A winning backup brings its stream, the primary keeps its retries and waits."""
+        primary, clock = _metrics_with_clock()
+        primary.record_retry(0.5)
+        primary.throttled = 1.0
+        primary.estimated_prompt_tokens = 30
+        backup = RequestMetrics(model="backup-model")
+        backup._clock = clock
+        backup.share_start(primary)
+        backup.throttled = 0.25
+        clock.now = 1.8
+        backup.mark_connected()
+        clock.now = 2.0
+        backup.record_chunk(5)
+
+        primary.merge_hedge(backup)
+        # The backup reader keeps recording into the same object
+        clock.now = 2.02
+        backup.record_chunk(7)
+
+        assert (primary.model, primary.connect_time, primary.ttft) == ("backup-model", 1.8, 2.0)
+        assert (primary.retries, primary.retry_delay, primary.throttled) == (1, 0.5, 1.25)
+        assert primary.estimated_prompt_tokens == 30
+        assert (primary.chunks, primary.chars) == (2, 12)
+        assert primary.gap_histogram[GAP_BUCKET_LABELS[1]] == 1
+        assert backup.chunks == 1
+
+    def test_speed_unknown_without_chunks(self):
+        """Speeds are None when nothing was streamed."""
+        metrics = RequestMetrics()
+        metrics.finish("error")
+        assert metrics.chars_per_second is None
+        assert metrics.tokens_per_second is None
+
+
+class TestMetricsOutput:
+    """Tests for JSON Lines output and summary."""
+
+    def test_append_json_lines(self, tmp_path):
+        """Each record becomes one JSON line."""
+        path = tmp_path / "metrics" / "metrics.jsonl"
+        for status in ("ok", "error"):
+            metrics = RequestMetrics(model="m")
+            metrics.record_chunk(3)
+            metrics.finish(status)
+            append_metrics_record(metrics, path)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r['status'] for r in records] == ["ok", "error"]
+        assert records[0]['chars'] == 3
+        assert 'gap_histogram' in records[0]
+        assert 'tokens_per_second' in records[0]
+
+    def test_summary_merges_histograms(self):
+        """Summary averages records and merges gap histograms."""
+        records = []
+        for ttft in (0.1, 0.3):
+            metrics, clock = _metrics_with_clock()
+            clock.now = ttft
+            metrics.record_chunk(1)
+            clock.now += 0.02
+            metrics.record_chunk(1)
+            records.append(metrics)
+
+        summary = summarize_metrics(records)
+        assert summary['requests'] == 2
+        assert abs(summary['avg_ttft'] - 0.2) < 1e-9
+        assert summary['max_ttft'] == 0.3
+        assert sum(summary['gap_histogram'].values()) == 2
@@ -0,0 +1,148 @@
+"""Tests for native OpenAI-compatible SSE transport."""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from penguin_tamer.error_handlers import (
+    ErrorHandler, HTTPStatusError, TransportConnectionError
+)
+from penguin_tamer.llm_clients.native_transport import NativeChatTransport
+
+
+def _sse(chunks, done=True):
+    body = b""
+    for chunk in chunks:
+        body += b"data: " + json.dumps(chunk).encode() + b"\r\n\r\n"
+    if done:
+        body += b"data: [DONE]\n\n"
+    return body
+
+
+def _content_chunk(text):
+    return {"choices": [{"delta": {"content": text}, "index": 0}]}
+
+
+class FakeAPI:
+    """Local HTTP server answering /chat/completions with a canned response."""
+
+    def __init__(self, status=200, body=b"", headers=None, chunked=False):
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                api.requests.append((self.path, dict(self.headers), json.loads(self.rfile.read(length))))
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    # One HTTP chunk per SSE line to test reassembly
+                    for line in body.splitlines(keepends=True):
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_api():
+    servers = []
+
+    def start(**kwargs):
+        server = FakeAPI(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+class TestNativeChatTransport:
+    """Tests for NativeChatTransport and SSEStream."""
+
+    @pytest.mark.parametrize("chunked", [False, True])
+    def test_stream_yields_chunk_dicts(self, fake_api, chunked):
+        """data: lines are decoded into dicts until [DONE]."""
+        usage = {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}}
+        api = fake_api(body=b": keep-alive\n\n" + _sse([_content_chunk("Hel"), _content_chunk("lo"), usage]),
+                       chunked=chunked)
+        transport = NativeChatTransport(api.url, api_key="secret")
+        chunks = list(transport.create_stream({"model": "m", "messages": [], "stream": True}))
+
+        assert [c["choices"][0]["delta"]["content"] for c in chunks[:2]] == ["Hel", "lo"]
+        assert chunks[2]["usage"]["completion_tokens"] == 2
+        path, headers, body = api.requests[0]
+        assert path == "/v1/chat/completions"
+        assert headers["Authorization"] == "Bearer secret"
+        assert body["model"] == "m"
+
+    def test_status_error_maps_like_sdk(self, fake_api):
+        """401 is reported with the same message as the SDK AuthenticationError."""
+        api = fake_api(status=401, body=json.dumps({"error": {"message": "bad key"}}).encode())
+        transport = NativeChatTransport(api.url)
+        with pytest.raises(HTTPStatusError) as exc_info:
+            transport.create_stream({"model": "m"})
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.body == {"message": "bad key"}
+        assert "401" in ErrorHandler().handle(exc_info.value)
+
+    def test_rate_limit_error_uses_provider_message(self, fake_api):
+        """429 message contains provider text like RateLimitError."""
+        api = fake_api(status=429, body=json.dumps({"error": {"message": "slow down"}}).encode())
+        with pytest.raises(HTTPStatusError) as exc_info:
+            NativeChatTransport(api.url).create_stream({"model": "m"})
+        assert "slow down" in ErrorHandler().handle(exc_info.value)
+
+    def test_connection_refused(self):
+        """Network failures become TransportConnectionError."""
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        with pytest.raises(TransportConnectionError):
+            NativeChatTransport(f"http://127.0.0.1:{port}/v1").create_stream({"model": "m"})
+
+    def test_client_uses_native_transport(self, fake_api, monkeypatch):
+        """OpenAIClient with transport: native parses dict chunks and headers."""
+        from penguin_tamer.config_manager import config
+        from penguin_tamer.llm_clients import OpenAIClient
+
+        original_get = config.get
+        monkeypatch.setattr(
+            config, "get",
+            lambda section, key, default=None: "native" if key == "transport" else original_get(section, key, default)
+        )
+        api = fake_api(body=_sse([_content_chunk("Hi"), {"choices": [], "usage": {"prompt_tokens": 1}}]),
+                       headers={"x-ratelimit-limit-requests": "100"})
+        client = OpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        stream = client._create_stream(client._prepare_api_params("hello"))
+        client._extract_rate_limits(stream)
+        chunks = list(stream)
+
+        assert client.rate_limit_requests == 100
+        assert client._extract_chunk_content(chunks[0]) == "Hi"
+        assert client._extract_usage_stats(chunks[1]) == {"prompt_tokens": 1, "completion_tokens": 0}
+        assert client._client is None  # SDK client never created
@@ -0,0 +1,117 @@
+"""Tests for command output compaction before it enters the LLM context."""
+
+import hashlib
+import io
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer import output_compaction
+from penguin_tamer.output_compaction import (
+    OutputLog, clean_terminal_output, collapse_repeats, compact_output, fit_lines
+)
+
+
+@pytest.fixture
+def output_config(monkeypatch, tmp_path):
+    """Replace `global.command_output` with the given dict, full outputs go to tmp_path."""
+    from penguin_tamer.config_manager import config
+
+    original_get = config.get
+    monkeypatch.setattr(output_compaction, "_outputs_dir", lambda: tmp_path)
+    monkeypatch.setattr(output_compaction, "_output_log", None)
+
+    def apply(section):
+        def get(section_name, key=None, default=None):
+            if key == "command_output":
+                return section
+            if key == "add_execution_to_context":
+                return True
+            return original_get(section_name, key, default)
+        monkeypatch.setattr(config, "get", get)
+    return apply
+
+
+def _result(stdout="", stderr="", exit_code=0):
+    return {"success": exit_code == 0, "exit_code": exit_code, "stdout": stdout, "stderr": stderr,
+            "interrupted": False}
+
+
+class TestCompaction:
+    """Cleaning, collapsing and the token budget."""
+
+    def test_ansi_and_progress_redraws_are_removed(self):
+        text = "\x1b[1;32mdone\x1b[0m\n 10%\r 50%\r100%\r\n\x1b]0;title\x07ok"
+        assert clean_terminal_output(text) == "done\n100%\nok"
+
+    def test_repeated_lines_are_collapsed(self):
+        lines = ["start"] + ["retrying..."] * 5 + [f"Downloading {i}%" for i in range(0, 100, 10)] + ["", "", "end"]
+        assert collapse_repeats(lines) == [
+            "start",
+            "retrying...", "[... previous line repeated 4 more times ...]",
+            "Downloading 0%", "[... 8 similar lines ...]", "Downloading 90%",
+            "",
+            "end",
+        ]
+
+    def test_budget_keeps_head_and_tail(self):
+        lines = [f"entry {i} " + "word " * 10 for i in range(1000)]
+        fitted = fit_lines(lines, 300)
+        assert fitted[0] == lines[0] and fitted[-1] == lines[-1]
+        assert any(line.startswith("[... ") and "lines omitted" in line for line in fitted)
+        assert len(fitted) < 50
+
+    def test_short_output_is_unchanged(self):
+        assert compact_output("total 0\nfile.txt\n", 2000) == "total 0\nfile.txt"
+
+    def test_log_prunes_old_files(self, tmp_path):
+        log = OutputLog(tmp_path, keep_files=2)
+        paths = [log.save("cmd", f"output {i}") for i in range(3)]
+        assert not paths[0].exists() and paths[1].exists() and paths[2].exists()
+        assert paths[2].read_text() == "$ cmd\noutput 2"
+
+
+class TestCommandContext:
+    """_add_command_to_context() adds compacted results."""
+
+    def _client(self):
+        return SimpleNamespace(messages=[], console=Console(file=io.StringIO(), width=200))
+
+    def test_long_output_is_compacted_and_saved(self, output_config, tmp_path):
+        from penguin_tamer.cli import _add_command_to_context
+
+        output_config({"max_tokens": 200})
+        client = self._client()
+        stdout = "".join(f"{hashlib.sha1(bytes([i % 256, i // 256])).hexdigest()} " + "text " * 20 + "\n"
+                         for i in range(500))
+        _add_command_to_context(client, "journalctl", _result(stdout))
+
+        content = client.messages[-1]["content"]
+        assert len(content) < len(stdout) // 10
+        assert "lines omitted" in content and "[Full output saved to" in content
+        saved = list(tmp_path.glob("output-*.log"))
+        assert len(saved) == 1 and saved[0].read_text() == "$ journalctl\n" + stdout
+        assert str(saved[0]) in client.console.file.getvalue()
+
+    def test_identical_result_is_referenced(self, output_config):
+        from penguin_tamer.cli import _add_command_to_context
+
+        output_config({})
+        client = self._client()
+        stdout = "\n".join(f"/etc/file{i}.conf" for i in range(40))
+        _add_command_to_context(client, "ls /etc", _result(stdout))
+        _add_command_to_context(client, "ls  /etc", _result(stdout))
+
+        assert "/etc/file39.conf" in client.messages[1]["content"]
+        assert "[Same output as the earlier command: ls /etc]" in client.messages[3]["content"]
+        assert "/etc/file39.conf" not in client.messages[3]["content"]
+
+    def test_zero_budget_adds_full_output(self, output_config):
+        from penguin_tamer.cli import _add_command_to_context
+
+        output_config({"max_tokens": 0})
+        client = self._client()
+        stdout = "\x1b[31mred\x1b[0m\n" * 3
+        _add_command_to_context(client, "echo", _result(stdout, exit_code=1))
+        assert stdout in client.messages[-1]["content"]
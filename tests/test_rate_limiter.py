@@ -0,0 +1,172 @@
+"""Tests for the client-side rate limit scheduler."""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from penguin_tamer.error_handlers import ErrorHandler, HTTPStatusError, RateLimitWaitError
+from penguin_tamer.llm_clients import AsyncOpenAIClient, MistralClient
+from penguin_tamer.llm_clients.rate_limiter import (
+    RateLimiter, estimate_request_tokens, get_rate_limiter, retry_after_seconds
+)
+from tests.conftest import _chunk
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _error(headers):
+    return HTTPStatusError("429", status_code=429, response=SimpleNamespace(headers=headers))
+
+
+class TestEstimates:
+    """Token cost estimate and Retry-After parsing."""
+
+    def test_estimate_counts_messages_and_max_tokens(self):
+        params = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 50}
+        assert estimate_request_tokens(params) == 100 + 4 + 50
+        blocks = {"messages": [{"role": "user", "content": [{"type": "text", "text": "hi"}]}]}
+        assert estimate_request_tokens(blocks) > 4
+
+    @pytest.mark.parametrize("headers, expected", [
+        ({"retry-after": "7"}, 7.0),
+        ({"retry-after-ms": "1500", "retry-after": "7"}, 1.5),
+        ({"retry-after": "soon"}, None),
+        ({}, None),
+    ])
+    def test_retry_after(self, headers, expected):
+        assert retry_after_seconds(_error(headers)) == expected
+
+    def test_retry_after_http_date(self):
+        delay = retry_after_seconds(_error({"retry-after": formatdate(time.time() + 30, usegmt=True)}))
+        assert 25 < delay <= 30
+
+
+class TestRateLimiter:
+    """Token buckets fed by headers and 429 responses."""
+
+    def test_unknown_limits_do_not_delay(self, clock):
+        limiter = RateLimiter(clock=clock)
+        assert [limiter.reserve(1000) for _ in range(5)] == [0.0] * 5
+
+    def test_requests_queue_when_exhausted(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.update(limit_requests=2, remaining_requests=1)
+
+        # One request left, then one every 30 s; each caller queues behind the previous
+        assert [limiter.reserve(0) for _ in range(3)] == [0.0, 30.0, 60.0]
+        clock.now += 60
+        assert limiter.reserve(0) == pytest.approx(30.0)
+
+    def test_token_bucket_uses_estimated_cost(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.update(limit_tokens=6000, remaining_tokens=1000)
+
+        assert limiter.reserve(1000) == 0.0
+        assert limiter.reserve(500) == pytest.approx(5.0)  # 100 tokens per second
+
+    def test_header_update_replaces_estimate(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.update(limit_requests=60, remaining_requests=0)
+        assert limiter.reserve(0) == pytest.approx(1.0)
+        limiter.update(limit_requests=60, remaining_requests=10)
+        assert limiter.reserve(0) == 0.0
+
+    def test_penalize_honors_retry_after(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.penalize(12)
+        assert limiter.reserve(0) == 12.0
+
+        limiter.update(limit_requests=6, remaining_requests=6)
+        limiter.penalize()
+        assert limiter.reserve(0) == pytest.approx(12.0)
+
+    def test_acquire_refuses_long_waits(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.update(limit_requests=1, remaining_requests=0)
+        with pytest.raises(RateLimitWaitError) as exc_info:
+            limiter.acquire(0, max_wait=10)
+        assert exc_info.value.wait == pytest.approx(60.0)
+        assert "60" in ErrorHandler().handle(exc_info.value)
+        # The refused request did not take a place in the queue
+        assert limiter.reserve(0) == pytest.approx(60.0)
+
+    def test_concurrent_callers_get_distinct_slots(self, clock):
+        limiter = RateLimiter(window=60, clock=clock)
+        limiter.update(limit_requests=60, remaining_requests=0)
+        delays = []
+        threads = [threading.Thread(target=lambda: delays.append(limiter.reserve(0))) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(delays) == [pytest.approx(float(i)) for i in range(1, 21)]
+
+    def test_registry_is_per_provider(self):
+        assert get_rate_limiter("a.example") is get_rate_limiter("a.example")
+        assert get_rate_limiter("a.example") is not get_rate_limiter("b.example")
+
+
+class TestClientRateLimits:
+    """Clients feed the shared limiter and wait for it."""
+
+    def test_headers_feed_limiter_of_provider(self):
+        client = MistralClient.create(console=None, api_key="k", api_url="https://limits.example/v1",
+                                      model="m", system_message=[])
+        stream = SimpleNamespace(response=SimpleNamespace(headers={
+            "x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "0"}))
+        client._observe_rate_limits(stream)
+
+        other = MistralClient.create(console=None, api_key="k", api_url="https://limits.example/v1",
+                                     model="other", system_message=[])
+        assert other.rate_limiter is client.rate_limiter
+        assert other.rate_limiter.reserve(0) > 0
+
+        # A response without headers keeps the last known values for statistics
+        client._observe_rate_limits(SimpleNamespace(response=SimpleNamespace(headers={})))
+        assert client.rate_limit_requests == 60
+
+    def test_429_pauses_following_requests(self, sse_api, network_config):
+        network_config({"retries": 0})
+        api = sse_api(status=429)
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        async def run():
+            try:
+                with pytest.raises(HTTPStatusError):
+                    await client.aask("hi")
+            finally:
+                await client.aclose()
+        asyncio.run(run())
+
+        assert client.rate_limiter.reserve(0) > 0
+
+    def test_request_waits_for_limit(self, sse_api):
+        api = sse_api([_chunk("ok")])
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+        client.rate_limiter.penalize(0.3)
+
+        async def run():
+            try:
+                return await client.aask("hi")
+            finally:
+                await client.aclose()
+
+        started = time.monotonic()
+        assert asyncio.run(run()) == "ok"
+        assert time.monotonic() - started >= 0.25
+        assert client.request_metrics[-1].throttled == pytest.approx(0.3, abs=0.05)
@@ -0,0 +1,92 @@
+"""Tests for render cache."""
+
+import io
+
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.segment import Segment
+
+from penguin_tamer import render_cache
+from penguin_tamer.render_cache import RenderCache, create_markdown
+
+
+TEXT = """Intro paragraph.
+
+```python
+def hello():
+    return "world"
+```
+
+Outro.
+"""
+
+
+def _render(renderable, width=60) -> str:
+    console = Console(file=io.StringIO(), width=width, force_terminal=True, color_system="truecolor")
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+class TestRenderCache:
+    """Tests for RenderCache and CachedMarkdown."""
+
+    def setup_method(self):
+        render_cache._render_cache = RenderCache()
+
+    def teardown_method(self):
+        render_cache._render_cache = None
+
+    def test_cached_output_matches_plain_markdown(self):
+        """Cached rendering looks exactly like rich Markdown."""
+        expected = _render(Markdown(TEXT, code_theme="monokai"))
+        assert _render(create_markdown(TEXT, "monokai")) == expected
+        # Second render comes from the cache
+        assert _render(create_markdown(TEXT, "monokai")) == expected
+        assert render_cache.get_render_cache().hits >= 1
+
+    def test_unchanged_code_block_is_not_highlighted_again(self):
+        """Growing text after a code block reuses its highlighted segments."""
+        cache = render_cache.get_render_cache()
+        _render(create_markdown(TEXT))
+        hits = cache.hits
+        _render(create_markdown(TEXT + "More text"))
+        # Whole document misses, the code block hits
+        assert cache.hits == hits + 1
+
+    def test_growing_text_adds_only_code_blocks(self):
+        """Frames of a live tail do not fill the cache with whole documents."""
+        cache = render_cache.get_render_cache()
+        for end in range(len(TEXT) - 10, len(TEXT) + 1):
+            _render(create_markdown(TEXT[:end]))
+        assert {key[0] for key in cache._entries} == {"code"}
+
+    def test_document_cache_is_opt_in(self):
+        """Text rendered again unchanged can cache its whole output."""
+        cache = render_cache.get_render_cache()
+        expected = _render(Markdown(TEXT, code_theme="monokai"))
+        assert _render(create_markdown(TEXT, "monokai", cache_document=True)) == expected
+        hits = cache.hits
+        assert _render(create_markdown(TEXT, "monokai", cache_document=True)) == expected
+        assert cache.hits == hits + 1
+        assert {key[0] for key in cache._entries} == {"code", "markdown"}
+
+    def test_key_includes_width_and_theme(self):
+        """Different width or theme produce separate entries."""
+        cache = render_cache.get_render_cache()
+        _render(create_markdown(TEXT, "monokai"), width=60)
+        entries = len(cache)
+        _render(create_markdown(TEXT, "monokai"), width=80)
+        _render(create_markdown(TEXT, "dracula"), width=60)
+        assert len(cache) == entries * 3
+
+    def test_memory_bound_evicts_least_recently_used(self):
+        """Entries over the bound are evicted in LRU order."""
+        cache = RenderCache(max_bytes=500)
+        segments = [Segment("x" * 30)]
+        for key in ("a", "b", "c"):
+            cache.put(key, segments)
+        cache.get("a")
+        cache.put("d", segments)
+        assert cache.current_bytes <= 500
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
@@ -0,0 +1,115 @@
+"""Tests for the incremental request body encoder."""
+
+import io
+import json
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients import request_encoder
+from penguin_tamer.llm_clients.context_window import ContextSettings, MessageHistory, fit_messages
+from penguin_tamer.llm_clients.request_encoder import RequestBodyEncoder
+
+
+def _messages(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"сообщение {i} \"quoted\""}
+            for i in range(count)]
+
+
+@pytest.fixture
+def encode_calls(monkeypatch):
+    """Values passed to json encoding by the encoder."""
+    calls = []
+    original = request_encoder._encode
+    monkeypatch.setattr(request_encoder, "_encode", lambda value: calls.append(value) or original(value))
+    return calls
+
+
+class TestRequestBodyEncoder:
+    """Bodies equal json.dumps(), only new messages are encoded."""
+
+    @pytest.mark.parametrize("params", [
+        {"model": "m", "messages": [], "stream": True},
+        {"messages": _messages(3)},
+        {"model": "m", "messages": [{"role": "user", "content": [{"type": "text", "text": "hi"}]}], "seed": 1},
+        {"model": "m"},
+    ])
+    def test_body_matches_params(self, params):
+        assert json.loads(RequestBodyEncoder().encode(params)) == params
+
+    def test_appended_messages_reuse_history(self, encode_calls):
+        encoder = RequestBodyEncoder()
+        history = _messages(100)
+        encoder.encode({"model": "m", "messages": list(history), "stream": True})
+        encode_calls.clear()
+
+        history += [{"role": "user", "content": "new question"}, {"role": "assistant", "content": "new answer"}]
+        params = {"model": "m", "messages": list(history), "stream": True}
+        body = encoder.encode(params)
+
+        assert json.loads(body) == params
+        # The parameter header and the two new messages only
+        assert len(encode_calls) == 3
+        assert encoder.reused_messages == 100
+
+    def test_changed_messages_are_encoded_again(self):
+        encoder = RequestBodyEncoder()
+        history = _messages(10)
+        encoder.encode({"messages": history})
+
+        # A summary replaces old turns, a message is edited in place
+        history[2:5] = [{"role": "system", "content": "summary"}]
+        history[-1]["content"] = "edited"
+        body = encoder.encode({"messages": history})
+
+        assert json.loads(body) == {"messages": history}
+        # Everything but the summary and the edited message
+        assert encoder.reused_messages == 6
+
+    def test_rebuilt_messages_are_reused(self, encode_calls):
+        encoder = RequestBodyEncoder()
+        encoder.encode({"messages": _messages(3)})
+        encode_calls.clear()
+
+        encoder.encode({"messages": _messages(3)})
+
+        assert encoder.reused_messages == 3
+        assert encode_calls == [{}]
+
+    @pytest.mark.parametrize("policy", ["drop", "truncate", "summarize"])
+    def test_session_past_context_budget(self, policy):
+        settings = ContextSettings(budget=3000, policy=policy, keep_turns=2)
+        history = MessageHistory([{"role": "system", "content": "s"}])
+        encoder = RequestBodyEncoder()
+        trimmed = 0
+
+        for turn in range(30):
+            question = {"role": "user", "content": f"question {turn} " + "q" * 1500}
+            fitted, trim = fit_messages(history + [question], history.pinned, settings)
+            encoded_before = encoder.encoded_messages
+            body = encoder.encode({"model": "m", "messages": fitted})
+
+            assert json.loads(body) == {"model": "m", "messages": fitted}
+            if trim.dropped_turns:
+                trimmed += 1
+                # The previous answer, the question and what the budget changed this time
+                assert encoder.encoded_messages - encoded_before <= 4
+            history += [question, {"role": "assistant", "content": f"answer {turn} " + "a" * 1500}]
+
+        assert trimmed > 20
+        assert encoder.reused_messages > encoder.encoded_messages
+
+    def test_client_sends_encoded_body(self, flaky_api):
+        api = flaky_api([])
+        client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                      api_url=api.url, model="m", system_message=[{"role": "system", "content": "s"}])
+        client.output_mode = "raw"
+
+        for question in ("first", "second"):
+            assert client.ask_stream(question) == "partial answer"
+
+        assert api.bodies[1]["messages"][-1] == {"role": "user", "content": "second"}
+        assert api.bodies[1]["messages"][:3] == client.messages[:3]
+        # The system prompt and the previous question, rebuilt for each request
+        assert client._body_encoder.reused_messages == 2
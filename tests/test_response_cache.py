@@ -0,0 +1,141 @@
+"""Tests for the on-disk response cache."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients import response_cache
+from penguin_tamer.llm_clients.response_cache import CacheSettings, ResponseCache, request_key
+from tests.test_rate_limiter import FakeClock
+
+
+@pytest.fixture
+def cache_config(monkeypatch, tmp_path):
+    """Replace `global.response_cache` with the given dict, the cache lives in tmp_path."""
+    from penguin_tamer.config_manager import config
+
+    original_get = config.get
+    monkeypatch.setattr(response_cache, "_cache_file", lambda: tmp_path / response_cache.CACHE_FILE_NAME)
+    monkeypatch.setattr(response_cache, "_response_cache", None)
+
+    def apply(section, debug=False):
+        def get(section_name, key=None, default=None):
+            if key == "response_cache":
+                return section
+            if key == "debug":
+                return debug
+            return original_get(section_name, key, default)
+        monkeypatch.setattr(config, "get", get)
+    yield apply
+    if response_cache._response_cache is not None:
+        response_cache._response_cache.close()
+
+
+def _client(api, seed=None):
+    client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                  api_url=api.url, model="m", system_message=[], seed=seed)
+    client.output_mode = "raw"
+    return client
+
+
+class TestCacheKeys:
+    """What makes two requests the same."""
+
+    def test_key_is_canonical(self):
+        params = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+        reordered = {"temperature": 0, "stream": True, **params}
+        assert request_key("api.example", params) == request_key("api.example", reordered)
+        assert request_key("api.example", params) != request_key("other.example", params)
+        assert request_key("api.example", params) != request_key("api.example", {**params, "temperature": 0.1})
+
+    @pytest.mark.parametrize("section, params, accepted", [
+        ({}, {"seed": 1}, False),
+        ({"enabled": True}, {"seed": 1, "temperature": 0.9}, True),
+        ({"enabled": True}, {"temperature": 0.2}, True),
+        ({"enabled": True}, {"temperature": 0.8}, False),
+        ({"enabled": True, "deterministic_only": False}, {"temperature": 0.8}, True),
+    ])
+    def test_accepts(self, cache_config, section, params, accepted):
+        cache_config(section)
+        assert CacheSettings.from_config().accepts(params) is accepted
+
+
+class TestResponseCache:
+    """LRU and TTL eviction of the SQLite store."""
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        clock = FakeClock()
+        cache = ResponseCache(tmp_path / "cache.db", max_bytes=10, ttl=100, clock=clock)
+        cache.put("a", "aaaa")
+        clock.now += 1
+        cache.put("b", "bbbb")
+        clock.now += 1
+        assert cache.get("a") == "aaaa"  # "b" becomes the least recently used
+        clock.now += 1
+        cache.put("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+        assert cache.stats()["bytes"] == 8
+        cache.put("big", "x" * 11)
+        assert cache.get("big") is None
+        cache.close()
+
+    def test_ttl_expiry(self, tmp_path):
+        clock = FakeClock()
+        cache = ResponseCache(tmp_path / "cache.db", max_bytes=100, ttl=10, clock=clock)
+        cache.put("a", "reply")
+        clock.now += 11
+        assert cache.get("a") is None
+        assert cache.stats() == {'hits': 0, 'misses': 1, 'entries': 0, 'bytes': 0}
+        cache.close()
+
+
+class TestCachedRequests:
+    """Hits replay through StreamProcessor without contacting the provider."""
+
+    def test_hit_replays_reply(self, flaky_api, cache_config):
+        cache_config({"enabled": True}, debug=True)
+        api = flaky_api([])
+
+        first = _client(api, seed=7)
+        assert first.ask_stream("hi") == "partial answer"
+        second = _client(api, seed=7)
+        assert second.ask_stream("hi") == "partial answer"
+
+        assert api.requests == 1
+        assert second.request_metrics[-1].cached and second.request_metrics[-1].status == "ok"
+        assert second.messages[-1] == {"role": "assistant", "content": "partial answer"}
+        assert second.total_requests == 0  # No tokens were spent
+        assert "Response cache: miss" in first.console.file.getvalue()
+        assert "Response cache: hit" in second.console.file.getvalue()
+
+    def test_non_deterministic_requests_are_not_cached(self, flaky_api, cache_config):
+        cache_config({"enabled": True})
+        api = flaky_api([])
+
+        for _ in range(2):
+            assert _client(api).ask_stream("hi") == "partial answer"
+        assert api.requests == 2
+
+    def test_failed_reply_is_not_cached(self, flaky_api, cache_config):
+        cache_config({"enabled": True, "deterministic_only": False})
+        api = flaky_api(["cut"])
+
+        with pytest.raises(Exception):
+            _client(api).ask_stream("hi")
+        assert _client(api).ask_stream("hi") == "partial answer"
+        assert api.requests == 2
+
+    def test_request_is_built_once(self, flaky_api, cache_config, monkeypatch):
+        cache_config({"enabled": True}, debug=True)
+        client = _client(flaky_api([]), seed=7)
+        calls = []
+        prepare = client._prepare_api_params
+        monkeypatch.setattr(client, "_prepare_api_params", lambda user_input: calls.append(user_input) or
+                            prepare(user_input))
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert calls == ["hi"]
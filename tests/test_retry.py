@@ -0,0 +1,105 @@
+"""Tests for retries of transient request failures."""
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.error_handlers import (
+    ErrorHandler, HTTPStatusError, RateLimitWaitError, TransportConnectionError, TransportTimeoutError
+)
+from penguin_tamer.llm_clients import AsyncOpenAIClient, MistralClient
+from penguin_tamer.llm_clients.http_session import NetworkSettings
+from penguin_tamer.llm_clients.retry import RetryPolicy
+
+
+def _client(api):
+    client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                  api_url=api.url, model="m", system_message=[])
+    client.output_mode = "raw"
+    return client
+
+
+class TestRetryPolicy:
+    """Which errors are retried and how long to wait."""
+
+    @pytest.mark.parametrize("error, recoverable", [
+        (TransportConnectionError("reset"), True),
+        (TransportTimeoutError("timed out"), True),
+        (HTTPStatusError("busy", status_code=503), True),
+        (HTTPStatusError("slow down", status_code=429), True),
+        (HTTPStatusError("bad key", status_code=401), False),
+        (HTTPStatusError("bad model", status_code=400), False),
+        (RateLimitWaitError("exhausted", wait=90), False),
+        (ValueError("bug"), False),
+    ])
+    def test_recoverable_errors(self, error, recoverable):
+        assert ErrorHandler.is_recoverable(error) is recoverable
+
+    def test_exponential_backoff_with_jitter(self):
+        policy = RetryPolicy(retries=5, backoff=1.0, max_backoff=4.0, max_delay=100)
+        error = TransportConnectionError("reset")
+        assert policy.next_delay(error, 0, 0, rng=lambda: 0.0) == 0.5
+        assert policy.next_delay(error, 1, 0, rng=lambda: 0.999) == pytest.approx(2.0, abs=0.01)
+        assert policy.next_delay(error, 4, 0, rng=lambda: 0.0) == 2.0  # capped at max_backoff
+
+    def test_limits(self):
+        policy = RetryPolicy(retries=2, backoff=1.0, max_delay=3.0)
+        error = HTTPStatusError("busy", status_code=503,
+                                response=SimpleNamespace(headers={"retry-after": "2"}))
+        assert policy.next_delay(error, 0, 0) == 2.0     # Retry-After wins over backoff
+        assert policy.next_delay(error, 0, 1.5) is None  # total delay budget exceeded
+        assert policy.next_delay(error, 2, 0) is None    # attempts exhausted
+        assert policy.next_delay(HTTPStatusError("no", status_code=404), 0, 0) is None
+
+    def test_settings_allow_disabling_retries(self, network_config):
+        network_config({"retries": 0, "retry_backoff": 0})
+        settings = NetworkSettings.from_config("mistral")
+        assert settings.retries == 0 and settings.retry_backoff == 0.5
+        assert RetryPolicy.from_settings(settings).next_delay(TransportConnectionError("x"), 0, 0) is None
+
+
+class TestRetriedRequests:
+    """Transient failures before the first chunk do not drop the turn."""
+
+    def test_server_error_and_reset_are_retried(self, flaky_api):
+        api = flaky_api([502, "reset"])
+        client = _client(api)
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert api.requests == 3
+        metrics = client.request_metrics[-1]
+        assert metrics.retries == 2 and metrics.retry_delay > 0
+        assert metrics.status == "ok"
+
+    def test_non_recoverable_error_is_not_retried(self, flaky_api):
+        api = flaky_api([401])
+        client = _client(api)
+
+        assert client.ask_stream("hi") == ""
+        assert api.requests == 1
+        assert client.request_metrics[-1].retries == 0
+
+    def test_started_stream_is_never_retried(self, flaky_api):
+        api = flaky_api(["cut"])
+        client = _client(api)
+
+        with pytest.raises(TransportConnectionError):
+            client.ask_stream("hi")
+        assert api.requests == 1
+
+    def test_async_client_retries(self, flaky_api):
+        api = flaky_api([503])
+        client = AsyncOpenAIClient.create(console=None, api_key="k", api_url=api.url, model="m", system_message=[])
+
+        async def run():
+            try:
+                return await client.aask("hi")
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()) == "partial answer"
+        assert api.requests == 2
+        assert client.request_metrics[-1].retries == 1
@@ -0,0 +1,103 @@
+"""Tests for the stall watchdog of streamed replies."""
+
+import io
+import time
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients.http_session import NetworkSettings
+from penguin_tamer.llm_clients.stream_processor import StreamProcessor
+from penguin_tamer.llm_clients.stream_reader import StreamReader
+
+
+def _client(api, output_mode="raw"):
+    client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                  api_url=api.url, model="m", system_message=[])
+    client.output_mode = output_mode
+    return client
+
+
+@pytest.fixture
+def stall_config(network_config):  # noqa: F811
+    """Short watchdog timeouts on top of the given network settings."""
+    def apply(**network):
+        network_config({"first_byte_timeout": 0.3, "idle_timeout": 0.3, "retry_backoff": 0.01, **network})
+    return apply
+
+
+class TestStallSettings:
+    """Timeouts come from the network settings, per provider."""
+
+    def test_provider_overrides(self, network_config):
+        network_config({"idle_timeout": 20, "providers": {"mistral": {"first_byte_timeout": 5}}})
+        settings = NetworkSettings.from_config("mistral")
+        assert (settings.first_byte_timeout, settings.idle_timeout) == (5.0, 20.0)
+        assert NetworkSettings.from_config("openai").first_byte_timeout == 90.0
+        assert settings.sdk_timeout.connect == settings.connect_timeout
+
+
+class TestStallWatchdog:
+    """Stalled streams are aborted instead of hanging the terminal."""
+
+    def test_silent_provider_is_retried(self, flaky_api, stall_config):
+        stall_config(retries=1)
+        api = flaky_api(["silent"])
+        client = _client(api)
+
+        assert client.ask_stream("hi") == "partial answer"
+        assert api.requests == 2
+        assert client.request_metrics[-1].retries == 1
+
+    @pytest.mark.parametrize("output_mode", ["raw", "rich"])
+    def test_stalled_reply_is_truncated(self, flaky_api, stall_config, output_mode):
+        stall_config(retries=0, breaker_failures=1)
+        api = flaky_api(["stall"])
+        client = _client(api, output_mode)
+
+        assert client.ask_stream("hi") == "partial "
+        metrics = client.request_metrics[-1]
+        assert metrics.status == "truncated" and metrics.stalls == 1
+        assert "truncated" in client.console.file.getvalue()
+        assert client.messages[-1] == {"role": "assistant", "content": "partial "}
+        # The stall counts as an outage of the provider
+        assert client.circuit_breaker.state == "open"
+
+    def test_stalled_reply_is_continued(self, flaky_api, stall_config):
+        stall_config(retries=0, continue_on_stall=True)
+        api = flaky_api(["stall"])
+        client = _client(api)
+
+        assert client.ask_stream("hi") == "partial partial answer"
+        metrics = client.request_metrics[-1]
+        assert metrics.status == "ok"
+        assert (metrics.stalls, metrics.continuations) == (1, 1)
+        assert api.bodies[1]["messages"][-2] == {"role": "assistant", "content": "partial "}
+        assert "Continue" in api.bodies[1]["messages"][-1]["content"]
+
+    @pytest.mark.parametrize("output_mode", ["raw", "rich"])
+    def test_ended_stream_never_stalls(self, flaky_api, stall_config, output_mode):
+        stall_config(retries=0, breaker_failures=1, continue_on_stall=True)
+        client = _client(flaky_api([]), output_mode)
+        client._create_stream = lambda api_params: iter([{"choices": [{"delta": {"content": ""}}]}])
+
+        started = time.monotonic()
+        assert client.ask_stream("hi") == ""
+        assert time.monotonic() - started < 0.3
+        metrics = client.request_metrics[-1]
+        assert metrics.status == "empty"
+        assert (metrics.stalls, metrics.continuations) == (0, 0)
+        assert "truncated" not in client.console.file.getvalue()
+        assert client.circuit_breaker.state == "closed"
+
+    def test_finished_reader_is_not_checked(self, flaky_api, stall_config):
+        stall_config()
+        client = _client(flaky_api([]))
+        processor = StreamProcessor(client)
+        reader = StreamReader(client, iter([]), processor.interrupted).start()
+        reader._thread.join(1)
+        reader.last_activity -= 10
+
+        assert reader.finished
+        assert processor._check_stall(reader) is None
@@ -0,0 +1,162 @@
+"""Tests for StreamProcessor output modes."""
+
+import io
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.events import EventEmitter
+from penguin_tamer.llm_clients import OpenAIClient
+
+
+REPLY = "Hello **world**\n\n[Code #1]\n```bash\nls -la\n```\nDone."
+
+
+def _chunk(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))],
+        usage=None,
+    )
+
+
+def _make_client(chunks, terminal):
+    console = Console(file=io.StringIO(), width=60, force_terminal=terminal, color_system=None)
+    client = OpenAIClient.create(
+        console=console,
+        api_key="test-key",
+        api_url="https://api.example.com",
+        model="test-model",
+        system_message=[{"role": "system", "content": "Test"}],
+    )
+    completions = SimpleNamespace(create=lambda **kwargs: iter([_chunk(c) for c in chunks]))
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+
+def _split(text, size=4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestRawOutput:
+    """Tests for raw (non-TTY) output mode."""
+
+    def test_raw_mode_selected_when_not_a_terminal(self):
+        """Piped output gets the reply text exactly, without control codes."""
+        client = _make_client(_split(REPLY), terminal=False)
+        reply = client.ask_stream("hi")
+        output = client.console.file.getvalue()
+        assert reply == REPLY
+        assert output == REPLY + "\n"
+        assert "\x1b" not in output
+        assert client.request_metrics[-1].frames == 0
+
+    def test_raw_mode_forced_on_terminal(self):
+        """output_mode="raw" disables Markdown rendering on a terminal."""
+        client = _make_client(_split(REPLY), terminal=True)
+        client.output_mode = "raw"
+        client.ask_stream("hi")
+        assert client.console.file.getvalue() == REPLY + "\n"
+
+    def test_rich_mode_renders_markdown(self):
+        """Terminal output is rendered as Markdown."""
+        client = _make_client(_split(REPLY), terminal=True)
+        client.ask_stream("hi")
+        output = client.console.file.getvalue()
+        assert "**world**" not in output
+        assert "ls -la" in output
+
+    @pytest.mark.parametrize("mode", ["raw", "rich"])
+    def test_code_blocks_and_context(self, mode):
+        """Both modes collect code blocks and update the dialog context."""
+        client = _make_client(_split(REPLY, 3), terminal=True)
+        client.output_mode = mode
+        client.ask_stream("hi")
+        assert [block.code for block in client.code_blocks] == ["ls -la"]
+        assert client.messages[-1] == {"role": "assistant", "content": REPLY}
+
+
+class TestEventOutput:
+    """Tests for NDJSON event output mode."""
+
+    def _run(self, chunks):
+        client = _make_client(chunks, terminal=True)
+        events_out = io.StringIO()
+        client.output_mode = "json"
+        client.event_emitter = EventEmitter(events_out)
+        reply = client.ask_stream("hi")
+        events = [json.loads(line) for line in events_out.getvalue().splitlines()]
+        return client, reply, events
+
+    def test_events_in_order(self):
+        """Request lifecycle is reported as a sequence of events."""
+        client, reply, events = self._run(_split(REPLY))
+        names = [event["event"] for event in events]
+        assert names[0] == "request_start"
+        assert names[1] == "first_chunk"
+        assert names[-1] == "response_end"
+        assert "".join(e["text"] for e in events if e["event"] == "chunk") == REPLY
+        assert events[-1]["status"] == "ok"
+        assert not client.event_emitter.failed
+        # Nothing but events is written
+        assert client.console.file.getvalue() == ""
+
+    def test_code_block_event(self):
+        """Completed labeled blocks are reported with their metadata."""
+        _, _, events = self._run(_split(REPLY))
+        blocks = [event for event in events if event["event"] == "code_block"]
+        assert len(blocks) == 1
+        assert blocks[0]["number"] == 1
+        assert blocks[0]["label"] == "Code #1"
+        assert blocks[0]["language"] == "bash"
+        assert blocks[0]["code"] == "ls -la"
+
+    def test_error_event(self):
+        """Stream failures are reported as error events."""
+        client = _make_client([], terminal=True)
+
+        def fail(**kwargs):
+            raise ConnectionError("boom")
+
+        client._client.chat.completions.create = fail
+        events_out = io.StringIO()
+        client.output_mode = "json"
+        client.event_emitter = EventEmitter(events_out)
+        assert client.ask_stream("hi") == ""
+        events = [json.loads(line) for line in events_out.getvalue().splitlines()]
+        errors = [event for event in events if event["event"] == "error"]
+        assert errors and errors[0]["message"] == "boom"
+        assert events[-1]["status"] == "error"
+        assert client.event_emitter.failed
+
+
+class TestEmptyStream:
+    """Streams that end without content finish at once with an empty reply."""
+
+    USAGE = {"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 0}}
+
+    def _ask(self, chunks, mode):
+        client = _make_client([], terminal=True)
+        client._client.chat.completions.create = lambda **kwargs: iter(chunks)
+        client.output_mode = mode
+        result = []
+        worker = threading.Thread(target=lambda: result.append(client.ask_stream("hi")), daemon=True)
+        worker.start()
+        worker.join(5)
+        assert not worker.is_alive(), "ask_stream() hangs on a stream without content"
+        return client, result[0]
+
+    @pytest.mark.parametrize("mode", ["raw", "rich", "json"])
+    def test_empty_chunks(self, mode):
+        client, reply = self._ask([_chunk(""), _chunk(None)], mode)
+        assert reply == ""
+        assert client.request_metrics[-1].status == "empty"
+        assert client.messages[-1]["role"] == "system"
+
+    @pytest.mark.parametrize("mode", ["raw", "rich"])
+    def test_usage_only_stream(self, mode):
+        client, reply = self._ask([self.USAGE], mode)
+        assert reply == ""
+        assert client.request_metrics[-1].prompt_tokens == 7
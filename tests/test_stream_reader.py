@@ -0,0 +1,90 @@
+"""Tests for background stream reader."""
+
+import threading
+import time
+
+from penguin_tamer.llm_clients.stream_reader import StreamReader, CONTENT, USAGE, ERROR, DONE
+
+
+class FakeClient:
+    """Client with trivial chunk extraction: chunks are dicts."""
+
+    def _extract_chunk_content(self, chunk):
+        return chunk.get("content")
+
+    def _extract_usage_stats(self, chunk):
+        return chunk.get("usage")
+
+
+class ClosableStream:
+    """Endless stream that records close() calls."""
+
+    def __init__(self):
+        self.closed = False
+
+    def __iter__(self):
+        while not self.closed:
+            yield {"content": "x"}
+            time.sleep(0.001)
+
+    def close(self):
+        self.closed = True
+
+
+def _drain(reader, limit=1000):
+    items = []
+    for _ in range(limit):
+        item = reader.get(timeout=1)
+        if item is None:
+            break
+        items.append(item)
+        if item[0] == DONE:
+            break
+    return items
+
+
+class TestStreamReader:
+    """Tests for StreamReader."""
+
+    def test_content_and_usage_are_queued_in_order(self):
+        """Extracted items arrive in stream order followed by DONE."""
+        stream = [{"content": "a"}, {"content": "b", "usage": {"completion_tokens": 2}}]
+        reader = StreamReader(FakeClient(), stream, threading.Event()).start()
+        assert _drain(reader) == [
+            (CONTENT, "a"),
+            (CONTENT, "b"),
+            (USAGE, {"completion_tokens": 2}),
+            (DONE, None),
+        ]
+
+    def test_stream_error_is_forwarded(self):
+        """Exceptions raised by the stream are passed to the consumer."""
+        def stream():
+            yield {"content": "a"}
+            raise ConnectionError("reset")
+
+        reader = StreamReader(FakeClient(), stream(), threading.Event()).start()
+        items = _drain(reader)
+        assert items[0] == (CONTENT, "a")
+        assert items[1][0] == ERROR
+        assert isinstance(items[1][1], ConnectionError)
+        assert items[-1] == (DONE, None)
+
+    def test_queue_is_bounded(self):
+        """Producer blocks instead of buffering the whole stream."""
+        stream = ClosableStream()
+        reader = StreamReader(FakeClient(), stream, threading.Event(), maxsize=5).start()
+        time.sleep(0.05)
+        assert reader.queue.qsize() <= 5
+        reader.close()
+
+    def test_close_stops_thread_and_stream(self):
+        """close() sets the shared event, closes the stream and joins."""
+        stop_event = threading.Event()
+        stream = ClosableStream()
+        reader = StreamReader(FakeClient(), stream, stop_event, maxsize=5).start()
+        time.sleep(0.02)
+        reader.close(timeout=1)
+        assert stop_event.is_set()
+        assert stream.closed
+        assert not reader._thread.is_alive()
@@ -0,0 +1,172 @@
+"""Tests for background summaries of old dialog turns."""
+
+import io
+
+from rich.console import Console
+
+from penguin_tamer.llm_clients import AsyncMistralClient, MistralClient
+from penguin_tamer.llm_clients.context_window import ContextSettings, MessageHistory
+from penguin_tamer.llm_clients.summarizer import (
+    SUMMARY_PREFIX, ContextSummarizer, SummaryCache, SummarySettings
+)
+from tests.conftest import _chunk
+
+SYSTEM = [{"role": "system", "content": "sys"}]
+CONTEXT = ContextSettings(budget=100, keep_turns=2)
+
+
+class FakeSummaryClient:
+    """Async client stand-in returning a fixed summary."""
+
+    def __init__(self, reply="user runs Debian"):
+        self.reply = reply
+        self.prompts = []
+        self.messages = []
+
+    async def aask(self, user_input, add_to_context=True):
+        self.prompts.append(user_input)
+        return self.reply
+
+    async def aclose(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _dialog(turns):
+    messages = MessageHistory(SYSTEM)
+    for index in range(turns):
+        messages.append({"role": "user", "content": f"question {index} " + "word " * 10})
+        messages.append({"role": "assistant", "content": f"answer {index} " + "word " * 10})
+    return messages
+
+
+def _summarizer(messages, client=None, cache=None, turns=2):
+    return ContextSummarizer(messages, client or FakeSummaryClient(), SummarySettings(enabled=True, turns=turns),
+                             cache)
+
+
+class TestSummarySettings:
+    """Summaries are on with the "summarize" policy."""
+
+    def test_from_config(self, monkeypatch):
+        from penguin_tamer.config_manager import config
+
+        section = {"policy": "summarize", "summarize_at": 2, "summary_turns": "6", "summary_llm": " llm_2 "}
+        original_get = config.get
+        monkeypatch.setattr(config, "get", lambda name, key=None, default=None:
+                            section if key == "context" else original_get(name, key, default))
+        assert SummarySettings.from_config() == SummarySettings(enabled=True, turns=6, llm="llm_2")
+
+
+class TestContextSummarizer:
+    """Oldest turns are condensed in the background and swapped in between turns."""
+
+    def test_summary_replaces_oldest_turns(self):
+        messages = _dialog(5)
+        client = FakeSummaryClient()
+        summarizer = _summarizer(messages, client)
+
+        assert summarizer.schedule(CONTEXT)
+        summarizer.wait(5)
+        assert len(messages) == 11  # Nothing changes until the next turn starts
+        assert "question 0" in client.prompts[0] and "question 2" not in client.prompts[0]
+
+        saved = summarizer.apply()
+        assert saved > 0 and summarizer.summarized_turns == 2
+        assert messages[0] == SYSTEM[0]
+        assert messages[1] == {"role": "system", "content": SUMMARY_PREFIX + "user runs Debian"}
+        assert messages[2]["content"].startswith("question 2")
+        assert len(messages) == 8
+
+    def test_below_threshold_nothing_starts(self):
+        messages = _dialog(5)
+        assert not _summarizer(messages).schedule(ContextSettings(budget=10000))
+        # The latest turns are never summarized
+        assert not _summarizer(_dialog(3)).schedule(CONTEXT)
+
+    def test_summary_rolls_into_the_next_one(self):
+        messages = _dialog(5)
+        client = FakeSummaryClient()
+        summarizer = _summarizer(messages, client)
+        summarizer.schedule(CONTEXT)
+        summarizer.wait(5)
+        summarizer.apply()
+
+        client.reply = "rolled"
+        assert summarizer.schedule(CONTEXT)
+        summarizer.wait(5)
+        summarizer.apply()
+        assert "user runs Debian" in client.prompts[1]
+        assert messages[1]["content"] == SUMMARY_PREFIX + "rolled"
+        assert messages[2]["content"].startswith("question 3")
+
+    def test_changed_turns_are_not_replaced(self):
+        messages = _dialog(5)
+        summarizer = _summarizer(messages)
+        summarizer.schedule(CONTEXT)
+        summarizer.wait(5)
+        del messages[1:3]
+
+        assert summarizer.apply() is None
+        assert all(message["role"] != "system" for message in messages[1:])
+
+    def test_cached_summary_is_reused(self, tmp_path):
+        cache = SummaryCache(tmp_path / "summaries.json")
+        first = _summarizer(_dialog(5), cache=cache)
+        first.schedule(CONTEXT)
+        first.wait(5)
+
+        # A resumed session with the same turns does not ask the LLM again
+        client = FakeSummaryClient("unused")
+        messages = _dialog(5)
+        resumed = _summarizer(messages, client, cache=SummaryCache(tmp_path / "summaries.json"))
+        assert resumed.schedule(CONTEXT)
+        assert resumed.apply() is not None
+        assert client.prompts == []
+        assert messages[1]["content"] == SUMMARY_PREFIX + "user runs Debian"
+
+    def test_failed_summary_is_not_retried(self):
+        summarizer = _summarizer(_dialog(5), FakeSummaryClient(reply=""))
+        assert summarizer.schedule(CONTEXT)
+        summarizer.wait(5)
+        assert summarizer.apply() is None
+        assert not summarizer.schedule(CONTEXT)
+
+    def test_close_releases_client(self):
+        client = FakeSummaryClient()
+        summarizer = _summarizer(_dialog(5), client)
+        summarizer.close()
+        assert client.closed and not summarizer.schedule(CONTEXT)
+
+
+class TestDialogSummaries:
+    """StreamProcessor swaps summaries in before the next request."""
+
+    def test_summary_written_by_async_client_is_sent(self, sse_api, monkeypatch):
+        from penguin_tamer.config_manager import config
+
+        original_get = config.get
+        monkeypatch.setattr(config, "get", lambda name, key=None, default=None:
+                            {"budget": 100, "keep_turns": 2, "policy": "drop"} if key == "context"
+                            else original_get(name, key, default))
+        chat_api = sse_api([_chunk("reply")])
+        summary_api = sse_api([_chunk("short note")])
+        console = Console(file=io.StringIO(), width=80)
+        client = MistralClient.create(console=console, api_key="k", api_url=chat_api.url, model="m",
+                                      system_message=SYSTEM)
+        client.output_mode = "raw"
+        client.messages.extend(_dialog(4)[1:])
+        writer = AsyncMistralClient.create(console=console, api_key="k", api_url=summary_api.url, model="s",
+                                           system_message=[])
+        client.summarizer = _summarizer(client.messages, writer)
+
+        assert client.ask_stream("next") == "reply"
+        client.summarizer.wait(5)
+        assert client.ask_stream("again") == "reply"
+
+        assert client.messages[1] == {"role": "system", "content": SUMMARY_PREFIX + "short note"}
+        sent = chat_api.requests[1][1]["messages"]
+        assert sent[1]["content"] == SUMMARY_PREFIX + "short note"
+        assert "question 0" in summary_api.requests[0][1]["messages"][-1]["content"]
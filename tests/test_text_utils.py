@@ -1,7 +1,9 @@
 """Tests for text_utils module."""
 
 import pytest
-from penguin_tamer.text_utils import extract_labeled_code_blocks, format_api_key_display
+from penguin_tamer.text_utils import (
+    extract_labeled_code_blocks, format_api_key_display, LabeledCodeBlockParser
+)
 
 
 class TestExtractLabeledCodeBlocks:
@@ -268,6 +270,52 @@ test3()
         assert result[0] == ''
 
 
+class TestLabeledCodeBlockParser:
+    """Tests for incremental LabeledCodeBlockParser."""
+
+    REPLY = """Intro [see docs] text.
+
+[Code #1]
+```bash
+ls -la
+```
+
+Explanation.
+
+[Code #2]
+```python
+print("second")
+```
+"""
+
+    def test_block_emitted_when_closing_fence_arrives(self):
+        """First block is available before the rest of the reply."""
+        parser = LabeledCodeBlockParser()
+        cut = self.REPLY.index("Explanation")
+        assert parser.feed(self.REPLY[:cut - 6]) == []
+        completed = parser.feed(self.REPLY[cut - 6:cut])
+        assert [block.code for block in completed] == ["ls -la"]
+        assert parser.feed(self.REPLY[cut:]) == parser.blocks[1:]
+
+    def test_block_metadata(self):
+        """Label, language tag and offsets are reported."""
+        parser = LabeledCodeBlockParser()
+        parser.feed(self.REPLY)
+        first, second = parser.blocks
+        assert (first.label, first.language) == ("Code #1", "bash")
+        assert (second.label, second.language, second.code) == ("Code #2", "python", 'print("second")')
+        assert self.REPLY[first.start:first.end] == "[Code #1]\n```bash\nls -la\n```"
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+    def test_chunked_input_matches_whole_text(self, chunk_size):
+        """Splitting the reply into chunks never changes the result."""
+        parser = LabeledCodeBlockParser()
+        for i in range(0, len(self.REPLY), chunk_size):
+            parser.feed(self.REPLY[i:i + chunk_size])
+        assert [block.code for block in parser.blocks] == extract_labeled_code_blocks(self.REPLY)
+        assert len(parser.blocks) == 2
+
+
 class TestFormatApiKeyDisplay:
     """Tests for format_api_key_display function."""
 
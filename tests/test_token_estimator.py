@@ -0,0 +1,100 @@
+"""Tests for the local token estimator."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from penguin_tamer.llm_clients import MistralClient
+from penguin_tamer.llm_clients import token_estimator
+from penguin_tamer.llm_clients.metrics import summarize_metrics
+from penguin_tamer.llm_clients.token_estimator import (
+    count_message_tokens, count_prompt_tokens, count_text_tokens, estimate_error
+)
+from tests.conftest import _chunk
+
+
+def _client(api):
+    client = MistralClient.create(console=Console(file=io.StringIO(), width=80), api_key="k",
+                                  api_url=api.url, model="m", system_message=[{"role": "system", "content": "sys"}])
+    client.output_mode = "raw"
+    return client
+
+
+class TestEstimates:
+    """BPE-like heuristics per script."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("", 0),
+        ("hello world", 2),
+        ("internationalization", 5),
+        ("ls -la /tmp", 5),
+        ("2026", 2),
+        ("привет мир", 3),
+        ("你好世界", 4),
+        ("line\n\n    indented", 3),
+    ])
+    def test_text_tokens(self, text, expected):
+        assert count_text_tokens(text) == expected
+
+    def test_denser_scripts_cost_more(self):
+        english = count_text_tokens("The quick brown fox jumps over the lazy dog. " * 10)
+        russian = count_text_tokens("Съешь же ещё этих мягких французских булок да выпей чаю. " * 10)
+        assert russian > english
+
+    def test_message_and_prompt_overhead(self):
+        message = {"role": "user", "content": "hello world"}
+        assert count_message_tokens(message) == 2 + token_estimator.MESSAGE_OVERHEAD_TOKENS
+        assert count_message_tokens({"role": "assistant", "content": None}) == token_estimator.MESSAGE_OVERHEAD_TOKENS
+        assert count_prompt_tokens([message, message]) == 2 * count_message_tokens(message) + 3
+
+    def test_long_messages_are_counted_once(self, monkeypatch):
+        calls = []
+        original = token_estimator._count
+        monkeypatch.setattr(token_estimator, "_count", lambda text: calls.append(text) or original(text))
+        dialog = [{"role": "user", "content": f"message {index} " + "text " * 40} for index in range(200)]
+
+        first = count_prompt_tokens(dialog)
+        dialog.append({"role": "assistant", "content": "new reply " * 40})
+        second = count_prompt_tokens(dialog)
+
+        assert second > first
+        assert len(calls) == 201
+
+    def test_estimate_error(self):
+        assert estimate_error(90, 100) == pytest.approx(0.1)
+        assert estimate_error(None, 100) is None and estimate_error(90, 0) is None
+
+
+class TestClientUsage:
+    """Missing usage is estimated, reported usage measures the estimator."""
+
+    def test_usage_is_estimated_when_provider_sends_none(self, sse_api):
+        api = sse_api([_chunk("Hello "), _chunk("world")])
+        client = _client(api)
+
+        assert client.ask_stream("question") == "Hello world"
+        metrics = client.request_metrics[-1]
+        assert metrics.usage_estimated
+        assert metrics.prompt_tokens == metrics.estimated_prompt_tokens > 0
+        assert metrics.completion_tokens == 2
+        assert (client.total_requests, client.total_completion_tokens) == (1, 2)
+        assert summarize_metrics(client.request_metrics)["estimated_usage_requests"] == 1
+
+    def test_reported_usage_gives_accuracy(self, sse_api, monkeypatch):
+        from penguin_tamer.config_manager import config
+
+        api = sse_api([_chunk("Hi"), {"choices": [], "usage": {"prompt_tokens": 20, "completion_tokens": 1}}])
+        client = _client(api)
+        assert client.ask_stream("question") == "Hi"
+
+        metrics = client.request_metrics[-1]
+        assert not metrics.usage_estimated and metrics.prompt_tokens == 20
+        expected = estimate_error(metrics.estimated_prompt_tokens, 20)
+        assert summarize_metrics(client.request_metrics)["avg_estimate_error"] == pytest.approx(expected)
+
+        original_get = config.get
+        monkeypatch.setattr(config, "get", lambda section, key=None, default=None:
+                            True if key == "debug" else original_get(section, key, default))
+        client.print_token_statistics()
+        assert "Prompt estimate error" in client.console.file.getvalue()